@@ -1,34 +1,57 @@
+import re
+import numpy as np
 import pandas as pd # type: ignore
 from collections import defaultdict
+from sharedmem import share_frame
+
+
+def _small_int(series):
+    # Downcast a numeric column to the smallest integer dtype. Blank cells are NaN and
+    # keep the column float (NaN matches no down or range); any other text raises.
+    if not pd.api.types.is_numeric_dtype(series):
+        series = series.mask(series.astype(str).str.strip() == '')
+    values = pd.to_numeric(series)
+    if values.isna().any():
+        return values.astype('float64')
+    return pd.to_numeric(values.astype('int64'), downcast='integer')
+
+
+DOWN_NAMES = {"First": 1, "Second": 2, "Third": 3, "Fourth": 4}
+
+# Raw export columns the dashboard never reads
+RAW_DROP_COLUMNS = [' ', ' .1', 'S1', 'S2', 'S3', 'S4', 'V', 'L', 'PRAC DRILL', 'JERSEY #', 'PLAY CALL',
+                    'REC#', 'PLAY RESULT', 'FORM FAM', 'FIB', 'TAPE LABELS']
+
+_TAPE_DATE = re.compile(r'(\d{1,2})-(\d{1,2})-(\d{4})')
+
+
+def season_of(tape_label):
+    # Season a play belongs to, from its TAPE LABELS entry ("24 1450 11-23-2024 ...").
+    # January-June games count toward the previous fall's season.
+    label = str(tape_label or '')
+    match = _TAPE_DATE.search(label)
+    if match:
+        month, year = int(match.group(1)), int(match.group(3))
+        return year - 1 if month <= 6 else year
+    head = label.strip().split(' ')[0]
+    if head.isdigit() and len(head) == 2:
+        return 2000 + int(head)
+    return None
+
+
+def clean_plays(RU_data):
+    # Apply the cleaning rules to one raw play export and return the canonical table
+    if RU_data.empty:
+        return pd.DataFrame()
+    RU_clean = RU_data.drop(columns=RAW_DROP_COLUMNS, errors='ignore')
 
-# Try to load RU data, but continue with empty DataFrame if file is not present (Render)
-try:
-    RU_data = pd.read_csv('RU_data.csv')
-except FileNotFoundError:
-    print("Warning: RU_data.csv not found. Continuing with empty dataset. Add RU_data.csv to repository to enable full functionality.")
-    RU_data = pd.DataFrame()
-
-# If no RU data, create safe empty fallbacks to avoid import-time crashes
-if RU_data.empty:
-    RU_clean = pd.DataFrame()
-    # expose WM_data_df so Main.py import (if present) doesn't fail
-    WM_data_df = pd.DataFrame()
-    # empty breakdowns / sources used by app
-    coverage_breakdown = pd.DataFrame()
-    concept_breakdown = pd.DataFrame()
-    data_sources = {"First": pd.DataFrame(), "Second": pd.DataFrame(), "Third": pd.DataFrame(), "Fourth": pd.DataFrame()}
-    tendency_breakdowns = {}
-else:
-    RU_clean = RU_data.drop(columns=[' .1', 'S1', 'S2', 'S3', 'S4', 'V', 'L', 'PRAC DRILL', 'JERSEY #', 'PLAY CALL', 
-                                'REC#', 'PLAY RESULT', 'FORM FAM', 'FIB', 'TAPE LABELS'])
-
-    RU_clean['GAIN'].value_counts()
     RU_clean = RU_clean[RU_clean['DN'] != ' ']
-    RU_clean['DN'] = pd.to_numeric(RU_clean['DN'])
+    RU_clean['DN'] = _small_int(RU_clean['DN'])
     RU_clean = RU_clean[RU_clean['GAIN'] != ' ']
-    RU_clean['GAIN'] = pd.to_numeric(RU_clean['GAIN'])
+    RU_clean['GAIN'] = _small_int(RU_clean['GAIN'])
     RU_clean = RU_clean[RU_clean['DIST'] != ' ']
-    RU_clean['DIST'] = pd.to_numeric(RU_clean['DIST'])
+    RU_clean['DIST'] = _small_int(RU_clean['DIST'])
+    RU_clean['FPOS'] = _small_int(RU_clean['FPOS'])
     RU_clean = RU_clean[RU_clean['OVO CONCEPT'] != ' ']
     # Define your key defensive columns
     defensive_cols = ['BLITZ', 'FRONT', 'RUSHERS', 'STUNT', 'COVERAGE']
@@ -63,113 +86,510 @@ else:
         ((RU_clean['R/P'] == 'R') & (RU_clean['GAIN'] >= 10))
         | ((RU_clean['R/P'] == 'P') & (RU_clean['GAIN'] >= 15))
     ).astype(int)
+    RU_clean['Is_Successful'] = RU_clean['Is_Successful'].astype('int8')
+    RU_clean['Is_Explosive'] = RU_clean['Is_Explosive'].astype('int8')
+
+
+    # One canonical table: order plays by down (stable, so game order is kept within
+    # a down) so every per-down table is a zero-copy slice of it, and rebuild it on
+    # read-only numpy/Arrow buffers so preloaded gunicorn workers share it (see
+    # sharedmem.py). The raw export is not kept.
+    return share_frame(RU_clean.sort_values('DN', kind='mergesort'))
 
-    def make_indented_concept_options(concepts):
-        groups = defaultdict(list)
 
-        for c in concepts:
-            if not isinstance(c, str) or not c.strip():
+def make_indented_concept_options(concepts):
+    groups = defaultdict(list)
+
+    for c in concepts:
+        if not isinstance(c, str) or not c.strip():
+            continue
+
+        parts = c.split('/')
+        prefix = '/'.join(parts[:2]) if len(parts) >= 2 else c
+        groups[prefix].append(c)
+
+    options = []
+
+    for prefix in sorted(groups):
+        # Add a disabled group header
+        options.append({'label': prefix, 'value': prefix, 'disabled': True})
+
+        # Add all child concepts (allow the prefix itself if it's alone)
+        for play in sorted(groups[prefix]):
+            if play == prefix and len(groups[prefix]) > 1:
                 continue
+            label = f'  {play}' if play != prefix else play
+            options.append({'label': label, 'value': play})
 
-            parts = c.split('/')
-            prefix = '/'.join(parts[:2]) if len(parts) >= 2 else c
-            groups[prefix].append(c)
-
-        options = []
-
-        for prefix in sorted(groups):
-            # Add a disabled group header
-            options.append({'label': prefix, 'value': prefix, 'disabled': True})
-
-            # Add all child concepts (allow the prefix itself if it's alone)
-            for play in sorted(groups[prefix]):
-                if play == prefix and len(groups[prefix]) > 1:
-                    continue
-                label = f'  {play}' if play != prefix else play
-                options.append({'label': label, 'value': play})
-
-        return options
-
-
-    # Build coverage/concept breakdowns and per-down data_sources
-    coverage_counts = RU_clean['COVERAGE'].value_counts().reset_index()
-    coverage_counts.columns = ['COVERAGE', 'Coverage Count']
-    coverage_counts['Coverage %'] = (coverage_counts['Coverage Count'] / len(RU_clean)) * 100
-    coverage_eff = RU_clean.groupby('COVERAGE')['Is_Successful'].mean().reset_index()
-    coverage_eff.columns = ['COVERAGE', 'Success Rate']
-    coverage_eff['Success Rate'] *= 100
-    coverage_breakdown = coverage_counts.merge(coverage_eff, on='COVERAGE', how='left')
-    coverage_breakdown = coverage_breakdown.sort_values(by='Coverage Count', ascending=False)
-
-    #group by concept type
-    concept_counts = RU_clean['OVO CONCEPT'].value_counts().reset_index()
-    concept_counts.columns = ['OVO CONCEPT', 'Concept Count']
-    concept_counts['Concept %'] = (concept_counts['Concept Count'] / len(RU_clean)) * 100
-
-    concept_eff = RU_clean.groupby('OVO CONCEPT')['Is_Successful'].mean().reset_index()
-    concept_eff.columns = ['OVO CONCEPT', 'Success Rate']
-    concept_eff['Success Rate'] *= 100
-
-    concept_breakdown = concept_counts.merge(concept_eff, on='OVO CONCEPT', how='left')
-    concept_breakdown = concept_breakdown.sort_values(by='Concept Count', ascending=False)
-
-
-    #tendencies data
-    RU_tendencies = RU_clean[RU_clean['DN'].isin([1, 2, 3, 4])]
-    first = RU_tendencies[RU_tendencies['DN'] == 1]
-    second = RU_tendencies[RU_tendencies['DN'] == 2]
-    third = RU_tendencies[RU_tendencies['DN'] == 3]
-    fourth = RU_tendencies[RU_tendencies['DN'] == 4]
-
-    data_sources = {
-        "First": first,
-        "Second": second,
-        "Third": third,
-        "Fourth": fourth
-    }
+    return options
+
+
+
+# Columns the breakdown engine groups by (COVERAGE is also accepted)
+BREAKDOWN_DIMENSIONS = ['DN', 'PERSON', 'OFF FORM', 'MOTION', 'HASH', 'OVO CONCEPT']
+
+# Coverage x concept matrix tally, precomputed at ingest: the down, distance and result
+# levels let the opponent page's filters select rows of it instead of scanning plays
+COVERAGE_MATRIX_BY = ['DN', 'DIST', 'FPOS', 'Is_Successful', 'Is_Explosive', 'COVERAGE', 'OVO CONCEPT']
+
+# Range filters, as inclusive (low, high) bounds. Distance is yards to go; field zones
+# are yards to the opponent's goal line (YDS TO GOAL, derived from FPOS).
+DISTANCE_BUCKETS = {'short': (1, 3), 'medium': (4, 6), 'long': (7, 99)}
+FIELD_ZONES = {'backed-up': (90, 99), 'open-field': (21, 89), 'red-zone': (1, 20), 'goal-line': (1, 5)}
+
+
+def yards_to_goal(fpos):
+    # FPOS is negative in the offense's own territory (-25 = own 25) and positive past
+    # midfield (20 = opponent 20); blanks come back as NaN
+    fpos = pd.to_numeric(pd.Series(fpos), errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    return np.where(fpos < 0, 100 + fpos, fpos)
+
+
+# Columns kept sorted for range lookups: name -> values for a play table
+RANGE_COLUMNS = {
+    'DIST': lambda df: pd.to_numeric(df['DIST'], errors='coerce').to_numpy(dtype='float64', na_value=np.nan),
+    'YDS TO GOAL': lambda df: yards_to_goal(df['FPOS']),
+}
+
+
+class SortedColumn:
+    # One column of a play table in ascending order with the row positions it came
+    # from, so a value range is two binary searches instead of a scan. Blank values
+    # are left out (they never fall in a range).
+
+    def __init__(self, values):
+        values = np.asarray(values, dtype='float64')
+        present = np.flatnonzero(~np.isnan(values))
+        self.positions = present[np.argsort(values[present], kind='stable')]
+        self.values = values[self.positions]
+
+    def between(self, low, high):
+        """Row positions (ascending) with low <= value <= high; a None bound is open."""
+        start = 0 if low is None else np.searchsorted(self.values, low, 'left')
+        stop = len(self.values) if high is None else np.searchsorted(self.values, high, 'right')
+        return np.sort(self.positions[start:stop])
+
+    def merged(self, other, old_at, new_at):
+        """Index of a view with `other`'s rows added; `old_at` / `new_at` are the merged
+        view's positions of this index's rows and of `other`'s."""
+        merged = object.__new__(SortedColumn)
+        positions = np.concatenate([old_at[self.positions], new_at[other.positions]])
+        values = np.concatenate([self.values, other.values])
+        # Two sorted runs: the stable sort merges them
+        order = np.argsort(values, kind='stable')
+        merged.positions, merged.values = positions[order], values[order]
+        return merged
+
+    @property
+    def nbytes(self):
+        return self.positions.nbytes + self.values.nbytes
+
+
+class BitmapIndex:
+    # One packed bitmap per value of a column (bit i set: row i has that value), so a
+    # filter on any set of values is a few bitwise ORs over rows/8 bytes and filters
+    # on different columns combine with a bitwise AND.
+
+    def __init__(self, masks, length):
+        # masks: value -> boolean row mask (a row may be in several, or none)
+        self.length = length
+        self.values = {value: i for i, value in enumerate(masks)}
+        self.bits = np.packbits(np.array(list(masks.values()), dtype=bool).reshape(len(masks), length), axis=1)
+        self.counts = np.bitwise_count(self.bits).sum(axis=1, dtype='int64')
+
+    @classmethod
+    def of(cls, keys):
+        # Index of a column: one bitmap per distinct value (blank/NaN rows in none)
+        codes, uniques = pd.factorize(pd.Series(keys), use_na_sentinel=True)
+        masks = np.zeros((len(uniques), len(codes)), dtype=bool)
+        present = np.flatnonzero(codes >= 0)
+        masks[codes[present], present] = True
+        return cls(dict(zip(uniques, masks)), len(codes))
+
+    def any_of(self, values):
+        """Bitmap of the rows having any of `values` (unknown values match nothing)."""
+        found = np.zeros(self.bits.shape[1], dtype=np.uint8)
+        for value in values:
+            i = self.values.get(value)
+            if i is not None:
+                found |= self.bits[i]
+        return found
+
+    def counts_within(self, bits):
+        """value -> rows having it among the rows set in `bits`."""
+        return dict(zip(self.values, np.bitwise_count(self.bits & bits).sum(axis=1, dtype='int64').tolist()))
+
+    def merged(self, other, old_at, new_at):
+        """Index of a view with `other`'s rows added (see SortedColumn.merged). The
+        existing bitmaps are copied over run by run; only `other`'s rows were indexed."""
+        values = dict(self.values)
+        for value in other.values:
+            values.setdefault(value, len(values))
+        bits = np.zeros((len(values), len(old_at) + len(new_at)), dtype=np.uint8)
+        counts = np.zeros(len(values), dtype='int64')
+        counts[:len(self.values)] = self.counts
+        new_rows = np.array([values[v] for v in other.values], dtype='int64')
+        counts[new_rows] += other.counts
+        for source, at, rows in ((self, old_at, slice(0, len(self.values))), (other, new_at, new_rows)):
+            unpacked = np.unpackbits(source.bits, axis=1, count=source.length)
+            # Positions come in a few ascending runs (one per down), each a block copy
+            breaks = np.flatnonzero(np.diff(at) != 1) + 1
+            for start, stop in zip(np.r_[0, breaks], np.r_[breaks, len(at)]):
+                bits[rows, at[start]:at[start] + stop - start] = unpacked[:, start:stop]
+        merged = object.__new__(BitmapIndex)
+        merged.length, merged.values = bits.shape[1], values
+        merged.bits, merged.counts = np.packbits(bits, axis=1), counts
+        return merged
+
+    @property
+    def nbytes(self):
+        return self.bits.nbytes
+
+
+def distance_bucket(plays):
+    # DISTANCE_BUCKETS name of every play (None outside them)
+    bucket = pd.Series(None, index=plays.index, dtype=object)
+    for name, (low, high) in DISTANCE_BUCKETS.items():
+        bucket[(plays['DIST'] >= low) & (plays['DIST'] <= high)] = name
+    return bucket
+
+
+def field_zone(plays):
+    # FIELD_ZONES name of every play, the narrowest zone when they overlap (a play at
+    # the opponent 3 is goal line, not red zone); None without a field position
+    ytg = yards_to_goal(plays['FPOS'])
+    zones = sorted(FIELD_ZONES.items(), key=lambda item: item[1][1] - item[1][0])
+    return pd.Series(np.select([(ytg >= low) & (ytg <= high) for _, (low, high) in zones],
+                               [name for name, _ in zones], default=None), index=plays.index, dtype=object)
 
-    #First Down
-    firstd_counts = first['OVO CONCEPT'].value_counts().reset_index()
-    firstd_counts.columns = ['OVO CONCEPT', '1st Down Count']
-    firstd_counts['1st Down %'] = (firstd_counts['1st Down Count'] / len(first)) * 100
-    efficiency_first = first.groupby('OVO CONCEPT')['Is_Successful'].mean().reset_index()
-    efficiency_first.columns = ['OVO CONCEPT', 'Efficiency %']
-    efficiency_first['Efficiency %'] *= 100
-    firstd_counts = firstd_counts.merge(efficiency_first, on='OVO CONCEPT', how='left')
-
-    #Second Down
-    sd_counts = second['OVO CONCEPT'].value_counts().reset_index()
-    sd_counts.columns = ['OVO CONCEPT', '2nd Down Count']
-    sd_counts['2nd Down %'] = (sd_counts['2nd Down Count'] / len(second)) * 100
-    efficiency_s = second.groupby('OVO CONCEPT')['Is_Successful'].mean().reset_index()
-    efficiency_s.columns = ['OVO CONCEPT', 'Efficiency %']
-    efficiency_s['Efficiency %'] *= 100
-    sd_counts = sd_counts.merge(efficiency_s, on='OVO CONCEPT', how='left')
-
-
-    #Third Down
-    td_counts = third['OVO CONCEPT'].value_counts().reset_index()
-    td_counts.columns = ['OVO CONCEPT', '3rd Down Count']
-    td_counts['3rd Down %'] = (td_counts['3rd Down Count'] / len(third)) * 100
-    efficiency = third.groupby('OVO CONCEPT')['Is_Successful'].mean().reset_index()
-    efficiency.columns = ['OVO CONCEPT', 'Efficiency %']
-    efficiency['Efficiency %'] *= 100
-    td_counts = td_counts.merge(efficiency, on='OVO CONCEPT', how='left')
-
-
-    #Fourth Down
-    fourthd_counts = fourth['OVO CONCEPT'].value_counts().reset_index()
-    fourthd_counts.columns = ['OVO CONCEPT', '4th Down Count']
-    fourthd_counts['4th Down %'] = (fourthd_counts['4th Down Count'] / len(fourth)) * 100
-    efficiency_fourth = fourth.groupby('OVO CONCEPT')['Is_Successful'].mean().reset_index()
-    efficiency_fourth.columns = ['OVO CONCEPT', 'Efficiency %']
-    efficiency_fourth['Efficiency %'] *= 100
-    fourthd_counts = fourthd_counts.merge(efficiency_fourth, on='OVO CONCEPT', how='left')
-
-
-    tendency_breakdowns = {
-        "First Down Tendencies": firstd_counts,
-        "Second Down Tendencies": sd_counts,
-        "Third Down Tendencies": td_counts,
-        "Fourth Down Tendencies": fourthd_counts
+
+def _bitmap_keys(plays):
+    # Bitmap index name -> {value: row mask} or column of keys, over a play table
+    concept = plays['OVO CONCEPT'].astype(str).str.strip().str.upper()
+    bucket = distance_bucket(plays)
+    successful, explosive = plays['Is_Successful'].to_numpy(), plays['Is_Explosive'].to_numpy()
+    return {
+        'DN': plays['DN'],
+        'DIST': plays['DIST'],
+        'DIST BUCKET': bucket,
+        'OVO CONCEPT': concept,
+        'PERSON': plays['PERSON'],
+        'OFF FORM': plays['OFF FORM'],
+        'MOTION': plays['MOTION'],
+        'HASH': plays['HASH'],
+        'COVERAGE': plays['COVERAGE'],
+        'FRONT': plays['FRONT'],
+        'RESULT': {'efficient': successful == 1, 'nonefficient': successful == 0,
+                   'explosive': explosive == 1, 'nonexplosive': explosive == 0},
     }
+
+# Defensive tendencies are tallied at ingest per (down, distance bucket, field zone,
+# personnel, front) over downs 1-4; the defense page sums that tally over the levels it
+# does not group by
+DEFENSE_DIMENSIONS = ['DN', 'DIST BUCKET', 'FIELD ZONE', 'PERSON']
+DEFENSE_BY = DEFENSE_DIMENSIONS + ['FRONT']
+
+# Per-down tendency tables: (down, count column, share column, table name)
+_DOWN_TENDENCIES = [
+    (1, "1st Down Count", "1st Down %", "First Down Tendencies"),
+    (2, "2nd Down Count", "2nd Down %", "Second Down Tendencies"),
+    (3, "3rd Down Count", "3rd Down %", "Third Down Tendencies"),
+    (4, "4th Down Count", "4th Down %", "Fourth Down Tendencies"),
+]
+
+
+def _tally(plays, by):
+    # Plays, success sum and explosive sum per combination of the `by` columns, in one
+    # grouped pass. Blank values stay in as their own group so shares are taken over
+    # every play; breakdowns are derived from these sums, so new plays only need
+    # their own tally added on.
+    by = list(by)
+    if plays.empty or any(col not in plays.columns for col in by):
+        index = pd.MultiIndex.from_arrays([[]] * len(by), names=by) if len(by) > 1 else pd.Index([], name=by[0])
+        return pd.DataFrame({'size': [], 'success': [], 'explosive': []}, index=index, dtype='int64')
+    return plays.groupby(by, sort=False, dropna=False).agg(
+        size=('Is_Successful', 'size'),
+        success=('Is_Successful', 'sum'),
+        explosive=('Is_Explosive', 'sum'),
+    ).astype('int64')
+
+
+def _add_tally(old, delta):
+    if delta.empty:
+        return old
+    if old.empty:
+        return delta
+    return old.add(delta, fill_value=0).astype('int64')
+
+
+def _defense_tally(plays):
+    # Plays, blitzes, stunts and rusher counts per DEFENSE_BY combination. BLITZ and
+    # STUNT count when tagged at all; RUSHERS sums over the plays that have a number.
+    columns = ['plays', 'blitzes', 'stunts', 'rusher_plays', 'rushers']
+    if not plays.empty:
+        plays = plays[plays['DN'].between(1, 4)]
+    if plays.empty or any(col not in plays.columns for col in ('BLITZ', 'STUNT', 'RUSHERS', 'FRONT', 'PERSON')):
+        index = pd.MultiIndex.from_arrays([[]] * len(DEFENSE_BY), names=DEFENSE_BY)
+        return pd.DataFrame({col: [] for col in columns}, index=index, dtype='int64')
+    rushers = pd.to_numeric(plays['RUSHERS'], errors='coerce')
+    keys = pd.DataFrame({
+        'DN': plays['DN'], 'DIST BUCKET': distance_bucket(plays), 'FIELD ZONE': field_zone(plays),
+        'PERSON': plays['PERSON'], 'FRONT': plays['FRONT'],
+        'blitz': (plays['BLITZ'].astype(str).str.strip() != '').astype('int64'),
+        'stunt': (plays['STUNT'].astype(str).str.strip() != '').astype('int64'),
+        'rushers': rushers.fillna(0), 'rusher_play': rushers.notna().astype('int64'),
+    })
+    return keys.groupby(DEFENSE_BY, sort=False, dropna=False).agg(
+        plays=('blitz', 'size'), blitzes=('blitz', 'sum'), stunts=('stunt', 'sum'),
+        rusher_plays=('rusher_play', 'sum'), rushers=('rushers', 'sum'),
+    ).astype('int64')
+
+
+_DEFENSE_ORDER = {'DIST BUCKET': list(DISTANCE_BUCKETS), 'FIELD ZONE': list(FIELD_ZONES)}
+
+
+def defense_table(tally, by):
+    """Plays, blitz %, stunt %, average rushers and most common front per combination of
+    `by` (DEFENSE_DIMENSIONS), from the defense tally. Top front leaves out untagged
+    fronts; its share is of all the group's plays."""
+    by = list(by)
+    groups = tally.groupby(level=by, sort=False, dropna=False).sum()
+    fronts = tally.groupby(level=by + ['FRONT'], sort=False, dropna=False)['plays'].sum()
+    fronts = fronts[fronts.index.get_level_values('FRONT').astype(str).str.strip() != '']
+    top = fronts.sort_values(ascending=False, kind='mergesort').groupby(level=by, sort=False, dropna=False).head(1)
+    top = top.reset_index(level='FRONT')
+    out = groups.index.to_frame(index=False)
+    out['Plays'] = groups['plays'].to_numpy()
+    out['Blitz %'] = (groups['blitzes'] / groups['plays'] * 100).to_numpy()
+    out['Stunt %'] = (groups['stunts'] / groups['plays'] * 100).to_numpy()
+    out['Avg Rushers'] = (groups['rushers'] / groups['rusher_plays'].where(groups['rusher_plays'] > 0)).to_numpy()
+    top = top.reindex(groups.index)
+    out['Top Front'] = top['FRONT'].to_numpy()
+    out['Top Front %'] = (top['plays'] / groups['plays'] * 100).to_numpy()
+    out = out[out[by].notna().all(axis=1)]
+    order = [out[col].map({v: i for i, v in enumerate(_DEFENSE_ORDER[col])}) if col in _DEFENSE_ORDER else out[col]
+             for col in by]
+    out = out.iloc[np.lexsort([key.to_numpy() for key in reversed(order)])] if len(out) else out
+    return out.reset_index(drop=True)
+
+
+def front_mix(tally, by, top=8):
+    """Share of each group's plays (by `by`) per front: the `top` most common tagged
+    fronts overall, the rest as 'Other'. Long form: by..., FRONT, Plays, Share %."""
+    by = list(by)
+    fronts = tally.groupby(level=by + ['FRONT'], sort=False, dropna=False)['plays'].sum().reset_index()
+    fronts['FRONT'] = fronts['FRONT'].astype(str).str.strip().replace('', '(none)')
+    common = fronts[fronts['FRONT'] != '(none)'].groupby('FRONT')['plays'].sum().nlargest(top).index
+    fronts.loc[~fronts['FRONT'].isin(common) & (fronts['FRONT'] != '(none)'), 'FRONT'] = 'Other'
+    mix = fronts.groupby(by + ['FRONT'], sort=False, dropna=False)['plays'].sum().reset_index(name='Plays')
+    mix = mix[mix[by].notna().all(axis=1)]
+    mix['Share %'] = mix['Plays'] / mix.groupby(by, dropna=False)['Plays'].transform('sum') * 100
+    return mix
+
+
+def breakdown_table(tally, by):
+    """Plays, share, success rate and explosive rate per combination of `by`.
+
+    Share is the last column's share within the other columns' group (e.g. for
+    DN, OFF FORM: how often each formation is used on that down), or of all plays
+    for a single column. Most common first within each group; combinations with a
+    missing value are left out of the rows but not of the shares. The columns come
+    in `by` order whatever the tally's level order (PlaySet.tally sorts its key).
+    """
+    by = list(dict.fromkeys(by))
+    df = tally.reset_index()
+    counts = df['size']
+    if len(by) > 1:
+        totals = df.groupby(by[:-1], sort=False, dropna=False)['size'].transform('sum')
+    else:
+        totals = counts.sum()
+    out = df[by].copy()
+    out['Plays'] = counts
+    out['Share %'] = counts / totals * 100
+    out['Success %'] = df['success'] / counts * 100
+    out['Explosive %'] = df['explosive'] / counts * 100
+    out = out[out[by].notna().all(axis=1)]
+    out = out.sort_values(by='Plays', ascending=False, kind='mergesort')
+    if len(by) > 1:
+        out = out.sort_values(by=by[:-1], kind='mergesort')
+    return out.reset_index(drop=True)
+
+
+def _legacy_breakdown(table, key, count_col, pct_col, rate_col):
+    # Engine output under the column names the existing pages use
+    return table[[key, 'Plays', 'Share %', 'Success %']].set_axis([key, count_col, pct_col, rate_col], axis=1)
+
+
+class PlaySet:
+    # Cleaned plays for one offense/season and everything derived from them at ingest:
+    # per-down views, tallies for the breakdown engine, and the coverage/concept
+    # breakdowns and per-down concept tendencies built from them.
+    # New plays are added with append(), which returns a new PlaySet so callbacks
+    # still holding this one keep a consistent view.
+
+    def __init__(self, RU_clean, tallies=None, defense=None, indexes=None):
+        # indexes: (sorted_columns, bitmaps) already built for RU_clean (see append)
+        self.clean = RU_clean
+        self.tallies = dict(tallies or {})
+        self.defense = defense if defense is not None else _defense_tally(RU_clean)
+        if RU_clean.empty:
+            # safe empty fallbacks (keeping the export's columns when there are any)
+            # so callbacks and layouts don't crash
+            self.tendencies = RU_clean
+            self.coverage_breakdown = pd.DataFrame(columns=['COVERAGE', 'Coverage Count', 'Coverage %', 'Success Rate'])
+            self.concept_breakdown = pd.DataFrame(columns=['OVO CONCEPT', 'Concept Count', 'Concept %', 'Success Rate'])
+            self.data_sources = {name: RU_clean for name in DOWN_NAMES}
+            self.tendency_breakdowns = {}
+            self.sorted_columns = {}
+            self.bitmaps = {}
+            return
+
+        #tendencies data: row ranges of the down-sorted RU_clean (views, not copies)
+        _downs = RU_clean['DN'].to_numpy()
+
+        def _down_rows(lo, hi):
+            return RU_clean.iloc[np.searchsorted(_downs, lo, 'left'):np.searchsorted(_downs, hi, 'right')]
+
+        self.tendencies = _down_rows(1, 4)
+        self.data_sources = {name: _down_rows(dn, dn) for name, dn in DOWN_NAMES.items()}
+
+        coverage = self.breakdown(['COVERAGE'])
+        self.coverage_breakdown = _legacy_breakdown(coverage, 'COVERAGE', 'Coverage Count', 'Coverage %', 'Success Rate')
+        concept = self.breakdown(['OVO CONCEPT'])
+        self.concept_breakdown = _legacy_breakdown(concept, 'OVO CONCEPT', 'Concept Count', 'Concept %', 'Success Rate')
+        by_down = self.breakdown(['DN', 'OVO CONCEPT'])
+        self.tendency_breakdowns = {
+            table: _legacy_breakdown(by_down[by_down['DN'] == dn].reset_index(drop=True),
+                                     'OVO CONCEPT', count_col, pct_col, 'Efficiency %')
+            for dn, count_col, pct_col, table in _DOWN_TENDENCIES
+        }
+        self.tally(COVERAGE_MATRIX_BY)
+        if indexes is not None:
+            self.sorted_columns, self.bitmaps = indexes
+            return
+
+        # Range-filter columns sorted within every per-down view (None: all downs)
+        views = {**self.data_sources, None: self.tendencies}
+        self.sorted_columns = {
+            (down, column): SortedColumn(values(view))
+            for column, values in RANGE_COLUMNS.items()
+            for down, view in views.items()
+        }
+
+        # Bitmap indexes over the downs 1-4 view (see _bitmap_keys) for multi-select filters
+        self.bitmaps = {
+            name: BitmapIndex(keys, len(self.tendencies)) if isinstance(keys, dict) else BitmapIndex.of(keys)
+            for name, keys in _bitmap_keys(self.tendencies).items()
+        }
+
+    def tally(self, by):
+        """Counts and sums per combination of `by`, computed once per PlaySet (the
+        levels come sorted, so every ordering of the same columns shares one tally)."""
+        key = tuple(sorted(set(by)))
+        tally = self.tallies.get(key)
+        if tally is None:
+            tally = self.tallies[key] = _tally(self.clean, key)
+        return tally
+
+    def breakdown(self, by):
+        """Tendency table (see breakdown_table) for any combination of BREAKDOWN_DIMENSIONS."""
+        return breakdown_table(self.tally(by), by)
+
+    def match(self, name, values):
+        """Bitmap (over `tendencies`) of the plays whose `name` index value is any of `values`."""
+        return self.bitmaps[name].any_of(values)
+
+    def bitmap_of(self, positions):
+        # Bitmap (over `tendencies`) with the given row positions set
+        mask = np.zeros(len(self.tendencies), dtype=bool)
+        mask[positions] = True
+        return np.packbits(mask)
+
+    def rows(self, bits):
+        """Row positions in `tendencies` of the plays set in `bits`."""
+        return np.flatnonzero(np.unpackbits(bits, count=len(self.tendencies)))
+
+    def range_rows(self, down, ranges):
+        """Row positions in the down's view (all downs when None) inside every
+        {RANGE_COLUMNS name: (low, high)} range, or None when no range is set."""
+        found = None
+        for column, (low, high) in ranges.items():
+            if low is None and high is None:
+                continue
+            index = self.sorted_columns.get((down if down in DOWN_NAMES else None, column))
+            rows = index.between(low, high) if index is not None else np.array([], dtype='int64')
+            found = rows if found is None else np.intersect1d(found, rows, assume_unique=True)
+        return found
+
+    def append(self, new_clean):
+        """New PlaySet with the cleaned plays `new_clean` added.
+
+        Only the new plays are tallied and indexed: their counts and sums are added
+        to every tally computed so far (the breakdowns are re-derived from the
+        totals), and their sorted runs and bitmap rows are merged into the existing
+        range and bitmap indexes, whose rows only move to their new positions.
+        """
+        if new_clean is None or new_clean.empty:
+            return self
+        if self.clean.empty:
+            return PlaySet(new_clean)
+        tallies = {key: _add_tally(tally, _tally(new_clean, key))
+                   for key, tally in list(self.tallies.items())}
+        defense = _add_tally(self.defense, _defense_tally(new_clean))
+
+        # Positions in the merged down-sorted table: new plays go after the old plays of their down
+        old_dn = self.clean['DN'].to_numpy()
+        new_order = np.argsort(new_clean['DN'].to_numpy(), kind='stable')
+        new_sorted = new_clean.iloc[new_order]
+        new_dn = new_sorted['DN'].to_numpy()
+        old_at = np.arange(len(old_dn)) + np.searchsorted(new_dn, old_dn, 'left')
+        new_at = np.arange(len(new_dn)) + np.searchsorted(old_dn, new_dn, 'right')
+        order = np.empty(len(old_dn) + len(new_dn), dtype='int64')
+        order[old_at] = np.arange(len(old_dn))
+        order[new_at] = len(old_dn) + new_order
+        merged = pd.concat([self.clean, new_clean], ignore_index=True).iloc[order]
+        merged_dn = merged['DN'].to_numpy()
+
+        def rows(dn, lo, hi):
+            return slice(np.searchsorted(dn, lo, 'left'), np.searchsorted(dn, hi, 'right'))
+
+        sorted_columns, bitmaps = dict(self.sorted_columns), self.bitmaps
+        for down, (lo, hi) in {**{name: (dn, dn) for name, dn in DOWN_NAMES.items()}, None: (1, 4)}.items():
+            old_rows, new_rows = rows(old_dn, lo, hi), rows(new_dn, lo, hi)
+            if new_rows.start == new_rows.stop:
+                # No new plays in this view: its rows and indexes stay as they are
+                continue
+            start = np.searchsorted(merged_dn, lo, 'left')
+            view_old_at, view_new_at = old_at[old_rows] - start, new_at[new_rows] - start
+            view = new_sorted.iloc[new_rows]
+            for column, values in RANGE_COLUMNS.items():
+                sorted_columns[(down, column)] = self.sorted_columns[(down, column)].merged(
+                    SortedColumn(values(view)), view_old_at, view_new_at)
+            if down is None:
+                bitmaps = {
+                    name: self.bitmaps[name].merged(
+                        BitmapIndex(keys, len(view)) if isinstance(keys, dict) else BitmapIndex.of(keys),
+                        view_old_at, view_new_at)
+                    for name, keys in _bitmap_keys(view).items()
+                }
+        return PlaySet(share_frame(merged), tallies, defense, (sorted_columns, bitmaps))
+
+    def frames(self):
+        # name -> DataFrame for every table this play set keeps in memory
+        found = {"clean": self.clean, "tendencies": self.tendencies}
+        for down, frame in self.data_sources.items():
+            found[f"data_sources[{down}]"] = frame
+        found["coverage_breakdown"] = self.coverage_breakdown
+        found["concept_breakdown"] = self.concept_breakdown
+        for name, frame in self.tendency_breakdowns.items():
+            found[f"tendency_breakdowns[{name}]"] = frame
+        for key, frame in list(self.tallies.items()):
+            found[f"tally[{', '.join(key)}]"] = frame
+        found["defense"] = self.defense
+        return found
+
+    def nbytes(self):
+        return int(sum(frame.memory_usage(deep=True).sum() for name, frame in self.frames().items()
+                       if not name.startswith(('tendencies', 'data_sources')))
+                   + sum(index.nbytes for index in self.sorted_columns.values())
+                   + sum(index.nbytes for index in self.bitmaps.values()))
@@ -1,52 +1,100 @@
 # ...existing code...
 
 # (Move run command to end of file)
+import json
+import os
+import profiling
+# Boot phases (imports, data load, app modules, app setup, callbacks), printed and
+# exported as wmfb_startup_seconds once the app is ready; see profiling.StartupTimer
+startup = profiling.StartupTimer()
 import dash
 from dash import dcc, html, dash_table
 import dash_bootstrap_components as dbc
 import pandas as pd
 import numpy as np
-import plotly.express as px
-from dash.dependencies import Output, Input, State
+# plotly.express is imported by the figure callbacks on first use, not at boot
+from dash.dependencies import ClientsideFunction, Output, Input, State
+from flask import send_from_directory, redirect
 from layout import sidebar, spring_layout
-from Football import *
-from SpringFootball import *
+import metrics
+import sharedmem
+import memreport
+from Football import (BREAKDOWN_DIMENSIONS, DEFENSE_DIMENSIONS, DISTANCE_BUCKETS, DOWN_NAMES, FIELD_ZONES,
+                      breakdown_table, defense_table, front_mix)
+startup.lap("imports")
+# Data ingest runs at import (opponent partitions load lazily, see playstore.py);
+# WMFB_PROFILE=football_ingest,spring_ingest profiles it. Callbacks read the
+# current version through dataset.current(), which a watcher swaps on file changes.
+# Nothing above may import dataset (or a module that does), or the ingest runs
+# before it is profiled and timed.
+with profiling.maybe_profile("football_ingest"):
+    import playstore
+with profiling.maybe_profile("spring_ingest"):
+    import SpringFootball
+import dataset
+startup.lap("data_load")
+import resultcache
+import api
+import bulk
+import exports
+import snapshot
+import warmup
+from queries import (SELECT_FILTERS, as_list, select_plays, option_counts, coverage_concept_matrix,
+                     main_concept_counts, concept_tags, stat_cards, player_plays, player_plays_table, roster,
+                     wm_main_concept_counts, wm_concept_tags, wm_distances, wm_stat_cards, wm_rows, wm_plays,
+                     COMPARISON_COLUMNS, comparison_rows)
+startup.lap("app_modules")
 
 # Color variables
 WM_GREEN = "#006341"
 WM_GOLD = "#FFC72C"
 WM_DARK_BG = "#0B2F1A"
-
-# Normalize concept strings (trim + uppercase) for robust filtering
-def _norm(s):
-	# Safe normalization
-	try:
-		return str(s).strip().upper()
-	except Exception:
-		return ""
-
-# Helper: main concept mask supports "MAIN", "MAIN/", and "MAIN " prefixes
-def _main_concept_mask(series, main):
-    conc = series.astype(str).str.strip().str.upper()
-    mc = _norm(main)
-    return (conc == mc) | conc.str.startswith(mc + '/', na=False) | conc.str.startswith(mc + ' ', na=False)
-
-# Load William & Mary data for WM_data_df
-try:
-    from Football import WM_data_df
-except ImportError:
-    import pandas as pd
-    WM_data_df = pd.read_csv('RU_data.csv')
+# Top stop of the custom distance slider, read as "and longer"
+DISTANCE_SLIDER_MAX = 20
+# Multi-select filters answered from the play set's bitmap indexes:
+# (dropdown id, placeholder, key in the play-filters store / queries.SELECT_FILTERS)
+INDEX_FILTER_DROPDOWNS = [
+    ("person-filter-dropdown", "Personnel", "person"),
+    ("formation-filter-dropdown", "Offensive Formation", "off_form"),
+    ("motion-filter-dropdown", "Motion", "motion"),
+    ("hash-filter-dropdown", "Hash", "hash"),
+    ("coverage-filter-dropdown", "Defensive Coverage", "coverage"),
+    ("front-filter-dropdown", "Defensive Front", "front"),
+]
 
 # Create Dash app instance (must exist before any @app.callback decorators)
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
 server = app.server
+# Timing for every callback and route (Prometheus text on /metrics), plus opt-in
+# profiling hooks (see profiling.py). The last wrapper installed runs innermost.
+metrics.instrument(app)
+# Callback results shared by all workers through one SQLite file (see resultcache.py)
+resultcache.instrument(app)
+profiling.instrument(app)
+# CSV / Excel / Parquet downloads of the current view (see exports.py)
+exports.register(app)
+# Versioned columnar snapshots for the offline opponent page (see snapshot.py)
+snapshot.register(app)
+# Read-only JSON API over the same queries (see api.py)
+api.register(app)
+# Arrow IPC / Parquet pulls of the cleaned tables for notebooks (see bulk.py)
+bulk.register(app)
+# Background replay of the most common views into the result cache, status on /warmup (see warmup.py)
+warmup.register(app)
+metrics.register_gauge(
+    "wmfb_process_memory_bytes", "Resident memory by kind (private_dirty = per-worker cost)",
+    lambda: {(("kind", k),): v for k, v in sharedmem.process_memory().items()}
+)
+metrics.register_gauge("wmfb_dataset_bytes", "Bytes per in-memory data structure (distinct = not shared with an earlier one)", memreport.metric_samples)
+metrics.register_gauge("wmfb_dataset_version_info", "Dataset version callbacks currently read", dataset.version_samples)
+metrics.register_gauge("wmfb_startup_seconds", "Boot time of this process by phase", startup.samples)
+metrics.register_gauge("wmfb_result_cache_bytes", "Shared result cache size (all workers)",
+                       lambda: {(("kind", k),): v for k, v in resultcache.stats().items()} if resultcache.enabled() else {})
+# Hot reload: one watcher thread per (forked) process, started on its first request
+server.before_request(dataset.start_watcher)
 
 # Serve the landing page and its files from the same process so Render can host one service.
 # This returns landing/index.html at root and serves landing/* and /assets/* files.
-import os
-from flask import send_from_directory, redirect
-
 LANDING_DIR = os.path.join(os.path.dirname(__file__), 'landing')
 ASSETS_DIR = os.path.join(os.path.dirname(__file__), 'assets')
 
@@ -73,11 +121,12 @@ app.layout = html.Div([
     html.Div(id='sidebar-open-btn'),
     html.Div(id='page-content-container')
 ])
+startup.lap("app_setup")
 
 
 # Richmond dashboard layout (clean, balanced)
 def richmond_layout():
-    # Header: logo placed directly next to the centered title for the Richmond page
+    # Header: logo placed directly next to the centered title for the opponent page
     header = html.Div([
         html.Div([
             html.Img(src="/assets/wm_football_logo.png", style={"height": "60px", "marginRight": "12px", "verticalAlign": "middle", "boxShadow": "0 2px 8px #FFC72C", "borderRadius": "8px"}),
@@ -91,6 +140,15 @@ def richmond_layout():
         ], style={"display": "flex", "alignItems": "center", "justifyContent": "center", "background": WM_DARK_BG, "padding": "12px 18px", "borderRadius": "12px", "boxShadow": "0 2px 12px #FFC72C"})
     ], style={"display": "flex", "justifyContent": "center", "marginBottom": "8px"})
 
+    # Opponent/season selector: every chart and table below reads this partition of the play store
+    plays = dataset.current().plays
+    opponent_row = html.Div(
+        [dcc.Dropdown(id="opponent-dropdown", options=plays.options(), value=plays.default_key, clearable=False,
+                      placeholder="Select Opponent", style={"width": "360px"}),
+         dcc.Link("Offline mode", href="/richmond/offline", style={"color": WM_GREEN, "marginLeft": "14px", "fontSize": "14px"})],
+        style={"display": "flex", "justifyContent": "center", "alignItems": "center", "marginBottom": "8px"}
+    )
+
     # Top row: graph (left) and OVO results table (right)
     # Graph column: put graph inside a green padded box so the graph is centered in its own box
     graph_col = dbc.Col([
@@ -129,11 +187,29 @@ def richmond_layout():
     # Bring dropdowns up so they sit directly beneath the graph area and take less vertical space
     dropdowns_col = dbc.Col([
         html.Div([
-            dcc.Dropdown(id="down-dropdown", placeholder="Select Down", clearable=True, style={"marginTop": "6px", "width": "240px"}),
-            dcc.Dropdown(id="distance-dropdown", placeholder="Select Distance", clearable=True, style={"marginTop": "6px", "width": "240px"}),
-            dcc.Dropdown(id="main-concept-dropdown", placeholder="Select Main Concept", clearable=True, style={"marginTop": "6px", "width": "240px"}),
-            dcc.Dropdown(id="tag-dropdown", placeholder="Select Tag", clearable=True, style={"marginTop": "6px", "width": "240px"}),
-            dcc.Dropdown(id="filter-dropdown", placeholder="Filter Plays", clearable=True, style={"marginTop": "6px", "width": "240px"}),
+            # Multi-select: values of one dropdown are OR'ed, different dropdowns AND'ed
+            dcc.Dropdown(id="down-dropdown", placeholder="Select Down", clearable=True, multi=True, style={"marginTop": "6px", "width": "240px"}),
+            dcc.Dropdown(id="distance-dropdown", placeholder="Select Distance", clearable=True, multi=True, style={"marginTop": "6px", "width": "240px"}),
+            # Range filters: distance buckets (and/or a custom yards-to-go range) and field zone
+            dcc.Dropdown(id="distance-bucket-dropdown", placeholder="Distance Range", clearable=True, multi=True, style={"marginTop": "6px", "width": "240px"},
+                         options=[{"label": "Short (1-3)", "value": "short"}, {"label": "Medium (4-6)", "value": "medium"},
+                                  {"label": "Long (7+)", "value": "long"}, {"label": "Custom", "value": "custom"}]),
+            html.Div(dcc.RangeSlider(id="distance-range-slider", min=1, max=DISTANCE_SLIDER_MAX, step=1, value=[1, 10],
+                                     marks={d: (f"{d}+" if d == DISTANCE_SLIDER_MAX else str(d)) for d in (1, 5, 10, 15, 20)}),
+                     id="distance-range-box", style={"display": "none"}),
+            dcc.Dropdown(id="field-zone-dropdown", placeholder="Field Zone", clearable=True, style={"marginTop": "6px", "width": "240px"},
+                         options=[{"label": "Backed Up (own 1-10)", "value": "backed-up"}, {"label": "Open Field", "value": "open-field"},
+                                  {"label": "Red Zone (20-in)", "value": "red-zone"}, {"label": "Goal Line (5-in)", "value": "goal-line"}]),
+            dcc.Dropdown(id="main-concept-dropdown", placeholder="Select Main Concept", clearable=True, multi=True, style={"marginTop": "6px", "width": "240px"}),
+            dcc.Dropdown(id="tag-dropdown", placeholder="Select Tag", clearable=True, multi=True, style={"marginTop": "6px", "width": "240px"}),
+            *[dcc.Dropdown(id=dropdown_id, placeholder=placeholder, clearable=True, multi=True, style={"marginTop": "6px", "width": "240px"})
+              for dropdown_id, placeholder, _ in INDEX_FILTER_DROPDOWNS],
+            dcc.Dropdown(id="filter-dropdown", placeholder="Filter Plays", clearable=True, multi=True, style={"marginTop": "6px", "width": "240px"}),
+            dcc.RadioItems(id="filter-match", value="any", inline=True,
+                           options=[{"label": " Any flag", "value": "any"}, {"label": " All flags", "value": "all"}],
+                           inputStyle={"marginLeft": "10px"}, style={"color": WM_GREEN, "fontSize": "14px", "marginTop": "4px"}),
+            dcc.Store(id="play-filters"),
+            html.Div(id="export-links", style={"marginTop": "8px", "fontSize": "14px"}),
 
             # Stacked percentage cards (Tendency / Efficiency / Explosiveness)
             html.Div([
@@ -194,6 +270,22 @@ def richmond_layout():
         ], width=12)
     ], style={'marginTop': '8px'})
 
+    # Heatmap of the whole coverage x concept matrix for the current filters
+    heatmap_row = dbc.Row([
+        dbc.Col([
+            html.Div([
+                dcc.RadioItems(id='coverage-heatmap-metric', value='Plays', inline=True,
+                               options=[{'label': f' {m}', 'value': m} for m in ('Plays', 'Success %', 'Explosive %')],
+                               inputStyle={'marginLeft': '14px'}),
+                dcc.RadioItems(id='coverage-heatmap-size', value=20, inline=True,
+                               options=[{'label': ' Top 20', 'value': 20}, {'label': ' Top 40', 'value': 40}, {'label': ' All', 'value': 0}],
+                               inputStyle={'marginLeft': '14px'}),
+            ], style={'display': 'flex', 'justifyContent': 'space-between', 'color': WM_GREEN, 'fontWeight': 'bold', 'marginBottom': '6px'}),
+            html.Div(dcc.Graph(id='coverage-heatmap', style={'height': '640px'}),
+                     style={'backgroundColor': 'white', 'padding': '6px', 'borderRadius': '10px', 'overflowX': 'auto'})
+        ], width=12)
+    ], style={'marginTop': '18px'})
+
     # Move the green footer bar above the dropdowns per user request
     footer_bar = html.Div(style={"height": "24px", "backgroundColor": WM_GREEN, "borderBottom": f"4px solid {WM_GOLD}", "borderTop": f"4px solid {WM_GOLD}", "marginTop": "18px"})
 
@@ -201,7 +293,7 @@ def richmond_layout():
     spacer_between = html.Div(style={'height': '26px'})
 
     # Yellow container that stretches up behind the title and contains the defensive dropdowns + results
-    yellow_container = html.Div([title_row, coverage_play_row, coverage_table_col], style={
+    yellow_container = html.Div([title_row, coverage_play_row, coverage_table_col, heatmap_row], style={
         'backgroundColor': WM_GOLD,
         'paddingTop': '24px',
         'paddingBottom': '36px',
@@ -214,7 +306,190 @@ def richmond_layout():
 
     main_row = html.Div([top_row, footer_bar, bottom_row, spacer_between, yellow_container])
 
-    return html.Div([header, main_row], style={"maxWidth": "1280px", "margin": "0 auto", "padding": "8px"})
+    return html.Div([header, opponent_row, main_row], style={"maxWidth": "1280px", "margin": "0 auto", "padding": "8px"})
+
+
+# Tendencies page: browse the breakdown engine (Football.PlaySet.breakdown) for any
+# combination of down, personnel, formation, motion, hash and concept
+def tendencies_layout():
+    plays = dataset.current().plays
+    header = html.Div(
+        html.H2("Offensive Tendencies", style={"color": WM_GOLD, "fontFamily": "Georgia, serif", "margin": 0, "letterSpacing": "2px"}),
+        style={"display": "flex", "justifyContent": "center", "background": WM_DARK_BG, "padding": "12px 18px", "borderRadius": "12px", "boxShadow": "0 2px 12px #FFC72C", "marginBottom": "12px"}
+    )
+    controls = dbc.Row([
+        dbc.Col(dcc.Dropdown(id="tendency-opponent-dropdown", options=plays.options(), value=plays.default_key, clearable=False,
+                             placeholder="Select Opponent"), width=4),
+        dbc.Col(dcc.Dropdown(id="tendency-dims-dropdown", options=[{"label": d, "value": d} for d in BREAKDOWN_DIMENSIONS],
+                             value=["DN", "OFF FORM"], multi=True, placeholder="Group by..."), width=6),
+        dbc.Col(dcc.Input(id="tendency-min-plays", type="number", min=1, value=3, placeholder="Min plays",
+                          style={"width": "100%", "height": "36px"}), width=2),
+    ], style={"marginBottom": "12px"})
+    table = html.Div(id="tendency-table-output", style={
+        "backgroundColor": "#FFF", "border": f"2px solid {WM_GOLD}", "borderRadius": "12px", "padding": "12px",
+        "boxShadow": "0 2px 8px #FFC72C", "minHeight": "420px"
+    })
+    return html.Div([header, controls, table], style={"maxWidth": "1280px", "margin": "0 auto", "padding": "8px"})
+
+
+# Defensive tendencies page: blitz / stunt rates, rushers and fronts per down, distance
+# bucket, field zone and offensive personnel (Football.defense_table over PlaySet.defense)
+def defense_layout():
+    plays = dataset.current().plays
+    header = html.Div(
+        html.H2("Defensive Tendencies", style={"color": WM_GOLD, "fontFamily": "Georgia, serif", "margin": 0, "letterSpacing": "2px"}),
+        style={"display": "flex", "justifyContent": "center", "background": WM_DARK_BG, "padding": "12px 18px", "borderRadius": "12px", "boxShadow": "0 2px 12px #FFC72C", "marginBottom": "12px"}
+    )
+    labels = {"DN": "Down", "DIST BUCKET": "Distance (short/medium/long)", "FIELD ZONE": "Field zone", "PERSON": "Offensive personnel"}
+    controls = dbc.Row([
+        dbc.Col(dcc.Dropdown(id="defense-opponent-dropdown", options=plays.options(), value=plays.default_key, clearable=False,
+                             placeholder="Select Opponent"), width=4),
+        dbc.Col(dcc.Dropdown(id="defense-dims-dropdown", options=[{"label": labels[d], "value": d} for d in DEFENSE_DIMENSIONS],
+                             value=["DN"], multi=True, placeholder="Group by..."), width=6),
+        dbc.Col(dcc.Input(id="defense-min-plays", type="number", min=1, value=3, placeholder="Min plays",
+                          style={"width": "100%", "height": "36px"}), width=2),
+    ], style={"marginBottom": "12px"})
+    box = {"backgroundColor": "#FFF", "border": f"2px solid {WM_GOLD}", "borderRadius": "12px", "padding": "12px",
+           "boxShadow": "0 2px 8px #FFC72C", "marginBottom": "12px"}
+    table = html.Div(id="defense-table-output", style=dict(box, minHeight="240px"))
+    graph = html.Div(dcc.Graph(id="defense-front-graph", style={"height": "420px"}), style=box)
+    return html.Div([header, controls, table, graph], style={"maxWidth": "1280px", "margin": "0 auto", "padding": "8px"})
+
+
+# W&M vs opponent concept comparison: spring practice efficiency next to the opponent's
+# success rate for the same concept and down (queries.concept_comparison); the table is
+# paged on the server, so only the rows on screen are sent
+COMPARE_PAGE_SIZE = 25
+
+
+def compare_layout():
+    plays = dataset.current().plays
+    header = html.Div(
+        html.H2("W&M vs Opponent Concepts", style={"color": WM_GOLD, "fontFamily": "Georgia, serif", "margin": 0, "letterSpacing": "2px"}),
+        style={"display": "flex", "justifyContent": "center", "background": WM_DARK_BG, "padding": "12px 18px", "borderRadius": "12px", "boxShadow": "0 2px 12px #FFC72C", "marginBottom": "12px"}
+    )
+    controls = dbc.Row([
+        dbc.Col(dcc.Dropdown(id="compare-opponent-dropdown", options=plays.options(), value=plays.default_key, clearable=False,
+                             placeholder="Select Opponent"), width=3),
+        dbc.Col(dcc.Dropdown(id="compare-down-dropdown", options=[{"label": d, "value": d} for d in DOWN_NAMES], multi=True,
+                             placeholder="Select Down"), width=2),
+        dbc.Col(dcc.Dropdown(id="compare-concept-dropdown", multi=True, placeholder="Select Main Concept"), width=4),
+        dbc.Col(dcc.Input(id="compare-min-plays", type="number", min=1, value=None, placeholder="Min plays",
+                          style={"width": "100%", "height": "36px"}), width=1),
+        dbc.Col(dcc.Checklist(id="compare-both", options=[{"label": " Run by both", "value": "both"}], value=["both"],
+                              style={"color": WM_GOLD, "marginTop": "6px"}), width=2),
+    ], style={"marginBottom": "12px"})
+    table = dash_table.DataTable(
+        id="compare-table",
+        columns=[{'name': c, 'id': c} for c in COMPARISON_COLUMNS],
+        page_action='custom',
+        page_current=0,
+        page_size=COMPARE_PAGE_SIZE,
+        style_table={'overflowX': 'auto'},
+        style_cell={'fontSize': '14px', 'padding': '6px', 'textAlign': 'center', 'fontFamily': 'Georgia, serif', 'color': 'black'},
+        style_header={'backgroundColor': WM_GOLD, 'color': WM_GREEN, 'fontWeight': 'bold'},
+        style_data_conditional=[
+            {'if': {'filter_query': '{Efficiency Gap} > 0', 'column_id': 'Efficiency Gap'}, 'color': WM_GREEN, 'fontWeight': 'bold'},
+            {'if': {'filter_query': '{Efficiency Gap} < 0', 'column_id': 'Efficiency Gap'}, 'color': '#B00020', 'fontWeight': 'bold'},
+        ]
+    )
+    box = html.Div([html.Div(id="compare-summary", style={"color": WM_GREEN, "fontWeight": "bold", "marginBottom": "6px"}), table], style={
+        "backgroundColor": "#FFF", "border": f"2px solid {WM_GOLD}", "borderRadius": "12px", "padding": "12px",
+        "boxShadow": "0 2px 8px #FFC72C", "minHeight": "420px"
+    })
+    return html.Div([header, controls, box], style={"maxWidth": "1280px", "margin": "0 auto", "padding": "8px"})
+
+# Offline opponent page: the same down / distance / concept / result filters as the
+# opponent page, answered in the browser (assets/clientside.js) from a columnar
+# snapshot of the partition fetched once per data version (see snapshot.py)
+def offline_layout():
+    plays = dataset.current().plays
+    header = html.Div(
+        html.H2("Offensive Concept Analysis (offline)", style={"color": WM_GOLD, "fontFamily": "Georgia, serif", "margin": 0, "letterSpacing": "2px"}),
+        style={"display": "flex", "justifyContent": "center", "background": WM_DARK_BG, "padding": "12px 18px", "borderRadius": "12px", "boxShadow": "0 2px 12px #FFC72C", "marginBottom": "12px"}
+    )
+    dropdown_style = {"marginTop": "6px", "width": "240px"}
+    controls = html.Div([
+        dcc.Dropdown(id="opponent-dropdown-client", options=plays.options(), value=plays.default_key, clearable=False,
+                     placeholder="Select Opponent", style={"width": "360px"}),
+        dcc.Dropdown(id="down-dropdown-client", options=[{"label": d, "value": d} for d in DOWN_NAMES], placeholder="Select Down",
+                     clearable=True, multi=True, style=dropdown_style),
+        dcc.Dropdown(id="distance-dropdown-client", placeholder="Select Distance", clearable=True, multi=True, style=dropdown_style),
+        dcc.Dropdown(id="main-concept-dropdown-client", placeholder="Select Main Concept", clearable=True, multi=True, style=dropdown_style),
+        dcc.Dropdown(id="tag-dropdown-client", placeholder="Select Tag", clearable=True, multi=True, style=dropdown_style),
+        dcc.Dropdown(id="filter-dropdown-client", placeholder="Filter Plays", clearable=True, multi=True, style=dropdown_style,
+                     options=[{"label": "Efficient", "value": "efficient"}, {"label": "Non-Efficient", "value": "nonefficient"},
+                              {"label": "Explosive", "value": "explosive"}, {"label": "Non-Explosive", "value": "nonexplosive"}]),
+        # /snapshot/<version>/ of the data this page was rendered from, and the fetched snapshot
+        dcc.Store(id="snapshot-base-client", data=snapshot.base_url()),
+        dcc.Store(id="snapshot-client"),
+        html.Div([
+            dbc.Card([dbc.CardBody([html.H6(title, className="text-center"), html.H3(id=card_id, className="text-center")])],
+                     style={"backgroundColor": "#FFF8E1", "border": "2px solid #006341", "marginBottom": "8px"})
+            for title, card_id in (("Tendency", "tendency-value-client"), ("Efficiency %", "efficiency-value-client"),
+                                   ("Explosiveness %", "explosive-value-client"))
+        ], style={"marginTop": "12px", "width": "100%"}),
+    ], style={"paddingLeft": "18px"})
+    graph = html.Div(
+        html.Div(dcc.Graph(id="play-graph-client", style={"height": "440px", "width": "100%"}),
+                 style={"backgroundColor": "white", "padding": "6px", "borderRadius": "6px"}),
+        style={"backgroundColor": WM_GREEN, "padding": "8px", "borderRadius": "10px", "border": f"4px solid {WM_GOLD}"}
+    )
+    table = dash_table.DataTable(
+        id="table-output-client",
+        columns=[{'name': 'OVO RESULT', 'id': 'OVO RESULT'}, {'name': 'Count', 'id': 'Count'}, {'name': '%', 'id': 'Percentage'}],
+        page_size=10,
+        style_table={'maxHeight': '480px', 'overflowY': 'auto', 'marginBottom': '20px'},
+        style_cell={'fontSize': '14px', 'padding': '6px', 'textAlign': 'left', 'color': 'black', 'backgroundColor': 'white', 'fontFamily': 'Georgia, serif'},
+        style_header={'backgroundColor': WM_GOLD, 'color': WM_GREEN, 'fontWeight': 'bold', 'fontFamily': 'Georgia, serif'}
+    )
+    table_box = html.Div(table, style={"backgroundColor": "#FFF", "border": f"2px solid {WM_GOLD}", "borderRadius": "12px", "padding": "12px",
+                                      "boxShadow": "0 2px 8px #FFC72C", "maxHeight": "520px", "overflowY": "auto"})
+    body = dbc.Row([dbc.Col(controls, width=4), dbc.Col([graph, html.Div(style={"height": "12px"}), table_box], width=8)])
+    return html.Div([header, body], style={"maxWidth": "1280px", "margin": "0 auto", "padding": "8px"})
+
+
+# W&M concept page: our own spring tendencies with the opponent page's down / distance /
+# concept / result filters (callbacks under "William & Mary Callbacks")
+def wm_concepts_layout():
+    header = html.Div(
+        html.H2("W&M Concept Analysis", style={"color": WM_GOLD, "fontFamily": "Georgia, serif", "margin": 0, "letterSpacing": "2px"}),
+        style={"display": "flex", "justifyContent": "center", "background": WM_DARK_BG, "padding": "12px 18px", "borderRadius": "12px", "boxShadow": "0 2px 12px #FFC72C", "marginBottom": "12px"}
+    )
+    dropdown_style = {"marginTop": "6px", "width": "240px"}
+    box = {"backgroundColor": "#FFF", "color": WM_GOLD, "border": f"2px solid {WM_GOLD}", "borderRadius": "12px", "padding": "12px",
+           "boxShadow": "0 2px 8px #FFC72C", "maxHeight": "520px", "overflowY": "auto"}
+    graph = html.Div(
+        html.Div(dcc.Graph(id="play-graph-wm", style={"height": "440px", "width": "100%"}),
+                 style={"backgroundColor": "white", "padding": "6px", "borderRadius": "6px"}),
+        style={"backgroundColor": WM_GREEN, "padding": "8px", "borderRadius": "10px", "border": f"4px solid {WM_GOLD}"}
+    )
+    top_row = dbc.Row([
+        dbc.Col(graph, width=8, style={"padding": "12px"}),
+        dbc.Col(html.Div(id="result-table-output-wm", style=box), width=4, style={"padding": "12px"}),
+    ], align="start")
+    controls = html.Div([
+        dcc.Dropdown(id="down-dropdown-wm", options=[{"label": d, "value": d} for d in DOWN_NAMES], placeholder="Select Down",
+                     clearable=True, style=dropdown_style),
+        dcc.Dropdown(id="distance-dropdown-wm", placeholder="Select Distance", clearable=True, style=dropdown_style),
+        dcc.Dropdown(id="main-concept-dropdown-wm", placeholder="Select Main Concept", clearable=True, style=dropdown_style),
+        dcc.Dropdown(id="tag-dropdown-wm", placeholder="Select Tag", clearable=True, style=dropdown_style),
+        dcc.Dropdown(id="filter-dropdown-wm", placeholder="Filter Plays", clearable=True, style=dropdown_style,
+                     options=[{"label": "Efficient", "value": "efficient"}, {"label": "Non-Efficient", "value": "nonefficient"},
+                              {"label": "Explosive", "value": "explosive"}, {"label": "Non-Explosive", "value": "nonexplosive"}]),
+        html.Div([
+            dbc.Card([dbc.CardBody([html.H6(title, className="text-center"), html.H3(id=card_id, className="text-center")])],
+                     style={"backgroundColor": "#FFF8E1", "border": "2px solid #006341", "marginBottom": "8px"})
+            for title, card_id in (("Tendency", "tendency-value-wm"), ("Efficiency %", "efficiency-value-wm"),
+                                   ("Explosiveness %", "explosive-value-wm"))
+        ], style={"marginTop": "12px", "width": "100%"}),
+    ], style={"paddingLeft": "18px"})
+    footer_bar = html.Div(style={"height": "24px", "backgroundColor": WM_GREEN, "borderBottom": f"4px solid {WM_GOLD}", "borderTop": f"4px solid {WM_GOLD}", "marginTop": "18px"})
+    bottom_row = dbc.Row([
+        dbc.Col(controls, width=4, style={"padding": "12px"}),
+        dbc.Col(html.Div(id="table-output-wm", style=dict(box, minHeight="420px")), width=8, style={"padding": "18px"}),
+    ], style={"alignItems": "flex-start"})
+    return html.Div([header, top_row, footer_bar, bottom_row], style={"maxWidth": "1280px", "margin": "0 auto", "padding": "8px"})
 
 @app.callback(
     Output('player-totals-table-wm', 'children'),
@@ -226,83 +501,8 @@ def richmond_layout():
     Input('player-dropdown-wm', 'value')
 )
 def update_player_stats(position, player):
-    import pandas as pd
-    df = WM_clean.copy()
-
-    # Ensure jersey / QB numeric and trim R/P
-    for col in ["JERSEY #", "QB"]:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-    if "R/P" in df.columns:
-        df["R/P"] = df["R/P"].astype(str).str.strip()
-
-    # Extract digits from "JERSEY #" into numeric helper column used for matching
-    if "JERSEY #" in df.columns:
-        jersey_digits = df["JERSEY #"].astype(str).str.extract(r'(\d+)')[0]
-        df["JERSEY_NUM"] = pd.to_numeric(jersey_digits, errors="coerce")
-    else:
-        df["JERSEY_NUM"] = pd.NA
-
-    # Helper to normalize dropdown names (e.g., 'Garrett_Robertson' -> 'Garrett Robertson')
-    def _normalize_player_key(s: str) -> str:
-        s = str(s or "").strip().replace("_", " ")
-        return " ".join(s.split())
-
-    # Known jersey map (include explicit alias)
-    jersey_map = {
-        "Damian Harris": 4, "Tyler Hughes": 6, "Noah Brannock": 8, "Joey Tomasso": 17,
-        "Carson Jenkins": 14, "Derrick Gurley": 15, "George White": 16, "Leonte Oulahi": 13,
-        "Isaiah Lemmond": 18, "Jor'dyn Whitelaw": 26, "Jack Zamer": 30, "Jack Reuter": 31,
-        "Josh Miller": 33, "Quinn Devlin": 37, "Tyson Garrett": 41, "Armon Wright": 80,
-        "Garrett Robertson": 81, "Garret Robertson": 81,  # alias: common single-t typo maps to 81
-        "Jack Baumgartner": 82, "Nasir Mahmoud": 83, "Joseph Johnson": 84, "Trey McDonald": 85,
-        "Jackson Blee": 86, "Sean McElwain": 87, "Owen Copeland": 88, "Haven Mullins": 89
-    }
-
-    # Robust jersey resolver: direct, case-insensitive, then fuzzy match
-    def _resolve_jersey(name_raw: str):
-        import difflib
-        name = _normalize_player_key(name_raw)
-        # direct/alias match
-        num = jersey_map.get(name)
-        if num is not None:
-            return num
-        # case-insensitive match
-        lower = name.lower()
-        for k, v in jersey_map.items():
-            if k.lower() == lower:
-                return v
-        # fuzzy match for minor typos
-        candidates = list(jersey_map.keys())
-        match = difflib.get_close_matches(name, candidates, n=1, cutoff=0.85)
-        if match:
-            return jersey_map.get(match[0])
-        return None
-
-    # Normalize incoming player value and strip optional "(...)" suffix
-    player = str(player)
-    if '(' in player:
-        name = player.split(' (')[0]
-    else:
-        name = player
-    name = _normalize_player_key(name)
-
-    # Use numeric helper JERSEY_NUM for comparisons
-    if position == "QB":
-        jersey = _resolve_jersey(name)
-        df_player = df[(df["QB"] == jersey) & ((df["R/P"] == "P") | ((df["R/P"] == "R") & (df["JERSEY_NUM"] == jersey)))]
-    elif position == "RB":
-        jersey = _resolve_jersey(name)
-        df_player = df[df["JERSEY_NUM"] == jersey]
-    elif position == "WR_TE":
-        jersey = _resolve_jersey(name)
-        # Special case for Leonte Oulahi: always use #13
-        if name.lower() == "leonte oulahi":
-            df_player = df[df["JERSEY_NUM"] == 13]
-        else:
-            df_player = df[df["JERSEY_NUM"] == jersey]
-    else:
-        df_player = pd.DataFrame()
+    wm = dataset.current().wm
+    df_player = player_plays(position, player)
     # Fallback: if no data, show message
     if df_player.empty:
         # Show empty tables/cards if no data found
@@ -325,7 +525,7 @@ def update_player_stats(position, player):
         # Always show the plays table with all columns, but no data
         empty_plays_table = dash_table.DataTable(
             data=[],
-            columns=[{"name": c, "id": c} for c in WM_data_df.columns],
+            columns=[{"name": c, "id": c} for c in wm.columns],
             page_size=10,
             style_table={"width": "100%", "marginBottom": "10px", "maxHeight": "350px", "overflowY": "auto"},
             style_cell={"fontSize": "13px", "padding": "5px", "textAlign": "center"}
@@ -364,36 +564,7 @@ def update_player_stats(position, player):
         style_cell={"fontSize": "14px", "padding": "6px", "textAlign": "center"}
     )
     # All plays table (after filtering and dropping image-like columns)
-    df_for_table = df_player.copy()
-    # Drop any column that contains image filenames, asset paths, or raw <img> HTML
-    img_like_patterns = [r"<img", r"\.webp", r"/assets/", r"\.jpg", r"data:image/"]
-    cols_to_drop = []
-    for col in df_for_table.columns:
-        try:
-            as_str = df_for_table[col].astype(str)
-            if any(as_str.str.contains(pat, na=False).any() for pat in img_like_patterns):
-                cols_to_drop.append(col)
-        except Exception:
-            # If conversion fails, be conservative and skip dropping
-            continue
-    if cols_to_drop:
-        df_for_table = df_for_table.drop(columns=cols_to_drop)
-    # Group rows together by OVO RESULT for easier review:
-    # collapse families like R* and C* so they render contiguously, then stable sort
-    if 'OVO RESULT' in df_for_table.columns:
-        def _group_result(series: pd.Series) -> pd.Series:
-            s = series.astype(str).str.strip().str.upper()
-            # Collapse families: any string starting with 'R' -> 'R'; starting with 'C' -> 'C'
-            s = s.str.replace(r'^\s*R.*$', 'R', regex=True)
-            s = s.str.replace(r'^\s*C.*$', 'C', regex=True)
-            return s
-        df_for_table['__RES_G__'] = _group_result(df_for_table['OVO RESULT'])
-        by_cols = ['__RES_G__', 'OVO RESULT'] + (['OVO CONCEPT'] if 'OVO CONCEPT' in df_for_table.columns else [])
-        df_for_table = df_for_table.sort_values(
-            by=by_cols,
-            key=lambda s: s.astype(str).str.strip().str.upper(),
-            kind='mergesort'
-        ).drop(columns='__RES_G__')
+    df_for_table = player_plays_table(df_player)
 
     plays_table = dash_table.DataTable(
         data=df_for_table.to_dict('records'),
@@ -413,20 +584,10 @@ def update_player_stats(position, player):
     Input('position-dropdown-wm', 'value')
 )
 def update_player_dropdown_options(position):
-    # Use the player list from the assets folder (photo filenames)
-    import os
-    base_path = os.path.join(os.path.dirname(__file__), 'assets', 'Players Photos')
+    # Use the player list from the assets folder (photo filenames, see queries.roster)
     if not position:
         return []
-    position_folder = position if position != 'WR_TE' else 'WR_TE'
-    folder_path = os.path.join(base_path, position_folder)
-    if not os.path.exists(folder_path):
-        return []
-    # List .webp files and strip extension
-    players = [f[:-5] for f in os.listdir(folder_path) if f.endswith('.webp')]
-    # Sort alphabetically
-    players.sort()
-    return [{'label': name, 'value': name} for name in players]
+    return [{'label': name, 'value': name} for name in roster().get(position, [])]
 
 # Callback for sidebar close button and open button
 @app.callback(
@@ -456,7 +617,6 @@ def toggle_sidebar(n_close, n_open, is_open):
     Input('url', 'pathname')
 )
 def render_sidebar_and_content(is_open, pathname):
-    from layout import sidebar, spring_layout
     sidebar_component = sidebar(is_open)
     open_btn_style = {
         "fontSize": "28px", "color": "#FFC72C", "background": "#23272A", "border": "2px solid #FFC72C", "borderRadius": "8px", "width": "44px", "height": "44px", "boxShadow": "0 0 8px #23272A", "cursor": "pointer", "position": "fixed", "top": "18px", "left": "18px", "zIndex": 4000,
@@ -475,6 +635,16 @@ def render_sidebar_and_content(is_open, pathname):
         content = spring_layout()
     elif pathname == '/richmond':
         content = richmond_layout()
+    elif pathname == '/tendencies':
+        content = tendencies_layout()
+    elif pathname == '/defense':
+        content = defense_layout()
+    elif pathname == '/richmond/offline':
+        content = offline_layout()
+    elif pathname == '/wm/concepts':
+        content = wm_concepts_layout()
+    elif pathname == '/compare':
+        content = compare_layout()
     else:
         content = spring_layout()
     return sidebar_component, open_btn, html.Div(content, id='page-content')
@@ -488,6 +658,16 @@ def display_page(pathname):
         return spring_layout()
     elif pathname == '/richmond':
         return richmond_layout()
+    elif pathname == '/tendencies':
+        return tendencies_layout()
+    elif pathname == '/defense':
+        return defense_layout()
+    elif pathname == '/richmond/offline':
+        return offline_layout()
+    elif pathname == '/wm/concepts':
+        return wm_concepts_layout()
+    elif pathname == '/compare':
+        return compare_layout()
     else:
         return spring_layout()
 
@@ -497,24 +677,14 @@ def display_page(pathname):
     Input("main-concept-dropdown", "value"),
     Input("down-dropdown", "value"),
     Input("tag-dropdown", "value"),
+    Input('play-filters', 'data'),
+    Input('opponent-dropdown', 'value')
 )
-def update_tag_options(main_concept, down, current_tag):
-    if not main_concept:
-        return [], None
-    df = data_sources.get(down)
-    if df is None or df.empty:
-        df = pd.concat(data_sources.values(), ignore_index=True)
-    concepts = df["OVO CONCEPT"].dropna().astype(str).unique()
-    mc_norm = _norm(main_concept)
-    # Allow "MAIN/" and "MAIN " (space) tag prefixes
-    tags = sorted([
-        c for c in concepts
-        if _norm(c).startswith(mc_norm + '/') or _norm(c).startswith(mc_norm + ' ')
-    ])
+def update_tag_options(main_concept, down, current_tag, play_filters, opponent):
+    # Allow "MAIN/" and "MAIN " (space) tag prefixes of any selected main concept
+    tags = concept_tags(opponent, main_concept, down, play_filters)
     options = [{"label": tag, "value": tag} for tag in tags]
-    if current_tag not in tags:
-        current_tag = None
-    return options, current_tag
+    return options, [t for t in as_list(current_tag) if t in tags]
 
 # ...existing code...
 
@@ -527,106 +697,14 @@ def update_tag_options(main_concept, down, current_tag):
     Input('main-concept-dropdown', 'value'),
     Input('tag-dropdown', 'value')
     ,
-    Input('filter-dropdown', 'value')
+    Input('filter-dropdown', 'value'),
+    Input('play-filters', 'data'),
+    Input('opponent-dropdown', 'value')
 )
-def update_stat_cards(down, distance, main_concept, tag, filter_value):
-    # Compute all three cards from the same filtered dataset used by the tables/graph
-    # but intentionally do NOT apply the 'efficient' filter when computing these cards
-    # (so explosiveness doesn't disappear when the user selects Efficient)
-    # Load the correct data source for the selected down
-    if down in data_sources:
-        df = data_sources[down].copy()
-    else:
-        df = pd.concat(data_sources.values(), ignore_index=True)
-
-    # Build a mask that applies concept/tag and distance filters. We'll apply the
-    # additional filter-dropdown condition only when it is NOT 'efficient'.
-    mask = pd.Series(True, index=df.index)
-    conc_col = df['OVO CONCEPT']
-    if tag:
-        mask &= conc_col.astype(str).str.strip().str.upper() == _norm(tag)
-    elif main_concept:
-        mask &= _main_concept_mask(conc_col, main_concept)
-    if distance:
-        mask &= df['DIST'] == distance
-
-    # Prepare a second mask to apply filter-dropdown (but skip when filter_value == 'efficient')
-    filter_mask = pd.Series(True, index=df.index)
-    if filter_value and filter_value != 'efficient':
-        if filter_value == 'nonefficient':
-            if 'Is_Successful' in df.columns:
-                filter_mask &= df['Is_Successful'] == 0
-            elif 'Efficient' in df.columns:
-                filter_mask &= df['Efficient'] == 0
-        elif filter_value == 'explosive':
-            if 'Is_Explosive' in df.columns:
-                filter_mask &= df['Is_Explosive'] == 1
-            elif 'Explosive' in df.columns:
-                filter_mask &= df['Explosive'] == 1
-        elif filter_value == 'nonexplosive':
-            if 'Is_Explosive' in df.columns:
-                filter_mask &= df['Is_Explosive'] == 0
-            elif 'Explosive' in df.columns:
-                filter_mask &= df['Explosive'] == 0
-
-    # Combine masks: concept/distance always applied; filter_mask applied only when not 'efficient'
-    combined_mask = mask & filter_mask
-    filtered_df = df[combined_mask]
-
-    # If no concept/main selected then return blanks
-    if not tag and not main_concept:
-        if down:
-            # Use df (already down-filtered if a per-down source was selected) to compute totals
-            total_plays = len(df[df['DIST'] == distance]) if distance else len(df)
-            plays_for_concept = len(df)
-            if plays_for_concept == 0 or total_plays == 0:
-                return "–", "–", "–"
-            # compute totals across df
-            if 'Is_Successful' in df.columns:
-                efficient_count = int(df['Is_Successful'].sum())
-            elif 'Efficient' in df.columns:
-                efficient_count = int(df['Efficient'].sum())
-            else:
-                efficient_count = 0
-            if 'Is_Explosive' in df.columns:
-                explosive_count = int(df['Is_Explosive'].sum())
-            elif 'Explosive' in df.columns:
-                explosive_count = int(df['Explosive'].sum())
-            else:
-                explosive_count = 0
-            tendency_val = f"{(plays_for_concept / total_plays * 100):.1f}%" if total_plays > 0 else "–"
-            efficiency_val = f"{(efficient_count / plays_for_concept * 100):.1f}%" if plays_for_concept > 0 else "–"
-            explosive_val = f"{(explosive_count / plays_for_concept * 100):.1f}%" if plays_for_concept > 0 else "–"
-            return tendency_val, efficiency_val, explosive_val
-        else:
-            return "–", "–", "–"
-
-    # Compute denominator: use same logic as other callbacks (if distance is selected, denominator is plays at that distance)
-    total_plays = len(df[df['DIST'] == distance]) if distance else len(df)
-    plays_for_concept = len(filtered_df)
-    if plays_for_concept == 0 or total_plays == 0:
-        return "–", "–", "–"
-
-    # Efficiency: prefer Is_Successful, then Efficient
-    if 'Is_Successful' in filtered_df.columns:
-        efficient_count = int(filtered_df['Is_Successful'].sum())
-    elif 'Efficient' in filtered_df.columns:
-        efficient_count = int(filtered_df['Efficient'].sum())
-    else:
-        efficient_count = 0
-
-    # Explosive: prefer Is_Explosive, then Explosive
-    if 'Is_Explosive' in filtered_df.columns:
-        explosive_count = int(filtered_df['Is_Explosive'].sum())
-    elif 'Explosive' in filtered_df.columns:
-        explosive_count = int(filtered_df['Explosive'].sum())
-    else:
-        explosive_count = 0
-
-    tendency_val = f"{(plays_for_concept / total_plays * 100):.1f}%" if total_plays > 0 else "–"
-    efficiency_val = f"{(efficient_count / plays_for_concept * 100):.1f}%" if plays_for_concept > 0 else "–"
-    explosive_val = f"{(explosive_count / plays_for_concept * 100):.1f}%" if plays_for_concept > 0 else "–"
-    return tendency_val, efficiency_val, explosive_val
+def update_stat_cards(down, distance, main_concept, tag, filter_value, play_filters, opponent):
+    # Compute all three cards from the same filters used by the tables/graph
+    # (see queries.stat_cards for why the 'efficient' flag is left out)
+    return stat_cards(opponent, down, distance, main_concept, tag, filter_value, play_filters)
 
 
 @app.callback(
@@ -635,41 +713,12 @@ def update_stat_cards(down, distance, main_concept, tag, filter_value):
     Input('distance-dropdown', 'value'),
     Input('main-concept-dropdown', 'value'),
     Input('tag-dropdown', 'value'),
-    Input('filter-dropdown', 'value')
+    Input('filter-dropdown', 'value'),
+    Input('play-filters', 'data'),
+    Input('opponent-dropdown', 'value')
 )
-def update_table(down, distance, main_concept, tag, filter_value):
-    if down in data_sources:
-        df = data_sources[down]
-    else:
-        df = pd.concat(data_sources.values(), ignore_index=True)
-    conc_col = df['OVO CONCEPT']
-    if tag:
-        df = df[conc_col.astype(str).str.strip().str.upper() == _norm(tag)]
-    elif main_concept:
-        df = df[_main_concept_mask(conc_col, main_concept)]
-    if distance:
-        df = df[df['DIST'] == distance]
-    # Apply filter dropdown
-    if filter_value == 'efficient':
-        if 'Is_Successful' in df.columns:
-            df = df[df['Is_Successful'] == 1]
-        elif 'Efficient' in df.columns:
-            df = df[df['Efficient'] == 1]
-    elif filter_value == 'nonefficient':
-        if 'Is_Successful' in df.columns:
-            df = df[df['Is_Successful'] == 0]
-        elif 'Efficient' in df.columns:
-            df = df[df['Efficient'] == 0]
-    elif filter_value == 'explosive':
-        if 'Is_Explosive' in df.columns:
-            df = df[df['Is_Explosive'] == 1]
-        elif 'Explosive' in df.columns:
-            df = df[df['Explosive'] == 1]
-    elif filter_value == 'nonexplosive':
-        if 'Is_Explosive' in df.columns:
-            df = df[df['Is_Explosive'] == 0]
-        elif 'Explosive' in df.columns:
-            df = df[df['Explosive'] == 0]
+def update_table(down, distance, main_concept, tag, filter_value, play_filters, opponent):
+    df = select_plays(opponent, down, distance, main_concept, tag, filter_value, play_filters)
     if df.empty:
         return html.Div("No matching plays found.", className="text-warning", style={"color": WM_GREEN})
     # Aggregate OVO RESULT counts and percentages for the OVO Results table
@@ -721,30 +770,13 @@ def update_table(down, distance, main_concept, tag, filter_value):
     Input('distance-dropdown', 'value'),
     Input('main-concept-dropdown', 'value'),
     Input('tag-dropdown', 'value'),
-    Input('filter-dropdown', 'value')
+    Input('filter-dropdown', 'value'),
+    Input('play-filters', 'data'),
+    Input('opponent-dropdown', 'value')
 )
-def update_dataframe(down, distance, main_concept, tag, filter_value):
+def update_dataframe(down, distance, main_concept, tag, filter_value, play_filters, opponent):
     # Provide the full filtered dataframe for the bottom-right display
-    if down in data_sources:
-        df = data_sources[down]
-    else:
-        df = pd.concat(data_sources.values(), ignore_index=True)
-    conc_col = df['OVO CONCEPT']
-    if tag:
-        df = df[conc_col.astype(str).str.strip().str.upper() == _norm(tag)]
-    elif main_concept:
-        df = df[_main_concept_mask(conc_col, main_concept)]
-    if distance:
-        df = df[df['DIST'] == distance]
-    # Apply filter dropdown
-    if filter_value == 'efficient':
-        df = df[df['Is_Successful'] == 1]
-    elif filter_value == 'nonefficient':
-        df = df[df['Is_Successful'] == 0]
-    elif filter_value == 'explosive':
-        df = df[df['Is_Explosive'] == 1]
-    elif filter_value == 'nonexplosive':
-        df = df[df['Is_Explosive'] == 0]
+    df = select_plays(opponent, down, distance, main_concept, tag, filter_value, play_filters)
 
     if df.empty:
         return html.Div("No matching plays found.", className="text-warning", style={"color": WM_GREEN})
@@ -766,6 +798,122 @@ def update_dataframe(down, distance, main_concept, tag, filter_value):
 
 
 
+@app.callback(
+    Output('tendency-table-output', 'children'),
+    Input('tendency-dims-dropdown', 'value'),
+    Input('tendency-min-plays', 'value'),
+    Input('tendency-opponent-dropdown', 'value')
+)
+def update_tendency_table(dims, min_plays, opponent):
+    if not dims:
+        return html.Div("Choose at least one column to group by.", style={"color": WM_GREEN})
+    tally = dataset.current().plays.get(opponent).tally(dims)
+    metrics.record_rows(len(tally))
+    df = breakdown_table(tally, dims)
+    if min_plays:
+        df = df[df['Plays'] >= min_plays]
+    if df.empty:
+        return html.Div("No matching plays found.", className="text-warning", style={"color": WM_GREEN})
+    # Blank values (e.g. no motion) read better as a label
+    df = df.copy()
+    for col in dims:
+        df[col] = df[col].astype(str).str.strip().replace('', '(none)')
+    for col in ['Share %', 'Success %', 'Explosive %']:
+        df[col] = df[col].round(1)
+    return dash_table.DataTable(
+        data=df.to_dict('records'),
+        columns=[{'name': c, 'id': c} for c in df.columns],
+        sort_action='native',
+        filter_action='native',
+        page_size=20,
+        style_table={'overflowX': 'auto'},
+        style_cell={'fontSize': '14px', 'padding': '6px', 'textAlign': 'center', 'fontFamily': 'Georgia, serif', 'color': 'black'},
+        style_header={'backgroundColor': WM_GOLD, 'color': WM_GREEN, 'fontWeight': 'bold'}
+    )
+
+
+@app.callback(
+    Output('defense-table-output', 'children'),
+    Output('defense-front-graph', 'figure'),
+    Input('defense-dims-dropdown', 'value'),
+    Input('defense-min-plays', 'value'),
+    Input('defense-opponent-dropdown', 'value')
+)
+def update_defense_tendencies(dims, min_plays, opponent):
+    import plotly.express as px
+    empty_fig = px.bar(pd.DataFrame({"x": [], "y": []}), x="x", y="y")
+    empty_fig.update_layout(paper_bgcolor="white", plot_bgcolor="white")
+    if not dims:
+        return html.Div("Choose at least one column to group by.", style={"color": WM_GREEN}), empty_fig
+    dims = [d for d in DEFENSE_DIMENSIONS if d in dims]
+    tally = dataset.current().plays.get(opponent).defense
+    metrics.record_rows(len(tally))
+    df = defense_table(tally, dims)
+    if min_plays:
+        df = df[df['Plays'] >= min_plays]
+    if df.empty:
+        return html.Div("No matching plays found.", className="text-warning", style={"color": WM_GREEN}), empty_fig
+    df = df.copy()
+    for col in dims:
+        df[col] = df[col].astype(str).str.strip().replace('', '(none)')
+    for col in ['Blitz %', 'Stunt %', 'Top Front %']:
+        df[col] = df[col].round(1)
+    df['Avg Rushers'] = df['Avg Rushers'].round(1)
+    table = dash_table.DataTable(
+        data=df.to_dict('records'),
+        columns=[{'name': c, 'id': c} for c in df.columns],
+        sort_action='native',
+        page_size=20,
+        style_table={'overflowX': 'auto'},
+        style_cell={'fontSize': '14px', 'padding': '6px', 'textAlign': 'center', 'fontFamily': 'Georgia, serif', 'color': 'black'},
+        style_header={'backgroundColor': WM_GOLD, 'color': WM_GREEN, 'fontWeight': 'bold'}
+    )
+
+    # Front mix of the groups kept in the table, one stacked bar per group
+    mix = front_mix(tally, dims)
+    mix['Group'] = mix[dims].astype(str).apply(lambda row: ' / '.join(v.strip() or '(none)' for v in row), axis=1)
+    groups = df[dims].apply(lambda row: ' / '.join(row), axis=1)
+    mix = mix[mix['Group'].isin(groups)]
+    fig = px.bar(mix, x='Group', y='Share %', color='FRONT', category_orders={'Group': list(groups)},
+                 hover_data={'Plays': True, 'Share %': ':.1f'}, title='Front mix')
+    fig.update_layout(barmode='stack', paper_bgcolor='white', plot_bgcolor='white', title_x=0.5,
+                      font=dict(family='Georgia, serif'), xaxis_title=' / '.join(dims), yaxis_title='% of plays',
+                      margin=dict(t=40, b=40, l=50, r=20))
+    return table, fig
+
+
+# Download links for the plays table: same filters, streamed from /export/plays.<fmt>
+def _export_links(url_for):
+    links = [html.A(label, href=url_for(fmt), target="_blank", style={"color": WM_GREEN, "fontWeight": "bold", "marginLeft": "8px"})
+             for fmt, label in (("csv", "CSV"), ("xlsx", "Excel"), ("parquet", "Parquet"))]
+    return [html.Span("Download plays:", style={"color": WM_GREEN})] + links
+
+
+@app.callback(
+    Output('export-links', 'children'),
+    Input('down-dropdown', 'value'),
+    Input('distance-dropdown', 'value'),
+    Input('main-concept-dropdown', 'value'),
+    Input('tag-dropdown', 'value'),
+    Input('filter-dropdown', 'value'),
+    Input('play-filters', 'data'),
+    Input('opponent-dropdown', 'value')
+)
+def update_export_links(down, distance, main_concept, tag, filter_value, play_filters, opponent):
+    return _export_links(lambda fmt: exports.plays_url(fmt, down, distance, main_concept, tag, filter_value, opponent, play_filters))
+
+
+@app.callback(
+    Output('export-links-wm', 'children'),
+    Input('position-dropdown-wm', 'value'),
+    Input('player-dropdown-wm', 'value')
+)
+def update_export_links_wm(position, player):
+    if not position or not player:
+        return []
+    return _export_links(lambda fmt: exports.player_url(fmt, position, player))
+
+
 # Add filter dropdown to inputs
 @app.callback(
     Output('play-graph', 'figure'),
@@ -773,62 +921,29 @@ def update_dataframe(down, distance, main_concept, tag, filter_value):
     Input('distance-dropdown', 'value'),
     Input('main-concept-dropdown', 'value'),
     Input('tag-dropdown', 'value'),
-    Input('filter-dropdown', 'value')
+    Input('filter-dropdown', 'value'),
+    Input('play-filters', 'data'),
+    Input('opponent-dropdown', 'value')
 )
-def update_success_vs_gain(down, distance, main_concept, tag, filter_value):
-    # Always plot all points for the selected down, but only show points that match the filter
-    if down in data_sources:
-        df_all = data_sources[down]
-    else:
-        df_all = pd.concat(data_sources.values(), ignore_index=True)
-
-    # Build mask for filter (ensure mask uses same index as df_all to avoid alignment errors)
-    mask = pd.Series(True, index=df_all.index)
-    conc_col = df_all['OVO CONCEPT']
-    if tag:
-        mask &= conc_col.astype(str).str.strip().str.upper() == _norm(tag)
-    elif main_concept:
-        mask &= _main_concept_mask(conc_col, main_concept)
-    if distance:
-        mask &= df_all['DIST'] == distance
-    if filter_value == 'efficient':
-        if 'Is_Successful' in df_all.columns:
-            mask &= df_all['Is_Successful'] == 1
-        elif 'Efficient' in df_all.columns:
-            mask &= df_all['Efficient'] == 1
-    elif filter_value == 'nonefficient':
-        if 'Is_Successful' in df_all.columns:
-            mask &= df_all['Is_Successful'] == 0
-        elif 'Efficient' in df_all.columns:
-            mask &= df_all['Efficient'] == 0
-    elif filter_value == 'explosive':
-        if 'Is_Explosive' in df_all.columns:
-            mask &= df_all['Is_Explosive'] == 1
-        elif 'Explosive' in df_all.columns:
-            mask &= df_all['Explosive'] == 1
-    elif filter_value == 'nonexplosive':
-        if 'Is_Explosive' in df_all.columns:
-            mask &= df_all['Is_Explosive'] == 0
-        elif 'Explosive' in df_all.columns:
-            mask &= df_all['Explosive'] == 0
-
-    # Only show points that match the filter
-    df_plot = df_all[mask].copy()
+def update_success_vs_gain(down, distance, main_concept, tag, filter_value, play_filters, opponent):
+    import plotly.express as px
+    # Only show points that match the filters
+    df_plot = select_plays(opponent, down, distance, main_concept, tag, filter_value, play_filters).copy()
     df_plot['Success_Jitter'] = df_plot['Is_Successful'].apply(lambda x: int(x)) + np.random.uniform(-0.15, 0.15, size=len(df_plot))
 
     title_parts = []
-    if tag:
-        title_parts.append(tag)
-    elif main_concept:
-        title_parts.append(main_concept)
-    if down:
-        title_parts.append(f"{down} Down")
-    if distance:
-        title_parts.append(f"{distance} Yards")
+    if as_list(tag):
+        title_parts.append(", ".join(as_list(tag)))
+    elif as_list(main_concept):
+        title_parts.append(", ".join(as_list(main_concept)))
+    if as_list(down):
+        title_parts.append(f"{' / '.join(as_list(down))} Down")
+    if as_list(distance):
+        title_parts.append(f"{', '.join(str(d) for d in as_list(distance))} Yards")
     title = " - ".join(title_parts) or "Play Breakdown"
 
     if df_plot.empty:
-        fig = px.scatter(x=[], y=[])
+        fig = px.scatter(pd.DataFrame({"x": [], "y": []}), x="x", y="y")
         fig.update_layout(
             paper_bgcolor="white",
             plot_bgcolor="white",
@@ -903,62 +1018,24 @@ def update_success_vs_gain(down, distance, main_concept, tag, filter_value):
     return fig
 
 
+# Helpers over coverage_concept_matrix (size / success / explosive per coverage, concept)
+def _matrix_totals(matrix, level):
+    # Sums per value of one level, most plays first
+    totals = matrix.groupby(level=level, sort=False).sum()
+    return totals.sort_values(by='size', ascending=False, kind='mergesort')
 
-@app.callback(
-    Output('coverage-concept-table', 'children'),
-    Input('down-dropdown', 'value'),
-    Input('distance-dropdown', 'value'),
-    Input('main-concept-dropdown', 'value'),
-    Input('tag-dropdown', 'value')
-)
-def update_coverage_concept_table(down, distance, main_concept, tag):
-    # Show top 20 coverages and concepts from coverage_breakdown
-    df = coverage_breakdown.copy()
-    # Optionally filter by dropdowns if needed
-    if down:
-        df = df[df['COVERAGE'].notna()]
-    # Only filter by main_concept/tag if column exists
-    if 'OVO CONCEPT' in df.columns:
-        conc_col = df['OVO CONCEPT']
-        if main_concept:
-            df = df[_main_concept_mask(conc_col, main_concept)]
-        if tag:
-            df = df[conc_col.astype(str).str.strip().str.upper() == _norm(tag)]
-    else:
-        if main_concept or tag:
-            return html.Div("No OVO CONCEPT data available for breakdown table.", style={"color": WM_GOLD, "fontWeight": "bold"})
-    # Show top 20 by coverage count (not Play_Count)
-    sort_col = 'Coverage Count' if 'Coverage Count' in df.columns else df.columns[0]
-    top20 = df.sort_values(by=[sort_col], ascending=False).head(20)
-    if top20.empty:
-        return html.Div("No defensive breakdown data found.", style={"color": WM_GOLD, "fontWeight": "bold"})
-    return dash_table.DataTable(
-        data=top20.to_dict('records'),
-        columns=[{'name': c, 'id': c} for c in top20.columns],
-        page_size=20,
-        style_table={'maxHeight': '350px', 'overflowY': 'auto', 'marginBottom': '20px'},
-        style_cell={
-            'fontSize': '14px',
-            'padding': '6px',
-            'minWidth': '80px',
-            'whiteSpace': 'normal',
-            'textAlign': 'left',
-            'color': WM_GOLD,
-            'backgroundColor': WM_GREEN,
-            'fontFamily': 'Georgia, serif',
-            'fontWeight': 'bold'
-        },
-        style_header={
-            'backgroundColor': WM_GOLD,
-            'color': WM_GREEN,
-            'fontWeight': 'bold',
-            'fontFamily': 'Georgia, serif'
-        },
-        style_data_conditional=[
-            {'if': {'row_index': 'odd'}, 'backgroundColor': '#ffeeb0'},
-            {'if': {'row_index': 'even'}, 'backgroundColor': WM_GOLD}
-        ]
-    )
+
+def _matrix_top(matrix, level, value):
+    # Top 10 values of the other level for `value` of `level`, with efficiency
+    other = 'OVO CONCEPT' if level == 'COVERAGE' else 'COVERAGE'
+    rows = matrix[matrix.index.get_level_values(level) == value]
+    rows = rows[rows.index.get_level_values(other).notna()]
+    totals = _matrix_totals(rows, other).head(10)
+    return pd.DataFrame({
+        other: totals.index,
+        'Plays': totals['size'].to_numpy(),
+        'Efficiency %': (totals['success'] / totals['size'] * 100).round(1).astype(str).to_numpy() + '%',
+    })
 
 
 # Populate coverage dropdown (top 20 coverages by frequency)
@@ -967,65 +1044,34 @@ def update_coverage_concept_table(down, distance, main_concept, tag):
     Output('coverage-dropdown', 'value'),
     Input('down-dropdown', 'value'),
     Input('distance-dropdown', 'value'),
-    Input('filter-dropdown', 'value')
+    Input('filter-dropdown', 'value'),
+    Input('play-filters', 'data'),
+    Input('opponent-dropdown', 'value')
 )
-def populate_coverage_dropdown(down, distance, filter_value):
-    # Use RU_clean as the default source (per-down filter applied if provided)
-    if down in data_sources:
-        df = data_sources[down].copy()
-    else:
-        df = pd.concat(data_sources.values(), ignore_index=True)
-    if distance:
-        df = df[df['DIST'] == distance]
-    # Optionally apply simple filter (efficient/non)
-    if filter_value == 'efficient':
-        if 'Is_Successful' in df.columns:
-            df = df[df['Is_Successful'] == 1]
-        elif 'Efficient' in df.columns:
-            df = df[df['Efficient'] == 1]
-    elif filter_value == 'nonefficient':
-        if 'Is_Successful' in df.columns:
-            df = df[df['Is_Successful'] == 0]
-        elif 'Efficient' in df.columns:
-            df = df[df['Efficient'] == 0]
-    # Get top 20 coverages
-    if 'COVERAGE' not in df.columns:
-        return [], None
-    top_coverages = df['COVERAGE'].dropna().value_counts().head(20)
+def populate_coverage_dropdown(down, distance, filter_value, play_filters, opponent):
+    # Top 20 coverages from the opponent's coverage x concept matrix (down, distance and
+    # the efficient/non-efficient filter applied)
+    matrix = coverage_concept_matrix(down, distance, filter_value, opponent, filters=('efficient', 'nonefficient'), play_filters=play_filters)
+    top_coverages = _matrix_totals(matrix, 'COVERAGE').head(20)
     options = [{'label': cov, 'value': cov} for cov in top_coverages.index]
     return options, None
 
-
 # Populate play dropdown (top 20 OVO CONCEPTs by frequency)
 @app.callback(
     Output('play-dropdown', 'options'),
     Output('play-dropdown', 'value'),
     Input('down-dropdown', 'value'),
     Input('distance-dropdown', 'value'),
-    Input('filter-dropdown', 'value')
+    Input('filter-dropdown', 'value'),
+    Input('play-filters', 'data'),
+    Input('opponent-dropdown', 'value')
 )
-def populate_play_dropdown(down, distance, filter_value):
-    if down in data_sources:
-        df = data_sources[down].copy()
-    else:
-        df = pd.concat(data_sources.values(), ignore_index=True)
-    if distance:
-        df = df[df['DIST'] == distance]
-    if filter_value == 'efficient':
-        if 'Is_Successful' in df.columns:
-            df = df[df['Is_Successful'] == 1]
-        elif 'Efficient' in df.columns:
-            df = df[df['Efficient'] == 1]
-    elif filter_value == 'nonefficient':
-        if 'Is_Successful' in df.columns:
-            df = df[df['Is_Successful'] == 0]
-        elif 'Efficient' in df.columns:
-            df = df[df['Efficient'] == 0]
-    top_plays = df['OVO CONCEPT'].dropna().value_counts().head(20)
+def populate_play_dropdown(down, distance, filter_value, play_filters, opponent):
+    matrix = coverage_concept_matrix(down, distance, filter_value, opponent, filters=('efficient', 'nonefficient'), play_filters=play_filters)
+    top_plays = _matrix_totals(matrix, 'OVO CONCEPT').head(20)
     options = [{'label': p, 'value': p} for p in top_plays.index]
     return options, None
 
-
 # Render the coverage-play cross table: when coverage selected -> show top 10 plays that faced that coverage
 # when play selected -> show top 10 coverages that play saw; when both selected -> show stats for that pair
 @app.callback(
@@ -1034,37 +1080,14 @@ def populate_play_dropdown(down, distance, filter_value):
     Input('play-dropdown', 'value'),
     Input('down-dropdown', 'value'),
     Input('distance-dropdown', 'value'),
-    Input('filter-dropdown', 'value')
+    Input('filter-dropdown', 'value'),
+    Input('play-filters', 'data'),
+    Input('opponent-dropdown', 'value')
 )
-def render_coverage_play_table(coverage, play, down, distance, filter_value):
-    # Base df
-    if down in data_sources:
-        df = data_sources[down].copy()
-    else:
-        df = pd.concat(data_sources.values(), ignore_index=True)
-    if distance:
-        df = df[df['DIST'] == distance]
-    # Apply filter dropdown normally here
-    if filter_value == 'efficient':
-        if 'Is_Successful' in df.columns:
-            df = df[df['Is_Successful'] == 1]
-        elif 'Efficient' in df.columns:
-            df = df[df['Efficient'] == 1]
-    elif filter_value == 'nonefficient':
-        if 'Is_Successful' in df.columns:
-            df = df[df['Is_Successful'] == 0]
-        elif 'Efficient' in df.columns:
-            df = df[df['Efficient'] == 0]
-    elif filter_value == 'explosive':
-        if 'Is_Explosive' in df.columns:
-            df = df[df['Is_Explosive'] == 1]
-        elif 'Explosive' in df.columns:
-            df = df[df['Explosive'] == 1]
-    elif filter_value == 'nonexplosive':
-        if 'Is_Explosive' in df.columns:
-            df = df[df['Is_Explosive'] == 0]
-        elif 'Explosive' in df.columns:
-            df = df[df['Explosive'] == 0]
+def render_coverage_play_table(coverage, play, down, distance, filter_value, play_filters, opponent):
+    # Plays / success sums per (coverage, concept) for the current filters, from the
+    # matrix precomputed at ingest
+    matrix = coverage_concept_matrix(down, distance, filter_value, opponent, play_filters=play_filters)
 
     # No selection: show instructive message
     if not coverage and not play:
@@ -1072,16 +1095,9 @@ def render_coverage_play_table(coverage, play, down, distance, filter_value):
 
     # Coverage selected: show top 10 plays that faced this coverage
     if coverage and not play:
-        sub = df[df['COVERAGE'] == coverage]
-        if sub.empty:
+        merged = _matrix_top(matrix, 'COVERAGE', coverage)
+        if merged.empty:
             return html.Div("No plays found for this coverage.", style={"color": WM_GOLD})
-        counts = sub['OVO CONCEPT'].value_counts().head(10).reset_index()
-        counts.columns = ['OVO CONCEPT', 'Plays']
-        # Compute efficiency per concept
-        effs = sub.groupby('OVO CONCEPT').apply(lambda g: (g['Is_Successful'].sum() / len(g) * 100) if 'Is_Successful' in g.columns else (g['Efficient'].sum() / len(g) * 100 if 'Efficient' in g.columns else np.nan)).reset_index()
-        effs.columns = ['OVO CONCEPT', 'Efficiency %']
-        merged = counts.merge(effs, on='OVO CONCEPT', how='left')
-        merged['Efficiency %'] = merged['Efficiency %'].round(1).astype(str) + '%'
         table = dash_table.DataTable(
             data=merged.to_dict('records'),
             columns=[{'name': 'OVO CONCEPT', 'id': 'OVO CONCEPT'}, {'name': 'Plays', 'id': 'Plays'}, {'name': 'Efficiency %', 'id': 'Efficiency %'}],
@@ -1094,15 +1110,9 @@ def render_coverage_play_table(coverage, play, down, distance, filter_value):
 
     # Play selected: show top 10 coverages that play saw
     if play and not coverage:
-        sub = df[df['OVO CONCEPT'] == play]
-        if sub.empty:
+        merged = _matrix_top(matrix, 'OVO CONCEPT', play)
+        if merged.empty:
             return html.Div("No coverages found for this play.", style={"color": WM_GOLD})
-        counts = sub['COVERAGE'].value_counts().head(10).reset_index()
-        counts.columns = ['COVERAGE', 'Plays']
-        effs = sub.groupby('COVERAGE').apply(lambda g: (g['Is_Successful'].sum() / len(g) * 100) if 'Is_Successful' in g.columns else (g['Efficient'].sum() / len(g) * 100 if 'Efficient' in g.columns else np.nan)).reset_index()
-        effs.columns = ['COVERAGE', 'Efficiency %']
-        merged = counts.merge(effs, on='COVERAGE', how='left')
-        merged['Efficiency %'] = merged['Efficiency %'].round(1).astype(str) + '%'
         table = dash_table.DataTable(
             data=merged.to_dict('records'),
             columns=[{'name': 'COVERAGE', 'id': 'COVERAGE'}, {'name': 'Plays', 'id': 'Plays'}, {'name': 'Efficiency %', 'id': 'Efficiency %'}],
@@ -1114,12 +1124,11 @@ def render_coverage_play_table(coverage, play, down, distance, filter_value):
         return dbc.Card(dbc.CardBody([table]), style={'backgroundColor': 'white', 'borderRadius': '6px'})
 
     # Both selected: show single-row stats for that pair
-    sub = df[(df['COVERAGE'] == coverage) & (df['OVO CONCEPT'] == play)]
-    if sub.empty:
+    pair = matrix[(matrix.index.get_level_values('COVERAGE') == coverage) & (matrix.index.get_level_values('OVO CONCEPT') == play)]
+    plays = int(pair['size'].sum())
+    if plays == 0:
         return html.Div("No plays found for this coverage/play pair.", style={"color": WM_GOLD})
-    plays = len(sub)
-    eff = (sub['Is_Successful'].sum() / plays * 100) if 'Is_Successful' in sub.columns else ((sub['Efficient'].sum() / plays * 100) if 'Efficient' in sub.columns else np.nan)
-    eff_str = f"{eff:.1f}%" if not np.isnan(eff) else "–"
+    eff_str = f"{pair['success'].sum() / plays * 100:.1f}%"
     row = {'COVERAGE': coverage, 'OVO CONCEPT': play, 'Plays': plays, 'Efficiency %': eff_str}
     table = dash_table.DataTable(
         data=[row],
@@ -1131,35 +1140,56 @@ def render_coverage_play_table(coverage, play, down, distance, filter_value):
     )
     return dbc.Card(dbc.CardBody([table]), style={'backgroundColor': 'white', 'borderRadius': '6px'})
 
+# Coverage x concept heatmap: the most common coverages (rows) against the most common
+# concepts (columns), coloured by plays, success rate or explosive rate
+@app.callback(
+    Output('coverage-heatmap', 'figure'),
+    Input('coverage-heatmap-metric', 'value'),
+    Input('coverage-heatmap-size', 'value'),
+    Input('down-dropdown', 'value'),
+    Input('distance-dropdown', 'value'),
+    Input('filter-dropdown', 'value'),
+    Input('play-filters', 'data'),
+    Input('opponent-dropdown', 'value')
+)
+def update_coverage_heatmap(metric, size, down, distance, filter_value, play_filters, opponent):
+    import plotly.express as px
+    matrix = coverage_concept_matrix(down, distance, filter_value, opponent, play_filters=play_filters)
+    matrix = matrix[matrix.index.get_level_values('COVERAGE').notna() & matrix.index.get_level_values('OVO CONCEPT').notna()]
+    coverages = _matrix_totals(matrix, 'COVERAGE').index
+    concepts = _matrix_totals(matrix, 'OVO CONCEPT').index
+    if matrix.empty:
+        return px.imshow(pd.DataFrame([[None]], index=[''], columns=['']).astype(float), aspect='auto')
+    if size:
+        coverages, concepts = coverages[:size], concepts[:size]
+    grid = matrix.unstack('OVO CONCEPT', fill_value=0).reindex(index=coverages)
+    plays = grid['size'].reindex(columns=concepts, fill_value=0)
+    if metric == 'Success %':
+        values = grid['success'].reindex(columns=concepts, fill_value=0) / plays.where(plays > 0) * 100
+    elif metric == 'Explosive %':
+        values = grid['explosive'].reindex(columns=concepts, fill_value=0) / plays.where(plays > 0) * 100
+    else:
+        values = plays.where(plays > 0)
+    fig = px.imshow(values.astype(float), aspect='auto', color_continuous_scale=[[0, '#FFF8E1'], [0.5, WM_GOLD], [1, WM_GREEN]],
+                    labels={'x': 'OVO CONCEPT', 'y': 'COVERAGE', 'color': metric})
+    fig.update_traces(customdata=plays.to_numpy(), hovertemplate='%{y} vs %{x}<br>' + metric + ': %{z:.1f}<br>Plays: %{customdata}<extra></extra>')
+    fig.update_layout(paper_bgcolor='white', plot_bgcolor='white', margin=dict(l=10, r=10, t=10, b=10),
+                      xaxis=dict(tickangle=-60, tickfont=dict(size=10)), yaxis=dict(tickfont=dict(size=10)))
+    return fig
+
+
 @app.callback(
     Output('result-table-output', 'children'),
     Input('down-dropdown', 'value'),
     Input('distance-dropdown', 'value'),
     Input('main-concept-dropdown', 'value'),
     Input('tag-dropdown', 'value'),
-    Input('filter-dropdown', 'value')
+    Input('filter-dropdown', 'value'),
+    Input('play-filters', 'data'),
+    Input('opponent-dropdown', 'value')
 )
-def update_result_table(down, distance, main_concept, tag, filter_value):
-    if down in data_sources:
-        df = data_sources[down]
-    else:
-        df = pd.concat(data_sources.values(), ignore_index=True)
-    conc_col = df['OVO CONCEPT']
-    if tag:
-        df = df[conc_col.astype(str).str.strip().str.upper() == _norm(tag)]
-    elif main_concept:
-        df = df[_main_concept_mask(conc_col, main_concept)]
-    if distance:
-        df = df[df['DIST'] == distance]
-    # Apply filter dropdown
-    if filter_value == 'efficient':
-        df = df[df['Is_Successful'] == 1]
-    elif filter_value == 'nonefficient':
-        df = df[df['Is_Successful'] == 0]
-    elif filter_value == 'explosive':
-        df = df[df['Is_Explosive'] == 1]
-    elif filter_value == 'nonexplosive':
-        df = df[df['Is_Explosive'] == 0]
+def update_result_table(down, distance, main_concept, tag, filter_value, play_filters, opponent):
+    df = select_plays(opponent, down, distance, main_concept, tag, filter_value, play_filters)
     # Group by OVO RESULT
     result_counts = df['OVO RESULT'].value_counts(dropna=False)
     total = result_counts.sum()
@@ -1204,7 +1234,65 @@ def update_result_table(down, distance, main_concept, tag, filter_value):
 
 
 
+@app.callback(
+    Output('compare-concept-dropdown', 'options'),
+    Output('compare-concept-dropdown', 'value'),
+    Input('compare-opponent-dropdown', 'value'),
+    Input('compare-down-dropdown', 'value'),
+    Input('compare-both', 'value'),
+    Input('compare-concept-dropdown', 'value')
+)
+def update_compare_concepts(opponent, down, both, current):
+    # Main concepts in the comparison for the selected downs, most played first
+    df = comparison_rows(opponent, down, both=bool(both))
+    totals = (df['WM Plays'] + df['Opp Plays']).groupby(df['Main Concept'], sort=False).sum().sort_values(ascending=False, kind='mergesort')
+    options = [{"label": f"{mc} ({n})", "value": mc} for mc, n in totals.items()]
+    kept = [mc for mc in as_list(current) if mc in totals.index]
+    return options, kept
+
+
+@app.callback(
+    Output('compare-table', 'page_current'),
+    Input('compare-opponent-dropdown', 'value'),
+    Input('compare-down-dropdown', 'value'),
+    Input('compare-concept-dropdown', 'value'),
+    Input('compare-min-plays', 'value'),
+    Input('compare-both', 'value')
+)
+def reset_compare_page(*filters):
+    # Back to the first page whenever a filter changes
+    return 0
+
+
+@app.callback(
+    Output('compare-table', 'data'),
+    Output('compare-table', 'page_count'),
+    Output('compare-summary', 'children'),
+    Input('compare-opponent-dropdown', 'value'),
+    Input('compare-down-dropdown', 'value'),
+    Input('compare-concept-dropdown', 'value'),
+    Input('compare-min-plays', 'value'),
+    Input('compare-both', 'value'),
+    Input('compare-table', 'page_current'),
+    Input('compare-table', 'page_size')
+)
+def update_compare_table(opponent, down, main_concept, min_plays, both, page_current, page_size):
+    df = comparison_rows(opponent, down, main_concept, min_plays, bool(both))
+    metrics.record_rows(len(df))
+    page_size = page_size or COMPARE_PAGE_SIZE
+    pages = max(1, -(-len(df) // page_size))
+    page = min(page_current or 0, pages - 1)
+    rows = df.iloc[page * page_size:(page + 1) * page_size]
+    store = dataset.current().plays
+    label = store.partitions[opponent if opponent in store.partitions else store.default_key].label
+    summary = f"{len(df)} concept / down rows (W&M spring vs {label})"
+    # to_json turns NaN (a side without plays) into null, shown as a blank cell
+    return json.loads(rows.to_json(orient='records')), pages, summary
+
+
 # === William & Mary Callbacks ===
+# W&M concept page (wm_concepts_layout): answered from the spring table's bitmap
+# indexes (SpringFootball.SpringPlays, see queries.wm_bitmap); only matching rows are copied
 
 # Dropdown for main concept (WM)
 @app.callback(
@@ -1214,27 +1302,8 @@ def update_result_table(down, distance, main_concept, tag, filter_value):
     Input("main-concept-dropdown-wm", "value")
 )
 def update_main_concepts_wm(down, current_value):
-    df = WM_data_df.copy()
-    # Map down string to number for WM data
-    down_map = {"First": 1, "Second": 2, "Third": 3, "Fourth": 4}
-    if down:
-        down_val = down_map.get(down, down)
-        df = df[df["DN"] == down_val]
-    concepts = df["OVO CONCEPT"].dropna()
-    def extract_main(concept):
-        if '#' in concept:
-            return concept.split('#')[0].strip()
-        elif '/' in concept:
-            parts = concept.split('/')
-            return '/'.join(parts[:2]) if len(parts) > 1 else concept
-        else:
-            return concept
-    main_concepts_list = concepts.apply(extract_main)
-    main_concepts = main_concepts_list.unique()
-    total_plays = len(df)
-    tendency_pct = {mc: (main_concepts_list == mc).sum() / total_plays * 100 for mc in main_concepts}
-    main_concepts_sorted = sorted(main_concepts, key=lambda x: -tendency_pct.get(x, 0))
-    options = [{"label": mc, "value": mc} for mc in main_concepts_sorted]
+    # Most played main concepts first
+    options = [{"label": mc, "value": mc} for mc in wm_main_concept_counts(down)]
     # Only reset if options are not empty and current_value is not in options
     if options and current_value not in [opt['value'] for opt in options]:
         current_value = None
@@ -1249,16 +1318,9 @@ def update_main_concepts_wm(down, current_value):
     Input("tag-dropdown-wm", "value"),
 )
 def update_tag_options_wm(main_concept, down, current_tag):
-    df = WM_data_df.copy()
-    down_map = {"First": 1, "Second": 2, "Third": 3, "Fourth": 4}
-    if down:
-        down_val = down_map.get(down, down)
-        df = df[df["DN"] == down_val]
     if not main_concept:
         return [], None
-    concepts = df["OVO CONCEPT"].dropna()
-    tags = sorted([c for c in concepts if c.startswith(main_concept + '/')])
-    options = [{"label": tag, "value": tag} for tag in tags]
+    options = [{"label": tag, "value": tag} for tag in wm_concept_tags(main_concept, down)]
     if options and current_tag not in [opt['value'] for opt in options]:
         current_tag = None
     return options, current_tag
@@ -1273,19 +1335,10 @@ def update_tag_options_wm(main_concept, down, current_tag):
     Input('distance-dropdown-wm', 'value')
 )
 def update_distance_options_wm(down, main_concept, tag, current_distance):
-    df = WM_data_df.copy()
-    down_map = {"First": 1, "Second": 2, "Third": 3, "Fourth": 4}
-    if down:
-        down_val = down_map.get(down, down)
-        df = df[df["DN"] == down_val]
-    if tag:
-        df = df[df['OVO CONCEPT'] == tag]
-    elif main_concept:
-        df = df[df['OVO CONCEPT'].str.startswith(main_concept + '/', na=False) | (df['OVO CONCEPT'] == main_concept)]
-    distances = sorted(df['DIST'].dropna().unique())
-    options = [{'label': dist, 'value': dist} for dist in distances]
-    # Always default to None unless user picks
-    return options, None
+    distances = wm_distances(down, main_concept, tag)
+    options = [{'label': int(dist), 'value': int(dist)} for dist in distances]
+    # Keep the user's pick while it is still offered
+    return options, current_distance if current_distance in distances else None
 
 # Stat cards (WM)
 @app.callback(
@@ -1298,27 +1351,7 @@ def update_distance_options_wm(down, main_concept, tag, current_distance):
     Input('tag-dropdown-wm', 'value')
 )
 def update_stat_cards_wm(down, distance, main_concept, tag):
-    df = WM_data_df.copy()
-    down_map = {"First": 1, "Second": 2, "Third": 3, "Fourth": 4}
-    if down:
-        down_val = down_map.get(down, down)
-        df = df[df["DN"] == down_val]
-    if tag:
-        filtered_df = df[df['OVO CONCEPT'] == tag]
-    elif main_concept:
-        filtered_df = df[df['OVO CONCEPT'].str.startswith(main_concept + '/', na=False) | (df['OVO CONCEPT'] == main_concept)]
-    else:
-        return "–", "–", "–"
-    if distance:
-        filtered_df = filtered_df[filtered_df['DIST'] == distance]
-    total_plays = len(df[df['DIST'] == distance]) if distance else len(df)
-    plays_for_concept = len(filtered_df)
-    efficient_plays = filtered_df['Efficient'].sum() if 'Efficient' in filtered_df.columns else 0
-    explosive_plays = filtered_df['Explosive'].sum() if 'Explosive' in filtered_df.columns else 0
-    tendency_val = f"{(plays_for_concept / total_plays * 100):.1f}%" if total_plays > 0 else "–"
-    efficiency_val = f"{(efficient_plays / plays_for_concept * 100):.1f}%" if plays_for_concept > 0 else "–"
-    explosive_val = f"{(explosive_plays / plays_for_concept * 100):.1f}%" if plays_for_concept > 0 else "–"
-    return tendency_val, efficiency_val, explosive_val
+    return wm_stat_cards(down, distance, main_concept, tag)
 
 # Table output (WM)
 @app.callback(
@@ -1330,25 +1363,7 @@ def update_stat_cards_wm(down, distance, main_concept, tag):
     Input('filter-dropdown-wm', 'value')
 )
 def update_table_wm(down, distance, main_concept, tag, filter_value):
-    df = WM_data_df.copy()
-    down_map = {"First": 1, "Second": 2, "Third": 3, "Fourth": 4}
-    if down:
-        down_val = down_map.get(down, down)
-        df = df[df["DN"] == down_val]
-    if tag:
-        df = df[df['OVO CONCEPT'] == tag]
-    elif main_concept:
-        df = df[df['OVO CONCEPT'].str.startswith(main_concept + '/', na=False) | (df['OVO CONCEPT'] == main_concept)]
-    if distance:
-        df = df[df['DIST'] == distance]
-    if filter_value == 'efficient':
-        df = df[df['Efficient'] == 1]
-    elif filter_value == 'nonefficient':
-        df = df[df['Efficient'] == 0]
-    elif filter_value == 'explosive':
-        df = df[df['Explosive'] == 1]
-    elif filter_value == 'nonexplosive':
-        df = df[df['Explosive'] == 0]
+    df = wm_plays(down, distance, main_concept, tag, filter_value)
     if df.empty:
         return html.Div("No matching plays found.", className="text-warning", style={"color": "#006341"})
     # Group rows together by OVO RESULT for easier review (collapse families like R*, C*)
@@ -1358,7 +1373,7 @@ def update_table_wm(down, distance, main_concept, tag, filter_value):
             s = s.str.replace(r'^\s*R.*$', 'R', regex=True)
             s = s.str.replace(r'^\s*C.*$', 'C', regex=True)
             return s
-        df['__RES_G__'] = _group_result(df['OVO RESULT'])
+        df = df.assign(__RES_G__=_group_result(df['OVO RESULT']))
         by_cols = ['__RES_G__', 'OVO RESULT'] + (['OVO CONCEPT'] if 'OVO CONCEPT' in df.columns else [])
         df = df.sort_values(
             by=by_cols,
@@ -1401,7 +1416,6 @@ def update_table_wm(down, distance, main_concept, tag, filter_value):
     Input('player-dropdown-wm', 'value')
 )
 def update_player_photo_src(position, player):
-    import os
     # Default image
     default = '/assets/WMFB.jpg'
     if not position or not player:
@@ -1434,7 +1448,8 @@ def update_player_photo_src(position, player):
     web_path = f"/assets/Players Photos/{pos_folder}/{chosen}"
     return web_path
 
-# Play graph (WM)
+# Play graph (WM): the spring table has no GAIN / Is_Successful, so efficiency is
+# plotted against distance to go
 @app.callback(
     Output('play-graph-wm', 'figure'),
     Input('down-dropdown-wm', 'value'),
@@ -1443,25 +1458,18 @@ def update_player_photo_src(position, player):
     Input('tag-dropdown-wm', 'value')
 )
 def update_success_vs_gain_wm(down, distance, main_concept, tag):
-    df = WM_data_df.copy()
-    if down:
-        df = df[df["DN"] == down]
-    if tag:
-        df = df[df['OVO CONCEPT'] == tag]
-    elif main_concept:
-        df = df[df['OVO CONCEPT'].str.startswith(main_concept + '/', na=False) | (df['OVO CONCEPT'] == main_concept)]
-    if distance:
-        df = df[df['DIST'] == distance]
+    import plotly.express as px
+    df = wm_plays(down, distance, main_concept, tag)
     if df.empty:
-        fig = px.scatter(x=[], y=[])
+        fig = px.scatter(pd.DataFrame({"x": [], "y": []}), x="x", y="y")
         fig.update_layout(
             paper_bgcolor="white",
             plot_bgcolor="white",
-            xaxis=dict(title="Yards Gained"),
+            xaxis=dict(title="Yards to Go"),
             yaxis=dict(
-                title="Successful Play",
+                title="Efficient Play",
                 tickvals=[0, 1],
-                ticktext=["Unsuccessful", "Successful"]
+                ticktext=["Not Efficient", "Efficient"]
             ),
             annotations=[dict(
                 text="No plays found for selected filters.",
@@ -1471,8 +1479,9 @@ def update_success_vs_gain_wm(down, distance, main_concept, tag):
             )]
         )
         return fig
-    df_plot = df.copy()
-    df_plot['Success_Jitter'] = df_plot['Is_Successful'].apply(lambda x: int(x)) + np.random.uniform(-0.15, 0.15, size=len(df_plot))
+    hover = [c for c in ('DIST', 'OVO CONCEPT', 'DN', 'PERSON', 'OFF FORM', 'MOTION', 'OVO HASH', 'OVO RESULT', 'Efficient', 'Explosive')
+             if c in df.columns]
+    df_plot = df[hover].assign(Efficient_Jitter=df['Efficient'].to_numpy() + np.random.uniform(-0.15, 0.15, size=len(df)))
     title_parts = []
     if tag:
         title_parts.append(tag)
@@ -1485,22 +1494,12 @@ def update_success_vs_gain_wm(down, distance, main_concept, tag):
     title = " - ".join(title_parts) or "Play Breakdown"
     fig = px.scatter(
         df_plot,
-        x='GAIN',
-        y='Success_Jitter',
-        hover_data={
-            'GAIN': True,
-            'DIST': True,
-            'OVO CONCEPT': True,
-            'DN': True,
-            'COVERAGE': True,
-            'FRONT': True,
-            'MOTION': True,
-            'HASH': True,
-            'Is_Successful': True
-        },
+        x='DIST',
+        y='Efficient_Jitter',
+        hover_data={c: True for c in hover},
         labels={
-            'GAIN': 'Yards Gained',
-            'Success_Jitter': 'Successful Play',
+            'DIST': 'Yards to Go',
+            'Efficient_Jitter': 'Efficient Play',
             'OVO CONCEPT': 'Concept'
         },
         title=title,
@@ -1522,11 +1521,11 @@ def update_success_vs_gain_wm(down, distance, main_concept, tag):
         margin=dict(t=50, b=40, l=80, r=80),
         showlegend=False,
         font=dict(color='black', family='Georgia, serif'),
-        xaxis=dict(title="Yards Gained"),
+        xaxis=dict(title="Yards to Go"),
         yaxis=dict(
-            title="Successful Play",
+            title="Efficient Play",
             tickvals=[0, 1],
-            ticktext=["Unsuccessful", "Successful"],
+            ticktext=["Not Efficient", "Efficient"],
             range=[-0.25, 1.25]
         )
     )
@@ -1542,29 +1541,14 @@ def update_success_vs_gain_wm(down, distance, main_concept, tag):
     Input('filter-dropdown-wm', 'value')
 )
 def update_result_table_wm(down, distance, main_concept, tag, filter_value):
-    df = WM_data_df.copy()
-    if down:
-        df = df[df["DN"] == down]
-    if tag:
-        df = df[df['OVO CONCEPT'] == tag]
-    elif main_concept:
-        df = df[df['OVO CONCEPT'].str.startswith(main_concept + '/', na=False) | (df['OVO CONCEPT'] == main_concept)]
-    if distance:
-        df = df[df['DIST'] == distance]
-    if filter_value == 'efficient':
-        df = df[df['Is_Successful'] == 1]
-    elif filter_value == 'nonefficient':
-        df = df[df['Is_Successful'] == 0]
-    elif filter_value == 'explosive':
-        df = df[df['Is_Explosive'] == 1]
-    elif filter_value == 'nonexplosive':
-        df = df[df['Is_Explosive'] == 0]
-    result_counts = df['OVO RESULT'].value_counts(dropna=False)
+    wm = dataset.current().spring.clean
+    rows = wm_rows(down, distance, main_concept, tag, filter_value)
+    result_counts = wm['OVO RESULT'].iloc[rows].value_counts(dropna=False) if 'OVO RESULT' in wm.columns else pd.Series(dtype='int64')
     total = result_counts.sum()
     table_data = [
         {
             'Result': str(result),
-            'Count': count,
+            'Count': int(count),
             'Percentage': f"{(count / total * 100):.1f}%"
         }
         for result, count in result_counts.items()
@@ -1609,27 +1593,15 @@ def update_result_table_wm(down, distance, main_concept, tag, filter_value):
     Input('down-dropdown', 'value'),
     Input('main-concept-dropdown', 'value'),
     Input('tag-dropdown', 'value'),
-    Input('filter-dropdown', 'value')
+    Input('play-filters', 'data'),
+    Input('opponent-dropdown', 'value')
 )
-def update_distance_dropdown(down, main_concept, tag, filter_value):
-    # Use the correct data source
-    if down in data_sources:
-        df = data_sources[down]
-    else:
-        df = pd.concat(data_sources.values(), ignore_index=True)
-
-    conc_col = df['OVO CONCEPT']
-    if tag:
-        df = df[conc_col.astype(str).str.strip().str.upper() == _norm(tag)]
-    elif main_concept:
-        df = df[_main_concept_mask(conc_col, main_concept)]
-    elif filter_value:
-        df = df[conc_col.astype(str).str.strip().str.upper() == _norm(filter_value)]
-
-    distances = sorted(df['DIST'].dropna().unique())
+def update_distance_dropdown(down, main_concept, tag, play_filters, opponent):
+    # Distances the selected downs / concepts / tags were played at
+    distances = sorted(int(value) for value, _ in option_counts(opponent, 'DIST', down=down, main_concept=main_concept,
+                                                           tag=tag, play_filters=play_filters))
     options = [{'label': dist, 'value': dist} for dist in distances]
-    return options, None
-
+    return options, []
 
 # Filter dropdown options (Efficient, Non-Efficient, Explosive, Non-Explosive)
 @app.callback(
@@ -1644,62 +1616,23 @@ def update_filter_dropdown(current_value):
         {'label': 'Explosive', 'value': 'explosive'},
         {'label': 'Non-Explosive', 'value': 'nonexplosive'}
     ]
-    if current_value not in [opt['value'] for opt in options]:
-        current_value = None
-    return options, current_value
+    values = [opt['value'] for opt in options]
+    return options, [v for v in as_list(current_value) if v in values]
 
 @app.callback(
     Output('main-concept-dropdown', 'options'),
     Output('main-concept-dropdown', 'value'),
     Input('down-dropdown', 'value'),
-    Input('main-concept-dropdown', 'value')
+    Input('main-concept-dropdown', 'value'),
+    Input('play-filters', 'data'),
+    Input('opponent-dropdown', 'value')
 )
-def update_main_concept_dropdown(down, current_value):
-    # Explicit list provided by user
-    main_concepts_list = [
-        '8/9', '12/13', '14/15', '16/17', '18/19', '22/23', '24/25', '28/29', '34/35', '36/37', '40/41', '46/47', '72/73',
-        '74/75', '212/213/LK/POP', '214/215', '218/219', '220/221', '222/223', '234/235/POP', '236/237/MOSS/TORPEDO', '240/241',
-        'AGGIE/STOP', 'AIR FORCE', 'ALOHA', 'ANIMAL HOUSE', 'ARMY', 'AUSSIE', 'BAYSIDE', 'BEAR/BULL', 'BERMUDA', 'BEYONCE',
-        'BILL/MARY', 'BLADE/RAZOR', 'BLAZE', 'BLUE/RED', 'BOLT/CRNR', 'BRANCH', 'BUNKER/OBOE/WHL', 'BURRITO', 'BUTCHER/GO',
-        'CALGARY/RODEO', 'CAMO', 'CAVALIER', 'CENTER', 'CHEESE', 'CHICAGO', 'COCAINE', 'COLT', 'COPPERHEAD/GUCCI', 'COWBOY/SHERIFF',
-        'CROSS', 'DANCER', 'DASH', 'DBL BOW', 'DELTA', 'DODGER', 'DOLPHIN', 'DONKEY', 'DRAGON', 'DRAKE/MIGOS', 'DRIVE', 'DSL',
-        'EAST/WEST', 'FADE', 'FOLLOW', 'FOX', 'GEE GEE', 'GODFATHER', 'GRASS 12/13/F/S', 'GREEN', 'HAWAII', 'HAWKEYE', 'HOOK',
-        'HOOSIERS/WHL/FOLLOW', 'HOSS', 'IOWA', 'JAY Z', 'JORDAN', 'KENTUCKY DERBY', 'KILL', 'LAMAR', 'LIMO', 'LINCOLN', 'MASSAGE',
-        'MAUI', 'MAYWEATHER', 'MESH', 'MOSS', 'NAS', 'NAVY', 'NO PLAY', 'NOVA', 'NY', 'OUTBACK', 'PEANUTS', 'PEDRO 36/37/MOSS',
-        'PELICAN', 'PIN', 'PIVOT', 'PLATINUM', 'PRISON', 'RACE/LEGGO', 'RAMBO/LIMBO', 'RATTLER', 'RENO/LAS VEGAS', 'RICKY/LUCY',
-        'RIP/LIZ', 'ROAST', 'ROCK/LAVA/PO', 'ROGER/LOUIE', 'RUNBACKS', 'SCAT', 'SEA/SYR', 'SHAVE', 'SKITTLES', 'SLAM', 'SNAG',
-        'SPACE', 'ST.LOUIS/RANGERS', 'STALLION', 'STICK', 'STING', 'STK 1/2', 'STOPS', 'STUTTER', 'SUBMARINE', 'SUBWAY', 'SWIPE',
-        'SWORD', 'T-PAIN', 'TANK', 'TENNESSEE', 'THOR', 'THRONE', 'THUNDERCAT', 'TOP GUN/MAVERICK/ROSCOE/BLF', 'TRAIN', 'TRIANGLE',
-        'TRICK', 'TRIM', 'TULSA', 'TUXEDO', 'TYSON', 'VENOM', 'VICTORY', 'WAHOO', 'WAVES', 'WHL/FOLLOW', 'WRENCH/BULLET', 'YOGI'
-    ]
-    main_concepts = list(set(main_concepts_list))
-    from Football import data_sources
-
-    # Use per-down data if down is selected, else all data
-    if down in data_sources:
-        df = data_sources[down]
-    else:
-        import pandas as pd
-        df = pd.concat(data_sources.values(), ignore_index=True)
-
-    # Normalize OVO CONCEPT and count plays per main concept:
-    # match exact MAIN, MAIN/..., or MAIN ... (space)
-    conc = df['OVO CONCEPT'].astype(str).str.strip().str.upper()
-    counts = {}
-    for mc in main_concepts:
-        mc_norm = _norm(mc)
-        mask = (conc == mc_norm) | conc.str.startswith(mc_norm + '/', na=False) | conc.str.startswith(mc_norm + ' ', na=False)
-        cnt = int(mask.sum())
-        if cnt > 0:
-            counts[mc] = cnt
-
+def update_main_concept_dropdown(down, current_value, play_filters, opponent):
+    counts = main_concept_counts(opponent, down, play_filters)
     # Sort by greatest tendency (count desc) and build options
     main_concepts_sorted = sorted(counts.keys(), key=lambda k: -counts[k])
     options = [{'label': mc, 'value': mc} for mc in main_concepts_sorted]
-
-    if current_value not in counts:
-        current_value = None
-    return options, current_value
+    return options, [v for v in as_list(current_value) if v in counts]
 
 # Down dropdown options
 @app.callback(
@@ -1708,17 +1641,123 @@ def update_main_concept_dropdown(down, current_value):
     Input('down-dropdown', 'value')
 )
 def update_down_dropdown(current_value):
-    downs = list(data_sources.keys())
+    downs = list(DOWN_NAMES)
     options = [{'label': down, 'value': down} for down in downs]
-    if current_value not in downs:
-        current_value = None
-    return options, current_value
+    return options, [d for d in as_list(current_value) if d in downs]
+
+# Range and multi-select filters -> the `play-filters` store every opponent callback reads
+# (see queries.play_bitmap for how they combine)
+@app.callback(
+    Output('play-filters', 'data'),
+    Output('distance-range-box', 'style'),
+    Input('distance-bucket-dropdown', 'value'),
+    Input('distance-range-slider', 'value'),
+    Input('field-zone-dropdown', 'value'),
+    Input('filter-match', 'value'),
+    *[Input(dropdown_id, 'value') for dropdown_id, _, _ in INDEX_FILTER_DROPDOWNS]
+)
+def update_play_filters(buckets, custom, zone, match, *selections):
+    play_filters = {}
+    buckets = as_list(buckets)
+    if 'custom' in buckets and custom:
+        low, high = custom
+        play_filters['distance'] = [low, None if high >= DISTANCE_SLIDER_MAX else high]
+    named = [b for b in buckets if b in DISTANCE_BUCKETS]
+    if named:
+        play_filters['dist_bucket'] = named
+    if zone in FIELD_ZONES:
+        play_filters['zone'] = list(FIELD_ZONES[zone])
+    for (_, _, key), values in zip(INDEX_FILTER_DROPDOWNS, selections):
+        if as_list(values):
+            play_filters[key] = as_list(values)
+    if match == 'all':
+        play_filters['match'] = 'all'
+    box_style = {"marginTop": "10px", "width": "240px"} if 'custom' in buckets else {"display": "none"}
+    return play_filters or None, box_style
+
+
+# Personnel / formation / motion / hash / coverage / front options, each with its play
+# count under every other current filter (read off the bitmap indexes)
+@app.callback(
+    *[Output(dropdown_id, 'options') for dropdown_id, _, _ in INDEX_FILTER_DROPDOWNS],
+    Input('down-dropdown', 'value'),
+    Input('distance-dropdown', 'value'),
+    Input('main-concept-dropdown', 'value'),
+    Input('tag-dropdown', 'value'),
+    Input('filter-dropdown', 'value'),
+    Input('play-filters', 'data'),
+    Input('opponent-dropdown', 'value')
+)
+def update_index_filter_options(down, distance, main_concept, tag, filter_value, play_filters, opponent):
+    all_options = []
+    for _, _, key in INDEX_FILTER_DROPDOWNS:
+        others = {k: v for k, v in (play_filters or {}).items() if k != key}
+        counts = option_counts(opponent, SELECT_FILTERS[key], down=down, distance=distance, main_concept=main_concept,
+                               tag=tag, filter_value=filter_value, play_filters=others)
+        selected = as_list((play_filters or {}).get(key))
+        # Keep selected values listed even when the other filters leave them no plays
+        counts += [(value, 0) for value in selected if value not in dict(counts)]
+        all_options.append([{'label': f"{str(value).strip() or '(none)'} ({count})", 'value': value} for value, count in counts])
+    return tuple(all_options)
+
+
+# Offline opponent page: everything after the snapshot fetch runs in the browser
+# (window.dash_clientside.wmfb in assets/clientside.js)
+app.clientside_callback(
+    ClientsideFunction('wmfb', 'fetch_snapshot'),
+    Output('snapshot-client', 'data'),
+    Input('opponent-dropdown-client', 'value'),
+    State('snapshot-base-client', 'data'),
+    State('snapshot-client', 'data')
+)
+app.clientside_callback(
+    ClientsideFunction('wmfb', 'main_concept_options'),
+    Output('main-concept-dropdown-client', 'options'),
+    Output('main-concept-dropdown-client', 'value'),
+    Input('snapshot-client', 'data'),
+    Input('down-dropdown-client', 'value'),
+    State('main-concept-dropdown-client', 'value')
+)
+app.clientside_callback(
+    ClientsideFunction('wmfb', 'tag_options'),
+    Output('tag-dropdown-client', 'options'),
+    Output('tag-dropdown-client', 'value'),
+    Input('snapshot-client', 'data'),
+    Input('main-concept-dropdown-client', 'value'),
+    Input('down-dropdown-client', 'value'),
+    State('tag-dropdown-client', 'value')
+)
+app.clientside_callback(
+    ClientsideFunction('wmfb', 'distance_options'),
+    Output('distance-dropdown-client', 'options'),
+    Output('distance-dropdown-client', 'value'),
+    Input('snapshot-client', 'data'),
+    Input('down-dropdown-client', 'value'),
+    Input('main-concept-dropdown-client', 'value'),
+    Input('tag-dropdown-client', 'value')
+)
+_CLIENT_FILTERS = [Input('snapshot-client', 'data'), Input('down-dropdown-client', 'value'), Input('distance-dropdown-client', 'value'),
+                   Input('main-concept-dropdown-client', 'value'), Input('tag-dropdown-client', 'value'), Input('filter-dropdown-client', 'value')]
+app.clientside_callback(
+    ClientsideFunction('wmfb', 'stat_cards'),
+    Output('tendency-value-client', 'children'),
+    Output('efficiency-value-client', 'children'),
+    Output('explosive-value-client', 'children'),
+    *_CLIENT_FILTERS
+)
+app.clientside_callback(ClientsideFunction('wmfb', 'result_table'), Output('table-output-client', 'data'), *_CLIENT_FILTERS)
+app.clientside_callback(ClientsideFunction('wmfb', 'success_vs_gain'), Output('play-graph-client', 'figure'), *_CLIENT_FILTERS)
+
+startup.lap("callbacks")
+startup.report()
+
 
 # Keep only ONE main guard and no stray code below it.
 if __name__ == "__main__":
-	import os
 	# Use PORT env var if present (platforms like Render / Heroku set this)
 	port = int(os.environ.get("PORT", 8051))
 	# Bind to 0.0.0.0 so the service is reachable externally; disable debug in production
+	# gunicorn workers start theirs in post_worker_init (gunicorn.conf.py)
+	warmup.start()
 	app.run(host="0.0.0.0", port=port, debug=False)
 
@@ -1,24 +1,22 @@
+import os
 import pandas as pd
 import numpy as np
 from dash import dcc, html
 import dash_bootstrap_components as dbc
+from sharedmem import share_frame
+from Football import BitmapIndex, _small_int
 
-# Try to load spring_data.xlsx but proceed with empty DataFrame if not present (Render)
-try:
-    WM_data = pd.read_excel(r'spring_data.xlsx')
-except FileNotFoundError:
-    print("Warning: spring_data.xlsx not found. William & Mary data will be empty. Add spring_data.xlsx to repository to enable full functionality.")
-    WM_data = pd.DataFrame()
-
-# If data missing, provide safe empty fallbacks
-if WM_data.empty:
-    WM_clean = pd.DataFrame()
-    # ensure columns expected elsewhere exist (optional)
-    WM_data_df = pd.DataFrame()
-else:
-    # ...existing processing logic...
-    WM_clean = WM_data.drop(columns=[' .1', 'S1', 'S2', 'S3', 'S4', 'V', 'L', 'GAIN', 'REC#', 'PLAY RESULT', 'BLITZ', 
-                                     'FRONT', 'RUSHERS', 'STUNT', 'COVERAGE', 'FORM FAM', 'FIB', 'TAPE LABELS'])
+SPRING_EXPORT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'spring_data.xlsx')
+
+
+def clean_spring(WM_data):
+    # Apply the spring practice cleaning rules and return the canonical W&M table
+    if WM_data.empty:
+        return pd.DataFrame()
+
+    WM_clean = WM_data.drop(columns=[' ', ' .1', 'S1', 'S2', 'S3', 'S4', 'V', 'L', 'GAIN', 'REC#', 'PLAY RESULT', 'BLITZ', 
+                                     'FRONT', 'RUSHERS', 'STUNT', 'COVERAGE', 'FORM FAM', 'FIB', 'TAPE LABELS',
+                                     'FORMATION', 'PLAY CALL'])
 
     keep_periods = [
         'TEAM SITUATION', 'TEAM SITUATION #2', 'OFFENSE TEAM SITUATIONS',
@@ -67,9 +65,80 @@ else:
         ((WM_clean['R/P'] == 'R') & (WM_clean['OVO RESULT'].isin(explosive_run_results))) |
         ((WM_clean['R/P'] == 'P') & (WM_clean['OVO RESULT'].isin(explosive_pass_results))),
         1, 0
-    )
+    ).astype('int8')
+    WM_clean['Efficient'] = WM_clean['Efficient'].astype('int8')
+
+    # Small integer dtypes for the numeric situation columns
+    for col in ['DN', 'DIST', 'FPOS']:
+        WM_clean[col] = _small_int(WM_clean[col])
+
+    # One canonical table on read-only numpy/Arrow buffers (shared across preloaded
+    # gunicorn workers); the raw workbook is not kept
+    return share_frame(WM_clean)
+
+
+def main_concept_of(concept):
+    # W&M main concept of a concept: the text before '#', else its first two '/' parts
+    if '#' in concept:
+        return concept.split('#')[0].strip()
+    parts = concept.split('/')
+    return '/'.join(parts[:2]) if len(parts) > 1 else concept
+
+
+class SpringPlays:
+    # Bitmap indexes over the cleaned spring table (rows in table order) for the W&M
+    # concept page: down, distance, normalized concept, its main concept and the
+    # efficient / explosive flags. Built once per spring load, so filters are bitwise
+    # ANDs instead of masks over (copies of) the whole table. Also the per-down concept
+    # tally the concept comparison joins with the opponent's.
+
+    def __init__(self, WM_clean):
+        self.clean = WM_clean
+        if WM_clean.empty:
+            self.bitmaps = {}
+            self.concept_tally = pd.DataFrame({'size': [], 'success': [], 'explosive': []}, dtype='int64',
+                                              index=pd.MultiIndex.from_arrays([[], []], names=['DN', 'OVO CONCEPT']))
+            return
+        concept = WM_clean['OVO CONCEPT'].astype(str).str.strip().str.upper().where(WM_clean['OVO CONCEPT'].notna())
+        efficient, explosive = WM_clean['Efficient'].to_numpy() == 1, WM_clean['Explosive'].to_numpy() == 1
+        keys = {
+            'DN': WM_clean['DN'],
+            'DIST': WM_clean['DIST'],
+            'OVO CONCEPT': concept,
+            'MAIN CONCEPT': concept.map(main_concept_of, na_action='ignore'),
+            'RESULT': {'efficient': efficient, 'nonefficient': ~efficient, 'explosive': explosive, 'nonexplosive': ~explosive},
+        }
+        self.bitmaps = {
+            name: BitmapIndex(k, len(WM_clean)) if isinstance(k, dict) else BitmapIndex.of(k)
+            for name, k in keys.items()
+        }
+        # Plays, efficient and explosive sums per (DN, normalized concept), in the
+        # columns of Football's tallies, for the W&M vs opponent comparison
+        self.concept_tally = pd.DataFrame({
+            'DN': WM_clean['DN'], 'OVO CONCEPT': concept, 'success': WM_clean['Efficient'], 'explosive': WM_clean['Explosive'],
+        }).groupby(['DN', 'OVO CONCEPT']).agg(
+            size=('success', 'size'), success=('success', 'sum'), explosive=('explosive', 'sum')
+        ).astype('int64')
+
+    def match(self, name, values):
+        """Bitmap (over `clean`) of the plays whose `name` index value is any of `values`."""
+        return self.bitmaps[name].any_of(values)
+
+    def rows(self, bits):
+        """Row positions in `clean` of the plays set in `bits`."""
+        return np.flatnonzero(np.unpackbits(bits, count=len(self.clean)))
+
 
-    # expose dataframe variable that Main.py may expect
-    WM_data_df = WM_data.copy()
+def load_spring(path=SPRING_EXPORT):
+    # Read and clean the spring workbook; empty table (with a warning) if it is missing (Render)
+    try:
+        WM_data = pd.read_excel(path)
+    except FileNotFoundError:
+        print("Warning: spring_data.xlsx not found. William & Mary data will be empty. Add spring_data.xlsx to repository to enable full functionality.")
+        WM_data = pd.DataFrame()
+    return clean_spring(WM_data)
 
 
+WM_clean = load_spring()
+# expose dataframe variable that Main.py may expect (same table, no copy)
+WM_data_df = WM_clean
@@ -0,0 +1,151 @@
+"""Read-only JSON API: the numbers the dashboard shows, for scripts and spreadsheets.
+
+  /api/plays?opponent=&down=&distance=&concept=&tag=&filter=&match=&...&columns=
+      the opponent page's filtered plays and stat cards (same query args as
+      /export/plays, see exports.py)
+  /api/tendencies?opponent=&by=DN&by=OFF FORM&min_plays=
+      the tendencies page's breakdown (Football.breakdown_table); `by` repeats,
+      each dimension at most once
+  /api/player/<name>?position=&columns=
+      one W&M player's spring plays, efficiency / explosiveness and result
+      counts, as on the W&M page; `position` (QB, RB, WR_TE) defaults to the
+      roster folder the player is listed in
+
+`opponent` is a partition key (playstore.py), the default opponent when left
+out; an unknown one is a 400 like any other bad argument.
+
+Every list is paginated with `page` (from 1) and `per_page` (default 100, at most
+`WMFB_API_MAX_PER_PAGE`, default 1000). Each response carries a strong ETag
+derived from the dataset version, the path and the query args. A matching
+If-None-Match gets 304 before anything is computed, so clients and proxies can
+revalidate cheaply.
+"""
+import hashlib
+import json
+import math
+import os
+
+from flask import Response, request
+
+import dataset
+from exports import BadRequest, opponent_filters, select_columns
+from Football import BREAKDOWN_DIMENSIONS, breakdown_table
+from queries import player_plays, player_plays_table, roster, select_plays, stat_cards
+
+DEFAULT_PER_PAGE = 100
+MAX_PER_PAGE = int(os.environ.get("WMFB_API_MAX_PER_PAGE", "1000"))
+
+
+def _positive_int(args, name, default):
+    value = args.get(name)
+    if value in (None, ""):
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise BadRequest(f"{name} must be a positive integer")
+    return number
+
+
+def paginate(df, args):
+    """{"total", "page", "per_page", "pages", "rows"} for one page of `df`."""
+    page = _positive_int(args, "page", 1)
+    per_page = min(_positive_int(args, "per_page", DEFAULT_PER_PAGE), MAX_PER_PAGE)
+    start = (page - 1) * per_page
+    # to_json turns NaN into null and numpy scalars into plain numbers
+    rows = json.loads(df.iloc[start:start + per_page].to_json(orient="records"))
+    return {"total": len(df), "page": page, "per_page": per_page, "pages": math.ceil(len(df) / per_page), "rows": rows}
+
+
+def _check_opponent(opponent):
+    partitions = dataset.current().plays.partitions
+    if opponent is not None and opponent not in partitions:
+        raise BadRequest(f"unknown opponent {opponent!r}; available: {sorted(partitions)}")
+    return opponent
+
+
+def plays_view(args):
+    filters = opponent_filters(args)
+    _check_opponent(filters[0])
+    df = select_columns(select_plays(*filters), args.get("columns"))
+    opponent, down, distance, main_concept, tag, filter_value, play_filters = filters
+    cards = stat_cards(opponent, down, distance, main_concept, tag, filter_value, play_filters)
+    return {"cards": dict(zip(("tendency", "efficiency", "explosiveness"), cards)), **paginate(df, args)}
+
+
+def tendencies_view(args):
+    by = args.getlist("by") or ["DN"]
+    unknown = [d for d in by if d not in BREAKDOWN_DIMENSIONS]
+    if unknown:
+        raise BadRequest(f"unknown by {unknown}; available: {BREAKDOWN_DIMENSIONS}")
+    if len(set(by)) < len(by):
+        raise BadRequest(f"by repeats a dimension: {by}")
+    opponent = _check_opponent(args.get("opponent") or None)
+    df = breakdown_table(dataset.current().plays.get(opponent).tally(by), by)
+    min_plays = _positive_int(args, "min_plays", None)
+    if min_plays:
+        df = df[df["Plays"] >= min_plays]
+    # Rounded as on the tendencies page
+    df = df.round({"Share %": 1, "Success %": 1, "Explosive %": 1})
+    return {"by": by, **paginate(df, args)}
+
+
+def player_view(name, args):
+    position = args.get("position") or next((p for p, players in roster().items() if name in players), None)
+    if position is None:
+        raise BadRequest(f"{name!r} is not on the roster; pass position (QB, RB or WR_TE)")
+    df = player_plays(position, name)
+    summary = {"plays": len(df), "efficiency": None, "explosiveness": None}
+    if not df.empty:
+        summary["efficiency"] = round(float(df["Efficient"].mean()) * 100, 1)
+        summary["explosiveness"] = round(float(df["Explosive"].mean()) * 100, 1)
+    results = df["OVO RESULT"].value_counts() if "OVO RESULT" in df.columns else None
+    table = select_columns(player_plays_table(df), args.get("columns"))
+    return {
+        "player": name, "position": position, "summary": summary,
+        "results": [] if results is None else [{"OVO RESULT": r, "Count": int(n)} for r, n in results.items()],
+        **paginate(table, args),
+    }
+
+
+def etag():
+    # Dataset version + path + query args (order-insensitive)
+    query = sorted(request.args.items(multi=True))
+    return hashlib.sha1(repr((dataset.current().version, request.path, query)).encode()).hexdigest()
+
+
+def _respond(view):
+    tag = etag()
+    if request.if_none_match.contains(tag):
+        response = Response(status=304)
+    else:
+        try:
+            body = {"version": dataset.current().version, **view()}
+        except BadRequest as exc:
+            return Response(json.dumps({"error": str(exc)}) + "\n", status=400, mimetype="application/json")
+        response = Response(json.dumps(body, default=str), mimetype="application/json")
+    response.set_etag(tag)
+    # Cacheable by anyone, but revalidated (cheaply, via the ETag) on every use
+    response.headers["Cache-Control"] = "public, no-cache"
+    return response
+
+
+def register(app):
+    """Add the /api routes to the Flask server of a Dash app."""
+    server = app.server
+
+    @server.route("/api/plays")
+    def _api_plays():
+        return _respond(lambda: plays_view(request.args))
+
+    @server.route("/api/tendencies")
+    def _api_tendencies():
+        return _respond(lambda: tendencies_view(request.args))
+
+    @server.route("/api/player/<name>")
+    def _api_player(name):
+        return _respond(lambda: player_view(name, request.args))
+
+    return app
@@ -0,0 +1,298 @@
+// Offline opponent page (/richmond/offline): the opponent's plays are fetched once as
+// a columnar snapshot (snapshot.py) and every filter below runs in the browser.
+// Same rules as queries.play_bitmap: values of one dropdown are OR'ed, different
+// dropdowns AND'ed, and a tag wins over its main concept.
+(function () {
+    const WM_GREEN = '#006341';
+    const WM_GOLD = '#FFC72C';
+    const DOWNS = {First: 1, Second: 2, Third: 3, Fourth: 4};
+    const FLAGS = {
+        efficient: ['Is_Successful', 1],
+        nonefficient: ['Is_Successful', 0],
+        explosive: ['Is_Explosive', 1],
+        nonexplosive: ['Is_Explosive', 0]
+    };
+    const HOVER_COLUMNS = ['DIST', 'OVO CONCEPT', 'DN', 'COVERAGE', 'FRONT', 'MOTION', 'HASH', 'Is_Successful'];
+
+    function norm(value) {
+        return String(value === null || value === undefined ? '' : value).trim().toUpperCase();
+    }
+
+    function asList(value) {
+        if (value === null || value === undefined || value === '') {
+            return [];
+        }
+        return Array.isArray(value) ? value : [value];
+    }
+
+    function isMain(concept, main) {
+        const mc = norm(main);
+        return concept === mc || concept.startsWith(mc + '/') || concept.startsWith(mc + ' ');
+    }
+
+    function value(snap, column, row) {
+        const col = snap.columns[column];
+        if (!col) {
+            return null;
+        }
+        if (!col.codes) {
+            return col[row];
+        }
+        const code = col.codes[row];
+        return code < 0 ? null : col.dict[code];
+    }
+
+    // Normalized OVO CONCEPT dictionary, computed once per snapshot
+    const normalized = {};
+    function conceptDict(snap) {
+        if (!normalized[snap.url]) {
+            const col = snap.columns['OVO CONCEPT'];
+            normalized[snap.url] = col ? col.dict.map(norm) : [];
+        }
+        return normalized[snap.url];
+    }
+
+    // Dictionary codes of the concepts a tag / main concept selection keeps (null: no concept filter)
+    function conceptCodes(snap, mainConcept, tag) {
+        const concepts = conceptDict(snap);
+        const tags = asList(tag).map(norm);
+        const mains = asList(mainConcept);
+        if (!tags.length && !mains.length) {
+            return null;
+        }
+        const codes = new Set();
+        concepts.forEach(function (concept, code) {
+            if (tags.length ? tags.includes(concept) : mains.some(mc => isMain(concept, mc))) {
+                codes.add(code);
+            }
+        });
+        return codes;
+    }
+
+    // Row numbers of the snapshot's plays matching the page's filters
+    function rows(snap, filters) {
+        const downs = asList(filters.down).map(d => DOWNS[d]).filter(Boolean);
+        const distances = asList(filters.distance).map(Number);
+        const concepts = conceptCodes(snap, filters.mainConcept, filters.tag);
+        const flags = asList(filters.filterValue).filter(f => FLAGS[f]).map(f => FLAGS[f]);
+        const dn = snap.columns.DN || [];
+        const dist = snap.columns.DIST || [];
+        const conceptCol = snap.columns['OVO CONCEPT'];
+        const out = [];
+        for (let i = 0; i < snap.rows; i++) {
+            if (downs.length && !downs.includes(dn[i])) {
+                continue;
+            }
+            if (distances.length && !distances.includes(dist[i])) {
+                continue;
+            }
+            if (concepts && !(conceptCol && concepts.has(conceptCol.codes[i]))) {
+                continue;
+            }
+            if (flags.length && !flags.some(([column, v]) => (snap.columns[column] || [])[i] === v)) {
+                continue;
+            }
+            out.push(i);
+        }
+        return out;
+    }
+
+    function sum(snap, column, selected) {
+        const col = snap.columns[column] || [];
+        return selected.reduce((total, i) => total + (col[i] || 0), 0);
+    }
+
+    // "12.3%"; toFixed rounds exact ties up where Python's format rounds them to even
+    function pct(part, whole) {
+        const value = part / whole * 100;
+        const tenths = value * 10;
+        if (tenths % 1 === 0.5 && Math.floor(tenths) % 2 === 0) {
+            return (Math.floor(tenths) / 10).toFixed(1) + '%';
+        }
+        return value.toFixed(1) + '%';
+    }
+
+    function noUpdate() {
+        return window.dash_clientside.no_update;
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        wmfb: {
+            // Snapshot of `opponent` under `base` (/snapshot/<version>/); not refetched
+            // while it is the one already in the store
+            fetch_snapshot: function (opponent, base, current) {
+                if (!opponent || !base) {
+                    return noUpdate();
+                }
+                const url = base + encodeURIComponent(opponent) + '.json';
+                if (current && current.url === url) {
+                    return noUpdate();
+                }
+                return fetch(url).then(function (response) {
+                    if (!response.ok) {
+                        throw new Error('snapshot ' + url + ': HTTP ' + response.status);
+                    }
+                    return response.json();
+                }).then(function (snap) {
+                    snap.url = url;
+                    return snap;
+                });
+            },
+
+            // Main concepts played on the selected downs, most plays first
+            main_concept_options: function (snap, down, current) {
+                if (!snap) {
+                    return [[], []];
+                }
+                const selected = rows(snap, {down: down});
+                const perCode = {};
+                const col = snap.columns['OVO CONCEPT'];
+                selected.forEach(function (i) {
+                    const code = col ? col.codes[i] : -1;
+                    perCode[code] = (perCode[code] || 0) + 1;
+                });
+                const concepts = conceptDict(snap);
+                const counts = {};
+                snap.main_concepts.forEach(function (mc) {
+                    let n = 0;
+                    concepts.forEach(function (concept, code) {
+                        if (perCode[code] && isMain(concept, mc)) {
+                            n += perCode[code];
+                        }
+                    });
+                    if (n > 0) {
+                        counts[mc] = n;
+                    }
+                });
+                const mains = Object.keys(counts).sort((a, b) => counts[b] - counts[a]);
+                return [mains.map(mc => ({label: mc, value: mc})), asList(current).filter(v => counts[v])];
+            },
+
+            // Tags ("MAIN/..." or "MAIN ...") of the selected main concepts played on the selected downs
+            tag_options: function (snap, mainConcept, down, current) {
+                const mains = asList(mainConcept).map(norm);
+                if (!snap || !mains.length) {
+                    return [[], []];
+                }
+                let selected = rows(snap, {down: down});
+                if (!selected.length) {
+                    selected = rows(snap, {});
+                }
+                const present = new Set(selected.map(i => value(snap, 'OVO CONCEPT', i)).filter(c => c !== null));
+                const tags = Array.from(present).filter(function (c) {
+                    const concept = norm(c);
+                    return mains.some(mc => concept.startsWith(mc + '/') || concept.startsWith(mc + ' '));
+                }).sort();
+                return [tags.map(t => ({label: t, value: t})), asList(current).filter(t => tags.includes(t))];
+            },
+
+            // Distances the selected downs / concepts / tags were played at
+            distance_options: function (snap, down, mainConcept, tag) {
+                if (!snap) {
+                    return [[], []];
+                }
+                const dist = snap.columns.DIST || [];
+                const distances = Array.from(new Set(rows(snap, {down: down, mainConcept: mainConcept, tag: tag})
+                    .map(i => dist[i]).filter(d => d !== null))).sort((a, b) => a - b);
+                return [distances.map(d => ({label: d, value: d})), []];
+            },
+
+            // Tendency / Efficiency / Explosiveness cards (as update_stat_cards: the
+            // 'efficient' flag is not applied to them)
+            stat_cards: function (snap, down, distance, mainConcept, tag, filterValue) {
+                const blank = ['–', '–', '–'];
+                if (!snap) {
+                    return blank;
+                }
+                const downRows = rows(snap, {down: down});
+                const total = asList(distance).length ? rows(snap, {down: down, distance: distance}).length : downRows.length;
+                let selected;
+                if (!asList(tag).length && !asList(mainConcept).length) {
+                    if (!asList(down).length) {
+                        return blank;
+                    }
+                    selected = downRows;
+                } else {
+                    selected = rows(snap, {
+                        down: down, distance: distance, mainConcept: mainConcept, tag: tag,
+                        filterValue: asList(filterValue).filter(f => f !== 'efficient')
+                    });
+                }
+                if (!selected.length || !total) {
+                    return blank;
+                }
+                return [
+                    pct(selected.length, total),
+                    pct(sum(snap, 'Is_Successful', selected), selected.length),
+                    pct(sum(snap, 'Is_Explosive', selected), selected.length)
+                ];
+            },
+
+            // OVO RESULT counts and shares of the filtered plays, most common first
+            result_table: function (snap, down, distance, mainConcept, tag, filterValue) {
+                if (!snap) {
+                    return [];
+                }
+                const selected = rows(snap, {down: down, distance: distance, mainConcept: mainConcept, tag: tag, filterValue: filterValue});
+                const counts = new Map();
+                selected.forEach(function (i) {
+                    const result = value(snap, 'OVO RESULT', i);
+                    counts.set(result, (counts.get(result) || 0) + 1);
+                });
+                return Array.from(counts.entries()).sort((a, b) => b[1] - a[1]).map(([result, count]) => ({
+                    'OVO RESULT': result === null ? '' : result,
+                    'Count': count,
+                    'Percentage': pct(count, selected.length)
+                }));
+            },
+
+            // Success vs. yards gained scatter (styled as update_success_vs_gain)
+            success_vs_gain: function (snap, down, distance, mainConcept, tag, filterValue) {
+                const selected = snap ? rows(snap, {down: down, distance: distance, mainConcept: mainConcept, tag: tag, filterValue: filterValue}) : [];
+                const titleParts = [];
+                if (asList(tag).length) {
+                    titleParts.push(asList(tag).join(', '));
+                } else if (asList(mainConcept).length) {
+                    titleParts.push(asList(mainConcept).join(', '));
+                }
+                if (asList(down).length) {
+                    titleParts.push(asList(down).join(' / ') + ' Down');
+                }
+                if (asList(distance).length) {
+                    titleParts.push(asList(distance).join(', ') + ' Yards');
+                }
+                const yaxis = {
+                    title: {text: 'Successful Play'}, tickvals: [0, 1], ticktext: ['Unsuccessful', 'Successful'],
+                    range: [-0.25, 1.25], showticklabels: true
+                };
+                const layout = {
+                    plot_bgcolor: 'white', paper_bgcolor: 'white', title: {text: titleParts.join(' - ') || 'Play Breakdown', x: 0.5},
+                    height: 340, margin: {t: 30, b: 30, l: 60, r: 60}, showlegend: false,
+                    font: {color: 'black', family: 'Georgia, serif'}, xaxis: {title: {text: 'Yards Gained'}}, yaxis: yaxis
+                };
+                if (!selected.length) {
+                    layout.annotations = [{
+                        text: 'No plays found for selected filters.', xref: 'paper', yref: 'paper',
+                        showarrow: false, font: {size: 18, color: WM_GOLD}
+                    }];
+                    return {data: [], layout: layout};
+                }
+                const gain = snap.columns.GAIN || [];
+                const success = snap.columns.Is_Successful || [];
+                return {
+                    data: [{
+                        type: 'scatter', mode: 'markers',
+                        x: selected.map(i => gain[i]),
+                        y: selected.map(i => (success[i] || 0) + (Math.random() * 0.3 - 0.15)),
+                        customdata: selected.map(i => HOVER_COLUMNS.map(column => value(snap, column, i))),
+                        hovertemplate: 'Yards Gained=%{x}<br>' +
+                            HOVER_COLUMNS.map((column, k) => (column === 'OVO CONCEPT' ? 'Concept' : column) + '=%{customdata[' + k + ']}').join('<br>') +
+                            '<extra></extra>',
+                        marker: {size: 12, color: WM_GOLD, line: {width: 2, color: WM_GREEN}}
+                    }],
+                    layout: layout
+                };
+            }
+        }
+    });
+})();
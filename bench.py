@@ -0,0 +1,104 @@
+"""Query backend benchmark: pandas (bitmap indexes) vs. SQLite (sqlbackend.py).
+
+The opponent partition's cleaned plays are replicated `--scales` times (x1 is
+the real partition) into a PlaySet. The same SQLite table sqlbackend builds is
+loaded from it. Then each opponent-page view in views() is answered both ways,
+checked for identical rows, and timed (median of `--repeat` runs). Both
+backends are also timed on building their indexes.
+
+Usage:
+  python bench.py [--opponent RICHMOND|2024] [--scales 1,10,50] [--repeat 20] [--out bench.json]
+"""
+import argparse
+import json
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+import dataset
+from Football import PlaySet
+from queries import MAIN_CONCEPTS, main_concept_counts, play_bitmap
+from sqlbackend import PlayDB
+
+
+def views(opponent, plays):
+    # (name, filters) of typical opponent-page views, using the partition's most common values
+    t = plays.tendencies
+    counts = main_concept_counts(opponent, "Third")
+    main = max(counts, key=counts.get) if counts else MAIN_CONCEPTS[0]
+    coverage = t["COVERAGE"].value_counts().index[0]
+    person = t["PERSON"].value_counts().index[0]
+    return [
+        ("down", dict(down=["Third"])),
+        ("down + concept", dict(down=["Third"], main_concept=[main])),
+        ("concept + coverage", dict(main_concept=[main], play_filters={"coverage": [coverage]})),
+        ("buckets + custom distance + zone", dict(down=["Second"], play_filters={
+            "dist_bucket": ["Long (7+)"], "distance": [3, 5], "zone": [0, 20]})),
+        ("results, match all", dict(filter_value=["efficient", "explosive"], play_filters={"match": "all"})),
+        ("everything", dict(down=["First", "Second"], main_concept=[main], filter_value=["efficient"],
+                            play_filters={"person": [person], "coverage": [coverage], "zone": [None, 50]})),
+    ]
+
+
+def scaled(plays, factor):
+    # PlaySet of `factor` copies of the partition's plays (DN-sorted, fresh index)
+    clean = pd.concat([plays.clean] * factor, ignore_index=True)
+    return PlaySet(clean.sort_values("DN", kind="mergesort").reset_index(drop=True))
+
+
+def timed(func, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - t0)
+    return result, statistics.median(times) * 1000
+
+
+def run(opponent=None, scales=(1, 10, 50), repeat=20):
+    """[{scale, rows, build_ms, queries: [{view, rows, pandas_ms, sqlite_ms}]}]"""
+    store = dataset.current().plays
+    opponent = opponent if opponent in store.partitions else store.default_key
+    base = store.get(opponent)
+    named = views(opponent, base)
+    results = []
+    for factor in scales:
+        t0 = time.perf_counter()
+        plays = scaled(base, factor)
+        pandas_build = (time.perf_counter() - t0) * 1000
+        t0 = time.perf_counter()
+        db = PlayDB()
+        db.add_partition(opponent, plays)
+        sqlite_build = (time.perf_counter() - t0) * 1000
+        print(f"x{factor}: {len(plays.tendencies)} plays; build pandas {pandas_build:.0f} ms, sqlite {sqlite_build:.0f} ms")
+        row = {"scale": factor, "rows": len(plays.tendencies), "build_ms": {"pandas": pandas_build, "sqlite": sqlite_build}, "queries": []}
+        for name, filters in named:
+            bits = play_bitmap(plays, **filters)
+            expected = np.arange(len(plays.tendencies)) if bits is None else plays.rows(bits)
+            got, sqlite_ms = timed(lambda: db.play_positions(opponent, **filters), repeat)
+            if not np.array_equal(expected, got):
+                raise AssertionError(f"x{factor} {name}: sqlite returned {len(got)} rows, pandas {len(expected)}")
+            _, pandas_ms = timed(lambda: plays.rows(play_bitmap(plays, **filters)), repeat)
+            print(f"  {name:<34} {len(got):>7} rows  pandas {pandas_ms:8.2f} ms  sqlite {sqlite_ms:8.2f} ms")
+            row["queries"].append({"view": name, "rows": len(got), "pandas_ms": pandas_ms, "sqlite_ms": sqlite_ms})
+        results.append(row)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the pandas and SQLite query backends on scaled play data.")
+    parser.add_argument("--opponent", help="partition key, e.g. RICHMOND|2024 (default partition when omitted)")
+    parser.add_argument("--scales", default="1,10,50", help="comma-separated replication factors")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per query (the median is reported)")
+    parser.add_argument("--out", help="write the results as JSON to this file")
+    args = parser.parse_args(argv)
+    results = run(args.opponent, [int(s) for s in args.scales.split(",") if s.strip()], args.repeat)
+    if args.out:
+        with open(args.out, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
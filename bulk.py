@@ -0,0 +1,184 @@
+"""Bulk cleaned data for notebooks, as Arrow IPC streams or Parquet.
+
+  /bulk/plays.<fmt>?opponent=&down=&distance=&concept=&tag=&filter=&...&columns=
+      an opponent partition's cleaned plays (Football.clean_plays, every down);
+      with any opponent-page filter set (same args as /export/plays), the downs
+      1-4 plays matching it
+  /bulk/wm.<fmt>?position=&player=&columns=
+      the cleaned W&M spring table, or one player's plays as on the W&M page
+
+`fmt` is arrow (IPC stream) or parquet. Each source is converted to an Arrow
+table once per dataset version (numeric and Arrow-backed string columns are
+shared with the pandas frame, not copied). The last `WMFB_BULK_CACHE` (default
+4) tables are kept. `columns` is a zero-copy projection of that table, and the
+filters become one take() of the matching row positions, so no row is turned
+into Python objects. Record batches of `WMFB_EXPORT_CHUNK_ROWS` rows are
+streamed as they are encoded.
+
+Each worker serves at most `WMFB_BULK_CONCURRENCY` (default 1) bulk pulls at
+a time. Further pulls get 503 with Retry-After, so analysts can't tie up every
+worker the dashboard needs. The CLI reads the data in its own process and does
+not touch the server at all:
+
+Usage:
+  python bulk.py plays "opponent=RICHMOND|2024&down=Third&columns=DN,DIST,GAIN" -o third.arrow
+  python bulk.py wm "position=QB&player=Derrick Gurley" -o gurley.parquet
+"""
+import os
+import threading
+from collections import OrderedDict
+from urllib.parse import parse_qsl
+
+import numpy as np
+from flask import Response, request, stream_with_context
+from werkzeug.datastructures import MultiDict
+
+import dataset
+from exports import CHUNK_ROWS, BadRequest, Sink, opponent_filters
+from queries import as_list, play_bitmap, player_plays
+
+CACHE_SIZE = int(os.environ.get("WMFB_BULK_CACHE", "4"))
+CONCURRENCY = int(os.environ.get("WMFB_BULK_CONCURRENCY", "1"))
+MIMETYPES = {"arrow": "application/vnd.apache.arrow.stream", "parquet": "application/vnd.apache.parquet"}
+SOURCES = ("plays", "wm")
+
+_tables = OrderedDict()
+_tables_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(CONCURRENCY)
+
+
+def arrow_table(source, key=None):
+    """Arrow table of `source` ("plays" partition `key`, or "wm") at the current version."""
+    import pyarrow as pa
+    current = dataset.current()
+    cache_key = (current.version, source, key)
+    with _tables_lock:
+        if cache_key in _tables:
+            _tables.move_to_end(cache_key)
+            return _tables[cache_key]
+    df = current.plays.get(key).clean if source == "plays" else current.wm
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with _tables_lock:
+        _tables[cache_key] = table
+        while len(_tables) > CACHE_SIZE:
+            _tables.popitem(last=False)
+    return table
+
+
+def _project(table, columns):
+    if not columns:
+        return table
+    wanted = [c.strip() for c in columns.split(",") if c.strip()]
+    missing = [c for c in wanted if c not in table.column_names]
+    if missing:
+        raise BadRequest(f"unknown columns {missing}; available: {table.column_names}")
+    return table.select(wanted)
+
+
+def plays_table(args):
+    """Partition plays for query args: projection first, then one take() of the filtered rows."""
+    opponent, down, distance, main_concept, tag, filter_value, play_filters = opponent_filters(args)
+    store = dataset.current().plays
+    key = opponent if opponent in store.partitions else store.default_key
+    table = _project(arrow_table("plays", key), args.get("columns"))
+    plays = store.get(key)
+    if not plays.bitmaps:
+        return table
+    bits = play_bitmap(plays, as_list(down), distance, main_concept, tag, filter_value, play_filters)
+    if bits is None:
+        return table
+    # plays.tendencies is the downs 1-4 slice of the DN-sorted clean table
+    offset = int(np.searchsorted(plays.clean["DN"].to_numpy(), 1, "left"))
+    return table.take(plays.rows(bits) + offset)
+
+
+def wm_table(args):
+    table = _project(arrow_table("wm"), args.get("columns"))
+    if not args.get("player"):
+        return table
+    wm = dataset.current().wm
+    df = player_plays(args.get("position"), args.get("player"))
+    return table.take(wm.index.get_indexer(df.index))
+
+
+TABLES = {"plays": plays_table, "wm": wm_table}
+
+
+def _arrow(table):
+    import pyarrow as pa
+    sink = Sink()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=CHUNK_ROWS):
+            writer.write_batch(batch)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def _parquet(table):
+    import pyarrow.parquet as pq
+    sink = Sink()
+    with pq.ParquetWriter(sink, table.schema) as writer:
+        for start in range(0, table.num_rows, CHUNK_ROWS):
+            # One row group per chunk
+            writer.write_table(table.slice(start, CHUNK_ROWS))
+            yield sink.drain()
+    yield sink.drain()
+
+
+WRITERS = {"arrow": _arrow, "parquet": _parquet}
+
+
+def register(app):
+    """Add the /bulk routes to the Flask server of a Dash app."""
+    server = app.server
+
+    @server.route("/bulk/<source>.<fmt>")
+    def _bulk(source, fmt):
+        if source not in TABLES or fmt not in WRITERS:
+            return Response(f"unknown /bulk/{source}.{fmt}; use one of {list(SOURCES)} as arrow or parquet\n",
+                            status=404, mimetype="text/plain")
+        if not _slots.acquire(blocking=False):
+            return Response("bulk pulls busy, retry shortly\n", status=503, mimetype="text/plain", headers={"Retry-After": "5"})
+        try:
+            table = TABLES[source](request.args)
+        except BadRequest as exc:
+            _slots.release()
+            return Response(f"{exc}\n", status=400, mimetype="text/plain")
+        except Exception:
+            _slots.release()
+            raise
+
+        def stream():
+            try:
+                yield from WRITERS[fmt](table)
+            finally:
+                _slots.release()
+
+        return Response(stream_with_context(stream()), mimetype=MIMETYPES[fmt], headers={
+            "Content-Disposition": f'attachment; filename="{source}.{fmt}"',
+            "X-Export-Rows": str(table.num_rows),
+        })
+
+    return app
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Write cleaned plays or W&M spring data as Arrow IPC or Parquet.")
+    parser.add_argument("source", choices=SOURCES)
+    parser.add_argument("query", nargs="?", default="", help="same query string as /bulk/<source>.<fmt>, e.g. 'down=Third&columns=DN,GAIN'")
+    parser.add_argument("-o", "--output", required=True, help="output file; .parquet writes Parquet, anything else an Arrow IPC stream")
+    args = parser.parse_args(argv)
+    fmt = "parquet" if args.output.endswith(".parquet") else "arrow"
+    try:
+        table = TABLES[args.source](MultiDict(parse_qsl(args.query, keep_blank_values=True)))
+    except BadRequest as exc:
+        parser.error(str(exc))
+    with open(args.output, "wb") as fh:
+        for data in WRITERS[fmt](table):
+            fh.write(data)
+    print(f"{args.output}: {table.num_rows} rows, {table.num_columns} columns ({fmt})")
+
+
+if __name__ == "__main__":
+    main()
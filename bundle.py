@@ -0,0 +1,198 @@
+"""Offline scouting bundle: every opponent-page view of one partition, precomputed,
+plus a static viewer that opens from disk (no Python server needed on the sideline).
+
+Usage:
+  python bundle.py [--opponent RICHMOND|2024] [--out scouting_bundle] [--jobs N]
+
+Views are each down (or all downs) x main concept x tag x result filter, one
+value or none for each, with distance left open. Each view stores:
+
+- the stat cards (queries.stat_cards);
+- the OVO RESULT counts;
+- the plays behind the success vs. gain scatter.
+
+They are computed in `--jobs` processes (default: every core), one task per
+down and main concept. The output directory holds:
+
+  index.html           the viewer page (the opponent page's styling, rendered
+                       through layout.static_html)
+  viewer.js            viewer/viewer.js
+  data/plays.js        the partition's plays as columns (snapshot.build):
+                       the dictionaries every shard refers to
+  data/<down>.js       one shard per down ("all" for no down)
+
+Shards are script files that call `WMFB_BUNDLE.shard(name, data)`, so they load
+through <script> tags under file://, where fetch() is not allowed.
+
+Each shard stores the distinct cards, result tables and play sets once. A view
+is three positions into those lists, and a results row is an OVO RESULT
+dictionary code with its count and share. A play set is a base64 bitmap over
+the plays in plays.js.
+"""
+import argparse
+import base64
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from dash import html
+
+import dataset
+import snapshot
+from Football import DOWN_NAMES
+from layout import static_html
+from queries import RESULT_FILTERS, concept_tags, main_concept_counts, play_bitmap, stat_cards
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+VIEWER_DIR = os.path.join(ROOT, "viewer")
+LOGO = os.path.join(ROOT, "assets", "wm_football_logo.png")
+FILTERS = [None] + list(RESULT_FILTERS)
+
+
+def shard_name(down):
+    return down or "all"
+
+
+def _rows(plays, down, main_concept, tag, filter_value):
+    # Positions in plays.tendencies of the view's plays
+    bits = play_bitmap(plays, down, None, main_concept, tag, filter_value)
+    return np.arange(len(plays.tendencies)) if bits is None else plays.rows(bits)
+
+
+def _views(task):
+    # {(main, tag, filter): (cards, results, bitmap)} for one down and main concept (None: no concept)
+    opponent, down, main_concept = task
+    plays = dataset.current().plays.get(opponent)
+    results = plays.tendencies["OVO RESULT"]
+    codes, _ = snapshot.encode_text(results)
+    tags = [None] + (concept_tags(opponent, main_concept, down) if main_concept else [])
+    views = {}
+    for tag in tags:
+        for filter_value in FILTERS:
+            rows = _rows(plays, down, main_concept, tag, filter_value)
+            counts = np.bincount(codes[rows] + 1, minlength=1)
+            # Most common result first (ties in dictionary order), missing results as code -1
+            order = sorted((code for code in range(len(counts)) if counts[code]), key=lambda code: -counts[code])
+            table = tuple((int(code) - 1, int(counts[code]), f"{(counts[code] / len(rows) * 100):.1f}%") for code in order)
+            mask = np.zeros(len(plays.tendencies), dtype=bool)
+            mask[rows] = True
+            bitmap = base64.b64encode(np.packbits(mask, bitorder="little").tobytes()).decode()
+            cards = tuple(stat_cards(opponent, down, None, main_concept, tag, filter_value))
+            views[(main_concept or "", tag or "", filter_value or "")] = (cards, table, bitmap)
+    return down, views
+
+
+def _shard(views, mains, tags):
+    # Shard document: distinct cards / tables / bitmaps once, views as positions into them
+    lists = {"cards": {}, "tables": {}, "rows": {}}
+    out = {}
+    for key, (cards, table, bitmap) in views.items():
+        out["\t".join(key)] = [lists[name].setdefault(value, len(lists[name]))
+                               for name, value in (("cards", cards), ("tables", table), ("rows", bitmap))]
+    return {
+        "mains": mains,
+        "tags": tags,
+        "views": out,
+        **{name: [list(v) if isinstance(v, tuple) else v for v in values] for name, values in lists.items()},
+    }
+
+
+def _script(name, data):
+    return f"WMFB_BUNDLE.shard({json.dumps(name)},{json.dumps(data, separators=(',', ':'))});\n"
+
+
+def viewer_page(opponent, label, shards):
+    """index.html of the bundle (same colors, fonts and boxes as the opponent page)."""
+    gold, green, dark = "#FFC72C", "#006341", "#0B2F1A"
+    select_style = {"marginTop": "6px", "width": "240px", "height": "34px", "display": "block"}
+    card_style = {"backgroundColor": "#FFF8E1", "border": f"2px solid {green}", "borderRadius": "6px", "marginBottom": "8px",
+                  "padding": "12px", "textAlign": "center"}
+    box_style = {"backgroundColor": "#FFF", "border": f"2px solid {gold}", "borderRadius": "12px", "padding": "12px",
+                 "boxShadow": "0 2px 8px #FFC72C", "maxHeight": "520px", "overflowY": "auto"}
+
+    def select(select_id, placeholder, options=()):
+        return html.Select([html.Option(placeholder, value="")] + [html.Option(text, value=value) for value, text in options],
+                           id=select_id, style=select_style)
+
+    header = html.Div([
+        html.Img(src="wm_football_logo.png", style={"height": "60px", "marginRight": "12px", "boxShadow": "0 2px 8px #FFC72C", "borderRadius": "8px"}),
+        html.H2(f"Offensive Concept Analysis - {label}", style={"color": gold, "fontFamily": "Georgia, serif", "margin": 0,
+                                                              "paddingLeft": "6px", "letterSpacing": "2px"}),
+    ], style={"display": "flex", "alignItems": "center", "justifyContent": "center", "background": dark, "padding": "12px 18px",
+              "borderRadius": "12px", "boxShadow": "0 2px 12px #FFC72C", "marginBottom": "12px"})
+    controls = html.Div([
+        select("down", "All Downs", [(d, d) for d in DOWN_NAMES]),
+        select("main-concept", "Select Main Concept"),
+        select("tag", "Select Tag"),
+        select("filter", "Filter Plays", [("efficient", "Efficient"), ("nonefficient", "Non-Efficient"),
+                                          ("explosive", "Explosive"), ("nonexplosive", "Non-Explosive")]),
+        html.Div([
+            html.Div([html.H6(title), html.H3("–", id=card_id)], style=card_style)
+            for title, card_id in (("Tendency", "tendency-value"), ("Efficiency %", "efficiency-value"), ("Explosiveness %", "explosive-value"))
+        ], style={"marginTop": "12px"}),
+    ], style={"width": "33%", "paddingLeft": "18px", "boxSizing": "border-box"})
+    graph = html.Div(html.Div(id="play-graph", style={"backgroundColor": "white", "padding": "6px", "borderRadius": "6px"}),
+                     style={"backgroundColor": green, "padding": "8px", "borderRadius": "10px", "border": f"4px solid {gold}", "marginBottom": "12px"})
+    table = html.Div(html.Table(id="table-output", style={"width": "100%", "fontFamily": "Georgia, serif", "fontSize": "14px",
+                                                         "borderCollapse": "collapse"}), style=box_style)
+    body = html.Div([controls, html.Div([graph, table], style={"width": "67%", "padding": "0 12px", "boxSizing": "border-box"})],
+                    style={"display": "flex", "alignItems": "flex-start"})
+    page = html.Div([header, body], style={"maxWidth": "1280px", "margin": "0 auto", "padding": "8px"})
+    scripts = "".join(f'<script src="data/{name}.js"></script>' for name in ["plays"] + shards)
+    return ("<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\">"
+            f"<title>Scouting - {label}</title></head>"
+            f"<body style=\"background-color:{dark};font-family:Georgia, serif;margin:0\">"
+            f"<script src=\"viewer.js\"></script>{scripts}{static_html(page)}"
+            f"<script>WMFB_BUNDLE.start({json.dumps(opponent)});</script></body></html>\n")
+
+
+def build(opponent=None, out="scouting_bundle", jobs=None):
+    """Write the bundle for partition `opponent` (default partition when None) to `out`."""
+    t0 = time.perf_counter()
+    store = dataset.current().plays
+    opponent = opponent if opponent in store.partitions else store.default_key
+    plays = store.get(opponent)
+    downs = [None] + list(DOWN_NAMES)
+    mains = {down: main_concept_counts(opponent, down) for down in downs}
+    tasks = [(opponent, down, mc) for down in downs for mc in [None] + sorted(mains[down])]
+    views = {down: {} for down in downs}
+    # Forked workers share the loaded partition
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        for down, part in pool.map(_views, tasks, chunksize=4):
+            views[down].update(part)
+
+    os.makedirs(os.path.join(out, "data"), exist_ok=True)
+    document = snapshot.build(plays)
+    with open(os.path.join(out, "data", "plays.js"), "w") as fh:
+        fh.write(_script("plays", document))
+    for down in downs:
+        ordered = sorted(mains[down], key=lambda mc: -mains[down][mc])
+        tags = {mc: concept_tags(opponent, mc, down) for mc in ordered}
+        with open(os.path.join(out, "data", f"{shard_name(down)}.js"), "w") as fh:
+            fh.write(_script(shard_name(down), _shard(views[down], [[mc, mains[down][mc]] for mc in ordered], tags)))
+    shutil.copyfile(os.path.join(VIEWER_DIR, "viewer.js"), os.path.join(out, "viewer.js"))
+    if os.path.exists(LOGO):
+        shutil.copyfile(LOGO, os.path.join(out, os.path.basename(LOGO)))
+    with open(os.path.join(out, "index.html"), "w") as fh:
+        fh.write(viewer_page(opponent, store.partitions[opponent].label, [shard_name(d) for d in downs]))
+
+    size = sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(out) for f in files)
+    print(f"Bundle {opponent}: {sum(len(v) for v in views.values())} views, {size / 1024:.0f} KiB in {out} "
+          f"({time.perf_counter() - t0:.1f}s)")
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the offline scouting bundle for one opponent.")
+    parser.add_argument("--opponent", help="partition key, e.g. RICHMOND|2024 (default partition when omitted)")
+    parser.add_argument("--out", default="scouting_bundle", help="output directory")
+    parser.add_argument("--jobs", type=int, help="worker processes (default: every core)")
+    args = parser.parse_args(argv)
+    build(args.opponent, args.out, args.jobs)
+
+
+if __name__ == "__main__":
+    main()
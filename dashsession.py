@@ -0,0 +1,127 @@
+"""A minimal Dash renderer for driving the app without a browser.
+
+`DashSession` reads the callback graph from `/_dash-dependencies`, keeps the
+component props of one page view and fires callbacks through
+`/_dash-update-component` as the browser would. That means the initial callbacks
+after navigation, then every callback listening to a changed property, then
+their dependents. It talks to the app through any object with
+`request(method, path, body=None) -> (status, body bytes)`. loadtest.py uses one
+over HTTP; warmup.py uses one over the Flask test client.
+"""
+import json
+import time
+
+
+class DashSession:
+    """Minimal Dash renderer: tracks component props and fires callbacks like the browser."""
+
+    def __init__(self, http, dependencies, record, rng):
+        self.http = http
+        self.deps = dependencies
+        self.record = record
+        self.rng = rng
+        self.props = {}
+        self.ids = set()
+
+    @staticmethod
+    def _outputs(dep):
+        out = dep["output"]
+        if out.startswith(".."):
+            return [o for o in out.strip(".").split("...")]
+        return [out]
+
+    def _ready(self, dep):
+        needed = [o.rsplit(".", 1)[0] for o in self._outputs(dep)]
+        needed += [i["id"] for i in dep["inputs"]]
+        return all(cid in self.ids for cid in needed)
+
+    def _collect_ids(self, node):
+        if isinstance(node, list):
+            for child in node:
+                self._collect_ids(child)
+        elif isinstance(node, dict) and "props" in node:
+            props = node["props"]
+            cid = props.get("id")
+            if isinstance(cid, str):
+                self.ids.add(cid)
+                for key, value in props.items():
+                    if key not in ("children", "id"):
+                        self.props.setdefault(f"{cid}.{key}", value)
+            self._collect_ids(props.get("children"))
+
+    def _fire(self, dep, changed):
+        outputs = self._outputs(dep)
+        payload = {
+            "output": dep["output"],
+            "outputs": [{"id": o.rsplit(".", 1)[0], "property": o.rsplit(".", 1)[1]} for o in outputs],
+            "inputs": [{"id": i["id"], "property": i["property"], "value": self.props.get(f"{i['id']}.{i['property']}")} for i in dep["inputs"]],
+            "state": [{"id": s["id"], "property": s["property"], "value": self.props.get(f"{s['id']}.{s['property']}")} for s in dep.get("state", [])],
+            "changedPropIds": sorted(changed),
+        }
+        if not dep["output"].startswith(".."):
+            payload["outputs"] = payload["outputs"][0]
+        t0 = time.perf_counter()
+        try:
+            status, body = self.http.request("POST", "/_dash-update-component", payload)
+        except Exception:
+            status, body = None, b""
+        self.record(",".join(dict.fromkeys(o.rsplit(".", 1)[0] for o in outputs)), time.perf_counter() - t0, status)
+        if status != 200:
+            return {}
+        response = json.loads(body).get("response", {})
+        updates = {}
+        for cid, props in response.items():
+            for prop, value in props.items():
+                key = f"{cid}.{prop}"
+                if prop == "children":
+                    self._collect_ids(value)
+                if self.props.get(key) != value:
+                    updates[key] = value
+                self.props[key] = value
+        return updates
+
+    def propagate(self, changed, skip=None):
+        """Fire every ready callback listening to `changed`, then chase their outputs."""
+        fired = set()
+        queue = [(set(changed), skip)]
+        while queue:
+            changed_now, source = queue.pop(0)
+            for dep in self.deps:
+                if dep["output"] in fired or dep["output"] == source or not self._ready(dep):
+                    continue
+                inputs = {f"{i['id']}.{i['property']}" for i in dep["inputs"]}
+                hit = inputs & changed_now
+                if not hit:
+                    continue
+                fired.add(dep["output"])
+                updates = self._fire(dep, hit)
+                if updates:
+                    queue.append((set(updates), dep["output"]))
+
+    def load(self, pathname):
+        self.props = {"url.pathname": pathname, "sidebar-state.data": True}
+        self.ids = {"url", "sidebar-state", "sidebar-container", "sidebar-open-btn", "page-content-container"}
+        known = set(self.ids)
+        self.propagate({"url.pathname", "sidebar-state.data"})
+        # Initial render: fire every callback whose components just appeared
+        initial = {key for key in self.props if key.split(".", 1)[0] not in known}
+        for dep in self.deps:
+            for i in dep["inputs"]:
+                if i["id"] in self.ids and i["id"] not in known:
+                    initial.add(f"{i['id']}.{i['property']}")
+        self.propagate(initial)
+
+    def step(self, action, target, value):
+        if action == "load":
+            self.load(target)
+            return
+        if action == "pick":
+            options = self.props.get(f"{target}.options") or []
+            choices = [o["value"] for o in options if isinstance(o, dict) and not o.get("disabled")]
+            if not choices:
+                return
+            target, value = f"{target}.value", self.rng.choice(choices)
+        elif action == "clear":
+            target, value = f"{target}.value", None
+        self.props[target] = value
+        self.propagate({target})
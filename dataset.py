@@ -0,0 +1,168 @@
+"""The dataset version callbacks read: opponent play store plus the W&M spring table.
+
+`current()` returns an immutable `Dataset`. A watcher thread (one per process,
+started on the first request) polls the play exports (playstore.export_paths)
+and spring_data.xlsx every `WMFB_RELOAD_INTERVAL_S` seconds (default 5; 0
+turns it off). Once a change has been stable for one poll it builds the next
+version in the background and swaps it in with a single assignment, so a
+callback that already fetched the current dataset finishes against the old one.
+
+- new play exports only: the store is cloned and just the new plays ingested
+  (PlayStore.ingest), the loaded partitions keep their tallies;
+- a play export changed or removed: a fresh store is built and the previously
+  pinned partitions are loaded again;
+- spring_data.xlsx changed: the W&M table (and its indexes) is rebuilt.
+
+`version` is a hash of the source files' paths, sizes and modification times,
+so every worker agrees on it; caches keyed by it never serve stale results.
+Tables rebuilt after fork are private to the worker that built them.
+
+`BUILD` is the same for the deployed code: `WMFB_BUILD` when set (e.g. the
+git rev being deployed), otherwise a hash of the app's modules and assets/.
+Caches that outlive a deploy (resultcache.py, snapshot URLs) key on both.
+"""
+import hashlib
+import os
+import threading
+import time
+
+import metrics
+import playstore
+import SpringFootball
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+RELOAD_INTERVAL = float(os.environ.get("WMFB_RELOAD_INTERVAL_S", "5"))
+
+
+def _build():
+    if os.environ.get("WMFB_BUILD"):
+        return os.environ["WMFB_BUILD"]
+    paths = [os.path.join(ROOT, name) for name in os.listdir(ROOT) if name.endswith(".py")]
+    for folder, _dirs, names in os.walk(os.path.join(ROOT, "assets")):
+        paths += [os.path.join(folder, name) for name in names]
+    digest = hashlib.sha1()
+    for path in sorted(paths):
+        digest.update(os.path.relpath(path, ROOT).encode() + b"\0")
+        with open(path, "rb") as fh:
+            digest.update(fh.read())
+    return digest.hexdigest()[:12]
+
+
+BUILD = _build()
+
+
+def _sources():
+    return playstore.export_paths() + [SpringFootball.SPRING_EXPORT]
+
+
+def fingerprint(paths):
+    """path -> (size, mtime_ns) for every path that exists."""
+    found = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        found[path] = (st.st_size, st.st_mtime_ns)
+    return found
+
+
+class Dataset:
+    def __init__(self, plays, wm, files, spring=None):
+        self.plays = plays
+        self.wm = wm
+        # Indexes for the W&M concept page (kept while the spring table is unchanged)
+        self.spring = spring if spring is not None else SpringFootball.SpringPlays(wm)
+        self.files = files
+        digest = hashlib.sha1(repr(sorted(files.items())).encode()).hexdigest()
+        self.version = digest[:12]
+
+
+_current = Dataset(playstore.store, SpringFootball.WM_clean, fingerprint(_sources()))
+_watcher_pid = None
+_start_lock = threading.Lock()
+
+
+def current():
+    return _current
+
+
+def _rebuild(old, files):
+    # Next Dataset for the source files `files` (see module docstring); None if unchanged
+    spring = SpringFootball.SPRING_EXPORT
+    old_plays = {p: s for p, s in old.files.items() if p != spring}
+    new_plays = {p: s for p, s in files.items() if p != spring}
+    plays, wm, spring_index, kinds = old.plays, old.wm, old.spring, []
+
+    if files.get(spring) != old.files.get(spring):
+        wm, spring_index = SpringFootball.load_spring(), None
+        kinds.append("spring")
+
+    changed = [p for p, s in old_plays.items() if new_plays.get(p) != s]
+    added = [p for p in new_plays if p not in old_plays]
+    if changed:
+        plays = playstore.PlayStore(list(new_plays), old.plays.budget_bytes)
+        plays.preload(old.plays.pinned())
+        kinds.append("full")
+    elif added:
+        plays = old.plays.clone()
+        for path in added:
+            plays.ingest(path)
+        kinds.append("append")
+
+    if not kinds:
+        return None
+    for kind in kinds:
+        metrics.inc("wmfb_dataset_reloads_total", (("kind", kind),), help_text="Dataset rebuilds by kind")
+    return Dataset(plays, wm, files, spring_index)
+
+
+def reload():
+    """Rebuild from the files on disk now; returns the new version or None."""
+    global _current
+    old = _current
+    t0 = time.perf_counter()
+    new = _rebuild(old, fingerprint(_sources()))
+    if new is None:
+        return None
+    _current = new
+    print(f"Dataset {old.version} -> {new.version} in {time.perf_counter() - t0:.2f}s")
+    return new.version
+
+
+def _watch(interval):
+    pending = failed = None
+    while True:
+        time.sleep(interval)
+        files = fingerprint(_sources())
+        if files == _current.files or files == failed:
+            pending = None
+            continue
+        if files != pending:
+            # Wait one more poll so a file still being written is not read half-way
+            pending = files
+            continue
+        try:
+            reload()
+        except Exception as exc:  # keep serving the old version; retried on the next change
+            metrics.inc("wmfb_dataset_reload_errors_total", (), help_text="Dataset rebuilds that failed")
+            print(f"Warning: dataset reload failed, keeping {_current.version}: {exc!r}")
+            failed = files
+        pending = None
+
+
+def start_watcher():
+    """Start this process's watcher thread (no-op if running or disabled)."""
+    global _watcher_pid
+    if RELOAD_INTERVAL <= 0 or _watcher_pid == os.getpid():
+        return
+    with _start_lock:
+        if _watcher_pid == os.getpid():
+            return
+        _watcher_pid = os.getpid()
+        threading.Thread(target=_watch, args=(RELOAD_INTERVAL,), name="wmfb-reload", daemon=True).start()
+
+
+def version_samples():
+    """Samples for the `wmfb_dataset_version_info` gauge."""
+    return {(("version", _current.version),): 1}
@@ -0,0 +1,226 @@
+"""Download the plays behind the current view as CSV, Excel or Parquet.
+
+  /export/plays.<fmt>?opponent=&down=&distance=&concept=&tag=&filter=&match=
+                      &dist_bucket=&person=&off_form=&motion=&hash=&coverage=&front=
+                      &distance_range=&zone_range=&columns=
+      the opponent page's filtered play table (same filters as its dropdowns;
+      multi-select filters repeat the argument, ranges are "low-high" with
+      either end optional)
+  /export/player.<fmt>?position=&player=&columns=
+      one W&M player's spring plays, as listed on the W&M page
+
+`fmt` is csv, xlsx or parquet. `columns` (comma-separated) keeps only those
+columns, in that order. Rows are encoded `WMFB_EXPORT_CHUNK_ROWS` (default
+5000) at a time and each chunk is sent as soon as it is encoded, so a large
+view is never held in memory as one encoded file. Excel workbooks are written
+row by row to a temporary file and streamed from there once complete, since
+the format needs its index at the end.
+"""
+import io
+import os
+import re
+import tempfile
+from urllib.parse import urlencode
+
+from flask import Response, request, stream_with_context
+
+from queries import RANGE_FILTERS, SELECT_FILTERS, as_list, player_plays, player_plays_table, select_plays
+
+CHUNK_ROWS = int(os.environ.get("WMFB_EXPORT_CHUNK_ROWS", "5000"))
+MIMETYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def _chunks(df):
+    for start in range(0, len(df), CHUNK_ROWS):
+        yield df.iloc[start:start + CHUNK_ROWS]
+
+
+def _csv(df):
+    yield df.iloc[:0].to_csv(index=False)
+    for chunk in _chunks(df):
+        yield chunk.to_csv(index=False, header=False)
+
+
+class Sink(io.RawIOBase):
+    """Write-only file object that hands over whatever was written to it since the
+    last drain(), so a Parquet or Arrow writer's output streams chunk by chunk."""
+
+    def __init__(self):
+        self.parts = []
+        self.offset = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.offset
+
+    def drain(self):
+        data = b"".join(self.parts)
+        self.parts = []
+        return data
+
+
+def _parquet(df):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    sink = Sink()
+    schema = pa.Schema.from_pandas(df.iloc[:CHUNK_ROWS], preserve_index=False)
+    with pq.ParquetWriter(sink, schema) as writer:
+        for chunk in _chunks(df):
+            # One row group per chunk
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def _xlsx(df):
+    from openpyxl import Workbook
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("plays")
+    sheet.append([str(c) for c in df.columns])
+    for chunk in _chunks(df):
+        for row in chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None):
+            sheet.append(row)
+    with tempfile.TemporaryFile() as fh:
+        workbook.save(fh)
+        fh.seek(0)
+        while True:
+            data = fh.read(64 * 1024)
+            if not data:
+                break
+            yield data
+
+
+WRITERS = {"csv": _csv, "xlsx": _xlsx, "parquet": _parquet}
+
+
+def select_columns(df, columns):
+    """`df` restricted to the comma-separated `columns` (all columns when empty)."""
+    if not columns:
+        return df
+    wanted = [c.strip() for c in columns.split(",") if c.strip()]
+    missing = [c for c in wanted if c not in df.columns]
+    if missing:
+        raise BadRequest(f"unknown columns {missing}; available: {list(df.columns)}")
+    return df[wanted]
+
+
+def _int_args(args, name):
+    try:
+        return [int(value) for value in args.getlist(name) if value != ""]
+    except ValueError:
+        raise BadRequest(f"{name} must be an integer")
+
+
+def _range_args(args):
+    # {'distance': [low, high], ...} from `<key>_range=low-high` args
+    ranges = {}
+    for key in RANGE_FILTERS:
+        value = args.get(f"{key}_range")
+        if not value:
+            continue
+        low, sep, high = value.partition("-")
+        try:
+            ranges[key] = [int(low) if low else None, int(high) if high else None]
+        except ValueError:
+            sep = ""
+        if not sep:
+            raise BadRequest(f"{key}_range must be low-high")
+    return ranges
+
+
+def play_filter_args(args):
+    """The page's `play-filters` store (see queries.play_bitmap) from query args."""
+    play_filters = _range_args(args)
+    for key in SELECT_FILTERS:
+        if args.getlist(key):
+            play_filters[key] = args.getlist(key)
+    if args.get("match") == "all":
+        play_filters["match"] = "all"
+    return play_filters
+
+
+def opponent_filters(args):
+    """(opponent, down, distance, main_concept, tag, filter_value, play_filters) from query
+    args (as produced by `plays_url`), in the order queries.select_plays takes them."""
+    return (args.get("opponent") or None, args.getlist("down"), _int_args(args, "distance"),
+            args.getlist("concept"), args.getlist("tag"), args.getlist("filter"), play_filter_args(args))
+
+
+def opponent_view(args):
+    """The opponent page's filtered plays for query args."""
+    return select_plays(*opponent_filters(args))
+
+
+def player_view(args):
+    return player_plays_table(player_plays(args.get("position"), args.get("player")))
+
+
+def play_filter_params(play_filters):
+    # Query args for a `play-filters` store (inverse of play_filter_args)
+    params = {}
+    for key, value in (play_filters or {}).items():
+        if key in RANGE_FILTERS:
+            low, high = value
+            params[f"{key}_range"] = f"{'' if low is None else low}-{'' if high is None else high}"
+        elif key in SELECT_FILTERS or key == "match":
+            params[key] = value
+    return params
+
+
+def plays_url(fmt, down=None, distance=None, main_concept=None, tag=None, filter_value=None, opponent=None, play_filters=None):
+    """Export link for the opponent page's current dropdown values."""
+    params = {"opponent": opponent, "down": as_list(down), "distance": as_list(distance), "concept": as_list(main_concept),
+              "tag": as_list(tag), "filter": as_list(filter_value), **play_filter_params(play_filters)}
+    return f"/export/plays.{fmt}?" + urlencode({k: v for k, v in params.items() if v not in (None, "", [])}, doseq=True)
+
+
+def player_url(fmt, position=None, player=None):
+    return f"/export/player.{fmt}?" + urlencode({k: v for k, v in (("position", position), ("player", player)) if v})
+
+
+def _stream(df, fmt, name):
+    filename = re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_") or "plays"
+    return Response(stream_with_context(WRITERS[fmt](df)), mimetype=MIMETYPES[fmt], headers={
+        "Content-Disposition": f'attachment; filename="{filename}.{fmt}"',
+        "X-Export-Rows": str(len(df)),
+    })
+
+
+def register(app):
+    """Add the /export routes to the Flask server of a Dash app."""
+    server = app.server
+
+    def _export(view, name, fmt):
+        if fmt not in WRITERS:
+            return Response(f"unknown format {fmt!r}; use one of {sorted(WRITERS)}\n", status=404, mimetype="text/plain")
+        try:
+            df = select_columns(view(request.args), request.args.get("columns"))
+        except BadRequest as exc:
+            return Response(f"{exc}\n", status=400, mimetype="text/plain")
+        return _stream(df, fmt, name)
+
+    @server.route("/export/plays.<fmt>")
+    def _export_plays(fmt):
+        name = "-".join(v for v in (request.args.get("opponent"), request.args.get("down"), "plays") if v)
+        return _export(opponent_view, name, fmt)
+
+    @server.route("/export/player.<fmt>")
+    def _export_player(fmt):
+        return _export(player_view, f"{request.args.get('player') or 'player'}-plays", fmt)
+
+    return app
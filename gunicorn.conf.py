@@ -0,0 +1,23 @@
+# Gunicorn settings for the dashboard (picked up by the Procfile).
+#
+# Preload mode (default): the master imports app.py once, loading the pinned
+# opponent partitions (playstore.py) and the SpringFootball.py tables before
+# forking, and workers share those read-only buffers copy-on-write instead of
+# each loading their own copy. Other partitions load per worker on first use.
+# Set WMFB_PRELOAD=0 to go back to per-worker imports.
+import os
+
+preload_app = os.environ.get("WMFB_PRELOAD", "1") != "0"
+
+
+def pre_fork(server, worker):
+    # Keep the GC in every worker from touching (and so copying) the shared heap
+    if preload_app:
+        import sharedmem
+        sharedmem.freeze()
+
+
+def post_worker_init(worker):
+    # The listening sockets are bound; warm the result cache in the background (see warmup.py)
+    import warmup
+    warmup.start()
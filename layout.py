@@ -1,7 +1,13 @@
 # This file will contain the layout and navigation for the dashboard website.
+import re
+from html import escape
+
 from dash import dcc, html
+from dash.development.base_component import Component
 import dash_bootstrap_components as dbc
 
+VOID_TAGS = {"area", "br", "col", "hr", "img", "input", "link", "meta", "source", "wbr"}
+
 # Clean, functional sidebar with toggle button
 def sidebar(is_open=True):
     sidebar_style = {
@@ -39,7 +45,11 @@ def sidebar(is_open=True):
         html.H2("WM Football Dash", style={"color": "#FFC72C", "fontFamily": "Georgia, serif", "marginTop": "48px", "marginBottom": "32px", "textAlign": "center", "fontSize": "22px"}),
         html.Hr(style={"borderColor": "#FFC72C", "width": "80%"}),
         dcc.Link("William & Mary", href="/wm", style={"display": "block", "color": "#FFC72C", "fontSize": "20px", "fontFamily": "Georgia, serif", "marginBottom": "18px", "textAlign": "center", "textDecoration": "none"}),
-        dcc.Link("Richmond", href="/richmond", style={"display": "block", "color": "#FFC72C", "fontSize": "20px", "fontFamily": "Georgia, serif", "marginBottom": "18px", "textAlign": "center", "textDecoration": "none"}),
+        dcc.Link("W&M Concepts", href="/wm/concepts", style={"display": "block", "color": "#FFC72C", "fontSize": "20px", "fontFamily": "Georgia, serif", "marginBottom": "18px", "textAlign": "center", "textDecoration": "none"}),
+        dcc.Link("Opponents", href="/richmond", style={"display": "block", "color": "#FFC72C", "fontSize": "20px", "fontFamily": "Georgia, serif", "marginBottom": "18px", "textAlign": "center", "textDecoration": "none"}),
+        dcc.Link("Tendencies", href="/tendencies", style={"display": "block", "color": "#FFC72C", "fontSize": "20px", "fontFamily": "Georgia, serif", "marginBottom": "18px", "textAlign": "center", "textDecoration": "none"}),
+        dcc.Link("Compare", href="/compare", style={"display": "block", "color": "#FFC72C", "fontSize": "20px", "fontFamily": "Georgia, serif", "marginBottom": "18px", "textAlign": "center", "textDecoration": "none"}),
+        dcc.Link("Defense", href="/defense", style={"display": "block", "color": "#FFC72C", "fontSize": "20px", "fontFamily": "Georgia, serif", "marginBottom": "18px", "textAlign": "center", "textDecoration": "none"}),
         html.Hr(style={"borderColor": "#FFC72C", "width": "80%"}),
     ], id="sidebar", style=sidebar_style)
 
@@ -102,9 +112,39 @@ def spring_layout():
             # Plays table row
             dbc.Row([
                 dbc.Col([
-                    html.Div(id="player-plays-table-wm", style={"marginTop": "20px", "color": "#006341", "fontFamily": "Georgia, serif"})
+                    html.Div(id="player-plays-table-wm", style={"marginTop": "20px", "color": "#006341", "fontFamily": "Georgia, serif"}),
+                    html.Div(id="export-links-wm", style={"marginTop": "8px", "fontSize": "14px", "fontFamily": "Georgia, serif"})
                 ], width=12)
             ])
         ]),  # End offense-section-wm
         html.Div(style={"height": "50px"})
     ], fluid=True, style={"minHeight": "100vh", "paddingTop": "15px", "backgroundColor": "#FFF8E1"})
+
+
+def _css_name(prop):
+    # marginTop -> margin-top
+    return re.sub(r"([A-Z])", r"-\1", prop).lower()
+
+
+# Static markup for a tree of dash html components (plus dcc.Link), so pages served
+# without Dash (the offline scouting bundle, see bundle.py) share this file's styling
+def static_html(component):
+    if component is None:
+        return ""
+    if isinstance(component, (list, tuple)):
+        return "".join(static_html(c) for c in component)
+    if not isinstance(component, Component):
+        return escape(str(component))
+    tag = "a" if isinstance(component, dcc.Link) else type(component).__name__.lower()
+    attrs = []
+    for name, value in component.to_plotly_json()["props"].items():
+        if name == "children" or value is None or value is False:
+            continue
+        if name == "style":
+            value = ";".join(f"{_css_name(k)}:{v}" for k, v in value.items())
+        name = {"className": "class", "htmlFor": "for"}.get(name, name.lower())
+        attrs.append(name if value is True else f'{name}="{escape(str(value))}"')
+    opening = f"<{' '.join([tag] + attrs)}>"
+    if tag in VOID_TAGS:
+        return opening
+    return f"{opening}{static_html(getattr(component, 'children', None))}</{tag}>"
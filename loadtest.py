@@ -0,0 +1,269 @@
+"""Local load generator for the Dash app.
+
+Boots the app under gunicorn (one run per worker/thread configuration), replays
+scripted coach sessions as concurrent `/_dash-update-component` requests, and
+reports throughput, latency percentiles and error rates. Everything runs on
+this machine; no external services are needed.
+
+Usage examples:
+  # Compare three gunicorn configurations, 16 simulated coaches, 30s each
+  python loadtest.py --configs 1x1,2x4,4x8 --users 16 --duration 30
+
+  # Save results and compare them with the previous release
+  python loadtest.py --configs 2x4 --out loadtest-new.json --baseline loadtest-old.json
+
+  # Hit an app that is already running instead of booting one
+  python loadtest.py --url http://localhost:8051 --users 8
+
+The simulated client (dashsession.DashSession) behaves like the Dash renderer: it reads the callback graph
+from `/_dash-dependencies`, fires every callback whose inputs and outputs are on
+the page after navigation, and re-fires dependent callbacks whenever an output
+changes a value that another callback listens to.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+
+from dashsession import DashSession
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Session traces: each step is (action, target, value)
+#   ("load", pathname, None)       navigate and fire the page's initial callbacks
+#   ("set", "id.prop", value)      user changes a component property
+#   ("pick", "id", None)           user picks a random option from a dropdown
+#   ("clear", "id", None)          user clears a dropdown
+TRACES = {
+    "richmond_down_concept": [
+        ("load", "/richmond", None),
+        ("pick", "down-dropdown", None),
+        ("pick", "main-concept-dropdown", None),
+        ("pick", "tag-dropdown", None),
+        ("pick", "filter-dropdown", None),
+        ("clear", "tag-dropdown", None),
+        ("pick", "distance-dropdown", None),
+    ],
+    "richmond_coverage": [
+        ("load", "/richmond", None),
+        ("set", "down-dropdown.value", "Third"),
+        ("pick", "coverage-dropdown", None),
+        ("pick", "play-dropdown", None),
+        ("clear", "coverage-dropdown", None),
+    ],
+    "wm_concepts": [
+        ("load", "/wm/concepts", None),
+        ("set", "down-dropdown-wm.value", "First"),
+        ("pick", "main-concept-dropdown-wm", None),
+        ("pick", "tag-dropdown-wm", None),
+        ("pick", "distance-dropdown-wm", None),
+        ("pick", "filter-dropdown-wm", None),
+        ("clear", "tag-dropdown-wm", None),
+    ],
+    "wm_players": [
+        ("load", "/wm", None),
+        ("set", "position-dropdown-wm.value", "QB"),
+        ("pick", "player-dropdown-wm", None),
+        ("set", "position-dropdown-wm.value", "WR_TE"),
+        ("pick", "player-dropdown-wm", None),
+        ("pick", "player-dropdown-wm", None),
+    ],
+}
+
+
+class _Http:
+    """Keep-alive HTTP connection that reconnects after errors."""
+
+    def __init__(self, base_url, timeout=30):
+        parsed = urllib.parse.urlparse(base_url)
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.timeout = timeout
+        self.conn = None
+
+    def request(self, method, path, body=None):
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self.conn.request(method, path, body=data, headers=headers)
+                resp = self.conn.getresponse()
+                payload = resp.read()
+                if resp.getheader("Connection", "").lower() == "close":
+                    self.close()
+                return resp.status, payload
+            except (http.client.HTTPException, OSError):
+                self.close()
+                if attempt:
+                    raise
+        return None, b""
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[k]
+
+
+def summarize(samples, elapsed):
+    """Aggregate (endpoint, seconds, status) samples into a report dict."""
+    def block(rows):
+        lat = sorted(r[1] for r in rows)
+        errors = sum(1 for r in rows if r[2] not in (200, 204))
+        return {
+            "requests": len(rows),
+            "throughput_rps": len(rows) / elapsed if elapsed else 0.0,
+            "p50_ms": _percentile(lat, 50) * 1000,
+            "p90_ms": _percentile(lat, 90) * 1000,
+            "p95_ms": _percentile(lat, 95) * 1000,
+            "p99_ms": _percentile(lat, 99) * 1000,
+            "max_ms": (lat[-1] * 1000) if lat else 0.0,
+            "error_rate": errors / len(rows) if rows else 0.0,
+        }
+    by_endpoint = {}
+    for row in samples:
+        by_endpoint.setdefault(row[0], []).append(row)
+    report = block(samples)
+    report["elapsed_s"] = elapsed
+    report["endpoints"] = {name: block(rows) for name, rows in sorted(by_endpoint.items())}
+    return report
+
+
+def run_load(base_url, users, duration, traces, seed):
+    """Run `users` concurrent sessions against `base_url` for `duration` seconds."""
+    status, body = _Http(base_url).request("GET", "/_dash-dependencies")
+    if status != 200:
+        raise RuntimeError(f"could not read /_dash-dependencies (status {status})")
+    dependencies = json.loads(body)
+    samples = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def record(endpoint, seconds, status):
+        with lock:
+            samples.append((endpoint, seconds, status))
+
+    def user(idx):
+        rng = random.Random(seed + idx)
+        http = _Http(base_url)
+        names = sorted(traces)
+        while time.perf_counter() < deadline:
+            session = DashSession(http, dependencies, record, rng)
+            for action, target, value in TRACES[rng.choice(names)]:
+                if time.perf_counter() >= deadline:
+                    break
+                session.step(action, target, value)
+        http.close()
+
+    threads = [threading.Thread(target=user, args=(i,), daemon=True) for i in range(users)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return summarize(samples, time.perf_counter() - t0)
+
+
+def boot_app(workers, threads, port, extra_args=()):
+    """Start gunicorn with the given worker/thread counts and wait until it answers."""
+    cmd = [sys.executable, "-m", "gunicorn", "app:app", "--bind", f"127.0.0.1:{port}",
+           "--workers", str(workers), "--threads", str(threads), "--log-level", "warning"]
+    cmd += list(extra_args)
+    proc = subprocess.Popen(cmd, cwd=ROOT)
+    http = _Http(f"http://127.0.0.1:{port}", timeout=2)
+    waited = 0.0
+    while waited < 60:
+        if proc.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with code {proc.returncode}")
+        try:
+            status, _ = http.request("GET", "/_dash-dependencies")
+            if status == 200:
+                return proc
+        except Exception:
+            pass
+        time.sleep(0.5)
+        waited += 0.5
+    stop_app(proc)
+    raise RuntimeError("gunicorn did not become ready within 60s")
+
+
+def stop_app(proc):
+    proc.terminate()
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+def print_report(name, report, baseline=None):
+    print(f"\n== {name}: {report['requests']} requests in {report['elapsed_s']:.1f}s")
+    print(f"   throughput {report['throughput_rps']:.1f} req/s, errors {report['error_rate'] * 100:.2f}%")
+    line = f"   latency p50 {report['p50_ms']:.1f} ms  p90 {report['p90_ms']:.1f} ms  p95 {report['p95_ms']:.1f} ms  p99 {report['p99_ms']:.1f} ms"
+    if baseline:
+        line += f"   (baseline p95 {baseline['p95_ms']:.1f} ms, {baseline['throughput_rps']:.1f} req/s)"
+    print(line)
+    width = max((len(n) for n in report["endpoints"]), default=10)
+    for endpoint, stats in report["endpoints"].items():
+        print(f"   {endpoint:<{width}}  n={stats['requests']:<6} p50 {stats['p50_ms']:7.1f}  p95 {stats['p95_ms']:7.1f}  err {stats['error_rate'] * 100:.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay coach sessions against the Dash app and report capacity")
+    parser.add_argument("--configs", default="1x1,2x4", help="Comma-separated WORKERSxTHREADS gunicorn configurations")
+    parser.add_argument("--users", type=int, default=8, help="Concurrent simulated coaches")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds to run each configuration")
+    parser.add_argument("--port", type=int, default=8765, help="Port used when booting gunicorn")
+    parser.add_argument("--url", help="Target an already running app instead of booting gunicorn")
+    parser.add_argument("--traces", default=",".join(sorted(TRACES)), help="Comma-separated trace names to replay")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for option picks")
+    parser.add_argument("--out", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results from an earlier run to compare against")
+    args = parser.parse_args()
+
+    traces = [t.strip() for t in args.traces.split(",") if t.strip()]
+    unknown = [t for t in traces if t not in TRACES]
+    if unknown:
+        parser.error(f"unknown trace(s): {', '.join(unknown)}")
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh).get("results", {})
+
+    results = {}
+    if args.url:
+        results["external"] = run_load(args.url.rstrip("/"), args.users, args.duration, traces, args.seed)
+        print_report("external", results["external"], baseline.get("external"))
+    else:
+        for config in [c.strip() for c in args.configs.split(",") if c.strip()]:
+            workers, threads = (int(x) for x in config.lower().split("x"))
+            print(f"Booting gunicorn with {workers} worker(s) x {threads} thread(s)...")
+            proc = boot_app(workers, threads, args.port)
+            try:
+                results[config] = run_load(f"http://127.0.0.1:{args.port}", args.users, args.duration, traces, args.seed)
+            finally:
+                stop_app(proc)
+            print_report(config, results[config], baseline.get(config))
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump({"users": args.users, "duration": args.duration, "traces": traces, "results": results}, fh, indent=2)
+        print(f"\nResults written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Bytes held by each in-memory data structure, plus process resident size.
+
+Only opponent partitions loaded in the current dataset version (dataset.py)
+are listed, as `<partition>:<table>`. Views (the per-down tables are row
+slices of the partition's clean table) point at the same buffers as their
+parent, so every structure reports its total footprint and the bytes it holds
+that no earlier structure already accounted for.
+
+Usage:
+  python memreport.py          # print the report for a fresh import
+The same numbers are exported on /metrics as `wmfb_dataset_bytes`.
+"""
+import numpy as np
+import pandas as pd
+
+import sharedmem
+
+
+def _numpy_buffer(values):
+    base = values
+    while isinstance(base.base, np.ndarray):
+        base = base.base
+    return [(("np", base.__array_interface__["data"][0]), base.nbytes)]
+
+
+def _buffers(obj):
+    """(identity, nbytes) pairs for the memory behind a column or index."""
+    if isinstance(obj, pd.MultiIndex):
+        out = []
+        for level in obj.levels:
+            out.extend(_buffers(level))
+        for codes in obj.codes:
+            out.extend(_numpy_buffer(codes))
+        return out
+    arr = obj.array if hasattr(obj, "array") else obj
+    if isinstance(arr, pd.arrays.ArrowExtensionArray) or isinstance(arr, pd.arrays.ArrowStringArray):
+        chunked = arr.__arrow_array__()
+        out = []
+        for chunk in chunked.chunks:
+            for buf in chunk.buffers():
+                if buf is not None:
+                    out.append((("arrow", buf.address), buf.size))
+        return out
+    if isinstance(arr, pd.arrays.NumpyExtensionArray):
+        return _numpy_buffer(arr.to_numpy())
+    if isinstance(obj, pd.RangeIndex):
+        return [(("range", id(obj)), 0)]
+    if isinstance(obj, pd.Index) and isinstance(obj.dtype, np.dtype):
+        return _numpy_buffer(obj.to_numpy())
+    return [(("obj", id(arr)), int(getattr(arr, "nbytes", 0)))]
+
+
+def frame_buffers(df):
+    bufs = list(_buffers(df.index))
+    for name in df.columns:
+        bufs.extend(_buffers(df[name]))
+    return bufs
+
+
+def structures():
+    """Name -> DataFrame for every table the app keeps in memory."""
+    import dataset
+    data = dataset.current()
+    found = {}
+    for key, playset in data.plays.loaded().items():
+        for name, frame in playset.frames().items():
+            found[f"{key}:{name}"] = frame
+    found["WM_clean"] = data.wm
+    return found
+
+
+def report():
+    """Per-structure rows, total bytes and distinct bytes, plus process memory."""
+    seen = set()
+    rows = []
+    for name, frame in structures().items():
+        if frame is None:
+            continue
+        total = distinct = 0
+        for key, size in frame_buffers(frame):
+            total += size
+            if key not in seen:
+                seen.add(key)
+                distinct += size
+        rows.append({"structure": name, "rows": len(frame), "columns": frame.shape[1],
+                     "bytes": total, "distinct_bytes": distinct})
+    return {"structures": rows, "process": sharedmem.process_memory()}
+
+
+def metric_samples():
+    """Samples for the `wmfb_dataset_bytes` gauge."""
+    samples = {}
+    for row in report()["structures"]:
+        samples[(("structure", row["structure"]), ("kind", "total"))] = row["bytes"]
+        samples[(("structure", row["structure"]), ("kind", "distinct"))] = row["distinct_bytes"]
+    return samples
+
+
+def main():
+    data = report()
+    width = max(len(r["structure"]) for r in data["structures"])
+    print(f"{'structure':<{width}}  {'rows':>7}  {'cols':>4}  {'bytes':>11}  {'distinct':>11}")
+    for r in data["structures"]:
+        print(f"{r['structure']:<{width}}  {r['rows']:>7}  {r['columns']:>4}  {r['bytes']:>11,}  {r['distinct_bytes']:>11,}")
+    print(f"{'all structures':<{width}}  {'':>7}  {'':>4}  {'':>11}  {sum(r['distinct_bytes'] for r in data['structures']):>11,}")
+    for kind, value in data["process"].items():
+        print(f"process {kind}: {value / 1024 / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""Lightweight request / callback instrumentation for the dashboard.
+
+`instrument(app)` wraps every `@app.callback` registered afterwards and hooks the
+Flask server so each request records wall time, CPU time, rows scanned, response
+bytes and cache hits/misses. The numbers are returned to the browser as a
+`Server-Timing` header and exposed in Prometheus text format on `/metrics`.
+
+Counters live in process memory, so under gunicorn each worker reports its own
+values (scrape every worker or sum them in Prometheus).
+"""
+import functools
+import threading
+import time
+
+from flask import Response, g, has_request_context, request
+
+# Latency buckets in seconds (Prometheus histogram upper bounds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+_local = threading.local()
+
+# name -> {"help": str, "type": "counter"|"gauge"|"histogram", "samples": {labels: value}}
+_families = {}
+# Gauge callbacks evaluated at scrape time: name -> (help, fn returning {labels: value})
+_gauge_fns = {}
+
+
+def _family(name, kind, help_text):
+    fam = _families.get(name)
+    if fam is None:
+        fam = _families[name] = {"help": help_text, "type": kind, "samples": {}}
+    return fam
+
+
+def inc(name, labels, value=1, help_text=""):
+    """Add `value` to the counter `name` with the given label tuple."""
+    with _lock:
+        samples = _family(name, "counter", help_text)["samples"]
+        samples[labels] = samples.get(labels, 0) + value
+
+
+def observe(name, labels, seconds, help_text=""):
+    """Record one observation in the latency histogram `name`."""
+    with _lock:
+        samples = _family(name, "histogram", help_text)["samples"]
+        hist = samples.get(labels)
+        if hist is None:
+            hist = samples[labels] = {"buckets": [0] * len(LATENCY_BUCKETS), "sum": 0.0, "count": 0}
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                hist["buckets"][i] += 1
+        hist["sum"] += seconds
+        hist["count"] += 1
+
+
+def register_gauge(name, help_text, fn):
+    """Register a gauge whose samples are produced by `fn()` at scrape time.
+
+    `fn` returns a dict mapping label tuples (pairs of (key, value)) to numbers.
+    """
+    with _lock:
+        _gauge_fns[name] = (help_text, fn)
+
+
+def record_rows(n):
+    """Attribute `n` scanned rows to the callback/request currently running."""
+    stats = getattr(_local, "stats", None)
+    if stats is not None:
+        stats["rows"] += int(n)
+
+
+def record_cache(hit):
+    """Attribute a cache hit (True) or miss (False) to the current callback."""
+    stats = getattr(_local, "stats", None)
+    if stats is not None:
+        stats["cache_hits" if hit else "cache_misses"] += 1
+
+
+def timed(callback_id):
+    """Decorator that records timing and payload stats for one callback."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            outer = getattr(_local, "stats", None)
+            stats = _local.stats = {"rows": 0, "cache_hits": 0, "cache_misses": 0}
+            wall0, cpu0 = time.perf_counter(), time.thread_time()
+            failed = False
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                failed = True
+                raise
+            finally:
+                wall = time.perf_counter() - wall0
+                cpu = time.thread_time() - cpu0
+                _local.stats = outer
+                _record_callback(callback_id, wall, cpu, stats, failed)
+        return wrapper
+    return decorator
+
+
+def _record_callback(callback_id, wall, cpu, stats, failed):
+    labels = (("callback", callback_id),)
+    observe("wmfb_callback_duration_seconds", labels, wall, "Callback wall time")
+    inc("wmfb_callback_cpu_seconds_total", labels, cpu, "Callback CPU time")
+    inc("wmfb_callback_rows_scanned_total", labels, stats["rows"], "Rows scanned by callback")
+    inc("wmfb_callback_cache_hits_total", labels, stats["cache_hits"], "Callback cache hits")
+    inc("wmfb_callback_cache_misses_total", labels, stats["cache_misses"], "Callback cache misses")
+    if failed:
+        inc("wmfb_callback_errors_total", labels, 1, "Callbacks that raised")
+    if has_request_context():
+        # Dash runs one callback per /_dash-update-component request; keep the
+        # stats so after_request can attribute response bytes and add headers.
+        g.wmfb_callbacks = getattr(g, "wmfb_callbacks", []) + [(callback_id, wall, cpu, stats)]
+
+
+def _response_bytes(response):
+    if response.is_streamed or response.direct_passthrough:
+        return response.content_length or 0
+    return len(response.get_data())
+
+
+def _server_timing(callbacks, total):
+    parts = []
+    for callback_id, wall, cpu, stats in callbacks:
+        parts.append(f'cb;desc="{callback_id}";dur={wall * 1000:.2f}')
+        parts.append(f"cpu;dur={cpu * 1000:.2f}")
+        parts.append(f'rows;desc="{stats["rows"]}"')
+        if stats["cache_hits"] or stats["cache_misses"]:
+            parts.append(f'cache;desc="{"hit" if stats["cache_hits"] else "miss"}"')
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
+
+
+def render():
+    """Return all metrics in Prometheus text exposition format."""
+    def fmt_labels(labels, extra=()):
+        pairs = tuple(labels) + tuple(extra)
+        if not pairs:
+            return ""
+        body = ",".join('{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in pairs)
+        return "{" + body + "}"
+
+    lines = []
+    with _lock:
+        families = {name: (fam["help"], fam["type"], dict(fam["samples"])) for name, fam in _families.items()}
+        gauges = dict(_gauge_fns)
+    for name, (help_text, fn) in gauges.items():
+        try:
+            families[name] = (help_text, "gauge", fn())
+        except Exception:
+            continue
+    for name in sorted(families):
+        help_text, kind, samples = families[name]
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in sorted(samples.items()):
+            if kind == "histogram":
+                # observe() counts each value in every bucket >= it, so counts are cumulative
+                for bound, count in zip(LATENCY_BUCKETS, value["buckets"]):
+                    lines.append(f"{name}_bucket{fmt_labels(labels, (('le', bound),))} {count}")
+                lines.append(f"{name}_bucket{fmt_labels(labels, (('le', '+Inf'),))} {value['count']}")
+                lines.append(f"{name}_sum{fmt_labels(labels)} {value['sum']:.6f}")
+                lines.append(f"{name}_count{fmt_labels(labels)} {value['count']}")
+            else:
+                lines.append(f"{name}{fmt_labels(labels)} {value:g}")
+    return "\n".join(lines) + "\n"
+
+
+def instrument(app):
+    """Wrap `app.callback` and the Flask server of a Dash app with metrics.
+
+    Must be called before the callbacks are declared so the wrapper sees them.
+    """
+    server = app.server
+    register_callback = app.callback
+
+    def callback(*args, **kwargs):
+        register = register_callback(*args, **kwargs)
+
+        def decorator(func):
+            return register(timed(func.__name__)(func))
+        return decorator
+
+    app.callback = callback
+
+    @server.before_request
+    def _metrics_start():
+        g.wmfb_start = time.perf_counter()
+        g.wmfb_cpu_start = time.thread_time()
+
+    @server.after_request
+    def _metrics_finish(response):
+        start = getattr(g, "wmfb_start", None)
+        if start is None:
+            return response
+        total = time.perf_counter() - start
+        cpu = time.thread_time() - g.wmfb_cpu_start
+        route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        size = _response_bytes(response)
+        labels = (("route", route),)
+        observe("wmfb_http_request_duration_seconds", labels, total, "HTTP request wall time")
+        inc("wmfb_http_cpu_seconds_total", labels, cpu, "HTTP request CPU time")
+        inc("wmfb_http_response_bytes_total", labels, size, "HTTP response body bytes")
+        inc("wmfb_http_requests_total", labels + (("status", response.status_code),), 1, "HTTP requests")
+        callbacks = getattr(g, "wmfb_callbacks", [])
+        for callback_id, _wall, _cpu, _stats in callbacks:
+            inc("wmfb_callback_response_bytes_total", (("callback", callback_id),), size, "Callback response bytes")
+        response.headers["Server-Timing"] = _server_timing(callbacks, total)
+        return response
+
+    @server.route("/metrics")
+    def _metrics_endpoint():
+        return Response(render(), mimetype="text/plain; version=0.0.4")
+
+    return app
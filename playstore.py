@@ -0,0 +1,288 @@
+"""Partitioned store of opponent play exports.
+
+Every CSV export in `WMFB_PLAYS_DIR` (default `data/plays/`), plus the legacy
+`RU_data.csv` in the repository root, is scanned at startup for the offenses and
+seasons it contains. Only the `OFF TEAM` and `TAPE LABELS` columns are read for
+that scan. Plays are grouped into partitions keyed by offense team and season,
+for example `RICHMOND|2024`.
+
+A partition is read, cleaned (Football.clean_plays) and turned into a
+Football.PlaySet the first time a callback asks for it. Loaded partitions are
+kept in least-recently-used order and evicted once their combined size exceeds
+`WMFB_STORE_BUDGET_MB` (default 256). Partitions named in
+`WMFB_PRELOAD_PARTITIONS` are loaded at import and never evicted, so preloaded
+gunicorn workers share them (`default` means the default partition; empty
+means none).
+
+New games are added without rebuilding: `store.ingest(path)` appends only the
+plays whose TAPE LABELS the store has not seen and updates the loaded
+partitions' tallies with just those plays; `store.refresh()` does that for
+every export that appeared in WMFB_PLAYS_DIR since startup.
+
+Usage:
+  python playstore.py week9.csv [...]   # copy exports into WMFB_PLAYS_DIR and report new plays
+"""
+import glob
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+import metrics
+from Football import PlaySet, clean_plays, season_of
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+PLAYS_DIR = os.environ.get("WMFB_PLAYS_DIR", os.path.join(ROOT, "data", "plays"))
+LEGACY_EXPORT = os.path.join(ROOT, "RU_data.csv")
+BUDGET_BYTES = int(float(os.environ.get("WMFB_STORE_BUDGET_MB", "256")) * 1024 * 1024)
+DEFAULT_TEAM = "RICHMOND"
+
+
+def export_paths():
+    # Every play export the store reads: WMFB_PLAYS_DIR/*.csv, then the legacy export
+    paths = sorted(glob.glob(os.path.join(PLAYS_DIR, "*.csv")))
+    if os.path.exists(LEGACY_EXPORT):
+        paths.append(LEGACY_EXPORT)
+    return paths
+
+
+def partition_key(team, season):
+    return f"{team}|{season if season is not None else 'undated'}"
+
+
+def _raw_keys(raw):
+    # Partition key of every raw row ('' for header/total rows without an offense)
+    teams = raw["OFF TEAM"].astype(str).str.strip().str.upper() if "OFF TEAM" in raw.columns else pd.Series("", index=raw.index)
+    labels = raw["TAPE LABELS"] if "TAPE LABELS" in raw.columns else [None] * len(raw)
+    seasons = [season_of(label) for label in labels]
+    keys = [partition_key(t, s) if t and t != "NAN" else "" for t, s in zip(teams, seasons)]
+    return pd.Series(keys, index=raw.index)
+
+
+def _raw_labels(raw):
+    # Stripped TAPE LABELS of every raw row ('' when the play has none)
+    if "TAPE LABELS" not in raw.columns:
+        return pd.Series("", index=raw.index)
+    return raw["TAPE LABELS"].fillna("").astype(str).str.strip()
+
+
+class Partition:
+    # One offense/season: which files hold it and, once loaded, its PlaySet
+
+    def __init__(self, key):
+        self.key = key
+        self.team, self.season = key.split("|", 1)
+        self.files = []
+        self.labels = set()
+        self.raw_rows = 0
+        self.playset = None
+        self.nbytes = 0
+        self.pinned = False
+        self.lock = threading.Lock()
+
+    @property
+    def label(self):
+        return f"{self.team.title()} {self.season} ({self.raw_rows} plays)"
+
+
+class PlayStore:
+    def __init__(self, paths, budget_bytes=BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self.partitions = {}
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        for path in paths:
+            self._scan(path)
+
+    @classmethod
+    def from_env(cls):
+        paths = export_paths()
+        if not paths:
+            print("Warning: no play exports found (RU_data.csv or data/plays/*.csv). Opponent pages will be empty.")
+        return cls(paths)
+
+    def _scan(self, path):
+        try:
+            header = pd.read_csv(path, nrows=0).columns
+            usecols = [c for c in ("OFF TEAM", "TAPE LABELS") if c in header]
+            raw = pd.read_csv(path, usecols=usecols) if usecols else pd.DataFrame(index=pd.RangeIndex(0))
+        except (OSError, ValueError) as exc:
+            print(f"Warning: could not scan {path}: {exc}")
+            return
+        labels = _raw_labels(raw)
+        for key, rows in labels.groupby(_raw_keys(raw), sort=False):
+            if not key:
+                continue
+            part = self.partitions.setdefault(key, Partition(key))
+            fresh = rows[(rows == "") | ~rows.isin(part.labels)]
+            part.files.append(path)
+            part.labels.update(fresh[fresh != ""])
+            part.raw_rows += len(fresh)
+
+    def clone(self):
+        """Copy of the store sharing every loaded PlaySet, to ingest into without
+        changing what callbacks reading this store see."""
+        other = PlayStore([], self.budget_bytes)
+        with self._lock:
+            for key, part in self.partitions.items():
+                copy = Partition(key)
+                copy.files = list(part.files)
+                copy.labels = set(part.labels)
+                copy.raw_rows = part.raw_rows
+                copy.playset, copy.nbytes, copy.pinned = part.playset, part.nbytes, part.pinned
+                other.partitions[key] = copy
+            other._lru = OrderedDict(self._lru)
+        return other
+
+    def pinned(self):
+        return [k for k, part in self.partitions.items() if part.pinned]
+
+    def keys(self):
+        # Offense A-Z, newest season first
+        return sorted(self.partitions, key=lambda k: (self.partitions[k].team, -_season_sort(self.partitions[k].season)))
+
+    @property
+    def default_key(self):
+        keys = self.keys()
+        preferred = [k for k in keys if self.partitions[k].team == DEFAULT_TEAM]
+        return (preferred or keys or [None])[0]
+
+    def options(self):
+        return [{"label": self.partitions[k].label, "value": k} for k in self.keys()]
+
+    def get(self, key):
+        """PlaySet for `key` (default partition when None), loading it on first use."""
+        key = key if key in self.partitions else self.default_key
+        if key is None:
+            return PlaySet(pd.DataFrame())
+        part = self.partitions[key]
+        playset = part.playset
+        metrics.record_cache(playset is not None)
+        if playset is None:
+            with part.lock:
+                if part.playset is None:
+                    self._load(part)
+                playset = part.playset
+        with self._lock:
+            self._lru[key] = True
+            self._lru.move_to_end(key)
+        self._evict(keep=key)
+        return playset
+
+    def _load(self, part):
+        t0 = time.perf_counter()
+        frames = []
+        for path in part.files:
+            raw = pd.read_csv(path)
+            frames.append(raw[_raw_keys(raw) == part.key])
+        raw = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        if "TAPE LABELS" in raw.columns and len(frames) > 1:
+            # The same play exported twice (overlapping exports) counts once
+            labelled = raw["TAPE LABELS"].astype(str).str.strip().ne("")
+            raw = raw[~(labelled & raw.duplicated(subset="TAPE LABELS"))]
+        part.playset = PlaySet(clean_plays(raw))
+        part.nbytes = part.playset.nbytes()
+        print(f"Loaded partition {part.key}: {len(part.playset.clean)} plays, "
+              f"{part.nbytes / 1024:.0f} KiB in {time.perf_counter() - t0:.2f}s")
+
+    def ingest(self, path):
+        """Append the plays in export `path` that the store has not seen yet.
+
+        Plays are identified by TAPE LABELS; unlabelled rows are only taken from
+        files a partition has not read before. Loaded partitions are cleaned and
+        tallied for the new plays only (PlaySet.append) and swapped in; others pick
+        the file up when they load. Returns {partition key: plays added}.
+        """
+        raw = pd.read_csv(path)
+        keys = _raw_keys(raw)
+        labels = _raw_labels(raw)
+        added = {}
+        for key, rows in raw.groupby(keys, sort=False):
+            if not key:
+                continue
+            with self._lock:
+                part = self.partitions.setdefault(key, Partition(key))
+            row_labels = labels[rows.index]
+            known_file = path in part.files
+            fresh = rows[(row_labels != "") & ~row_labels.isin(part.labels) if known_file
+                         else (row_labels == "") | ~row_labels.isin(part.labels)]
+            if fresh.empty:
+                continue
+            with part.lock:
+                if not known_file:
+                    part.files.append(path)
+                part.labels.update(label for label in labels[fresh.index] if label)
+                part.raw_rows += len(fresh)
+                if part.playset is not None:
+                    part.playset = part.playset.append(clean_plays(fresh))
+                    part.nbytes = part.playset.nbytes()
+            added[key] = len(fresh)
+        if added:
+            print(f"Ingested {path}: " + ", ".join(f"{k} +{n}" for k, n in added.items()))
+            self._evict(keep=None)
+        return added
+
+    def refresh(self):
+        """Ingest exports that appeared in WMFB_PLAYS_DIR since startup."""
+        known = {path for part in self.partitions.values() for path in part.files}
+        added = {}
+        for path in sorted(glob.glob(os.path.join(PLAYS_DIR, "*.csv"))):
+            if path not in known:
+                for key, count in self.ingest(path).items():
+                    added[key] = added.get(key, 0) + count
+        return added
+
+    def _evict(self, keep):
+        with self._lock:
+            loaded = [k for k in self._lru if self.partitions[k].playset is not None]
+            total = sum(self.partitions[k].nbytes for k in loaded)
+            for key in loaded:
+                if total <= self.budget_bytes:
+                    break
+                part = self.partitions[key]
+                if key == keep or part.pinned:
+                    continue
+                total -= part.nbytes
+                part.playset = None
+                part.nbytes = 0
+                del self._lru[key]
+
+    def preload(self, keys):
+        for key in keys:
+            key = self.default_key if key == "default" else key
+            if key in self.partitions:
+                self.partitions[key].pinned = True
+                self.get(key)
+
+    def loaded(self):
+        return {k: self.partitions[k].playset for k in self._lru if self.partitions[k].playset is not None}
+
+
+def _season_sort(season):
+    return int(season) if str(season).isdigit() else -1
+
+
+store = PlayStore.from_env()
+store.preload([k.strip() for k in os.environ.get("WMFB_PRELOAD_PARTITIONS", "default").split(",") if k.strip()])
+
+
+def main(argv=None):
+    import argparse
+    import shutil
+    parser = argparse.ArgumentParser(description="Add game exports to the play store.")
+    parser.add_argument("exports", nargs="+", help="CSV exports to copy into WMFB_PLAYS_DIR")
+    args = parser.parse_args(argv)
+    os.makedirs(PLAYS_DIR, exist_ok=True)
+    for path in args.exports:
+        target = os.path.join(PLAYS_DIR, os.path.basename(path))
+        if os.path.abspath(path) != os.path.abspath(target):
+            shutil.copyfile(path, target)
+        added = store.ingest(target)
+        if not added:
+            print(f"{path}: no new plays")
+
+
+if __name__ == "__main__":
+    main()
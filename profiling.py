@@ -0,0 +1,235 @@
+"""Opt-in profiling of individual callbacks, routes and data ingest.
+
+Profiling is off unless one of these is set:
+
+- `WMFB_PROFILE`: comma-separated targets to profile on every call, e.g.
+  `update_player_stats,football_ingest,/_dash-update-component` (`*` = all).
+- `WMFB_PROFILE_TOKEN`: enables per-request profiling. A request carrying the
+  header `X-WMFB-Profile: <token>` has its callbacks profiled.
+
+Each profiled call runs under a stdlib sampling profiler (a background thread
+reading the target thread's stack) and tracemalloc. Results are written to
+`WMFB_PROFILE_DIR` (default `profiles/`):
+
+- `<tag>.folded`  collapsed stacks, ready for flamegraph.pl or speedscope
+- `<tag>.alloc.txt`  top allocation sites plus the callback id and inputs
+
+Boot time is always measured: `StartupTimer` laps the phases of importing
+Main.py (imports, data load, app modules, app setup, callback registration). They are
+printed once the app is ready, with a warning past `WMFB_STARTUP_BUDGET_S`
+(default 20; 0 = no budget).
+"""
+import contextlib
+import functools
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+PROFILE_HEADER = "X-WMFB-Profile"
+PROFILE_DIR = os.environ.get("WMFB_PROFILE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles"))
+SAMPLE_INTERVAL = float(os.environ.get("WMFB_PROFILE_INTERVAL_MS", "5")) / 1000.0
+TOP_ALLOCATIONS = 30
+STARTUP_BUDGET = float(os.environ.get("WMFB_STARTUP_BUDGET_S", "20"))
+
+# tracemalloc is process-global, so only one profile runs at a time
+_session_lock = threading.Lock()
+
+
+def _targets():
+    raw = os.environ.get("WMFB_PROFILE", "")
+    return {t.strip() for t in raw.split(",") if t.strip()}
+
+
+def enabled_for(target):
+    """True when `target` should be profiled for the current call."""
+    targets = _targets()
+    if "*" in targets or target in targets:
+        return True
+    token = os.environ.get("WMFB_PROFILE_TOKEN")
+    if not token:
+        return False
+    try:
+        from flask import has_request_context, request
+    except ImportError:
+        return False
+    return has_request_context() and request.headers.get(PROFILE_HEADER) == token
+
+
+class _Sampler(threading.Thread):
+    """Samples one thread's Python stack at a fixed interval into folded stacks."""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(name="wmfb-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = {}
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            key = ";".join(reversed(names))
+            self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def _tag(target, inputs):
+    blob = json.dumps(inputs, sort_keys=True, default=str)
+    digest = hashlib.sha1(blob.encode("utf-8")).hexdigest()[:8]
+    safe = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in target).strip("_") or "root"
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{safe}-{digest}", blob
+
+
+def _write_report(target, inputs, sampler, snapshot, elapsed):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    tag, blob = _tag(target, inputs)
+    folded_path = os.path.join(PROFILE_DIR, tag + ".folded")
+    with open(folded_path, "w", encoding="utf-8") as fh:
+        for stack, count in sorted(sampler.stacks.items(), key=lambda kv: -kv[1]):
+            fh.write(f"{stack} {count}\n")
+    alloc_path = os.path.join(PROFILE_DIR, tag + ".alloc.txt")
+    with open(alloc_path, "w", encoding="utf-8") as fh:
+        fh.write(f"target: {target}\n")
+        fh.write(f"inputs: {blob}\n")
+        fh.write(f"wall: {elapsed * 1000:.1f} ms, samples: {sampler.samples} @ {SAMPLE_INTERVAL * 1000:.1f} ms\n")
+        if snapshot is not None:
+            stats = snapshot.statistics("lineno")
+            total = sum(s.size for s in stats)
+            fh.write(f"traced allocations still alive: {total / 1024:.1f} KiB\n\n")
+            for stat in stats[:TOP_ALLOCATIONS]:
+                frame = stat.traceback[0]
+                fh.write(f"{stat.size / 1024:10.1f} KiB {stat.count:8d} blocks  {frame.filename}:{frame.lineno}\n")
+    return folded_path, alloc_path
+
+
+@contextlib.contextmanager
+def profile(target, inputs=None):
+    """Profile the enclosed block unconditionally (skips if another profile is running)."""
+    if not _session_lock.acquire(blocking=False):
+        yield
+        return
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(25)
+    sampler = _Sampler(threading.get_ident(), SAMPLE_INTERVAL)
+    sampler.start()
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - t0
+        sampler.stop()
+        snapshot = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        if started_tracing:
+            tracemalloc.stop()
+        try:
+            paths = _write_report(target, inputs or {}, sampler, snapshot, elapsed)
+            print(f"Profile for {target} written to {paths[0]}")
+        finally:
+            _session_lock.release()
+
+
+@contextlib.contextmanager
+def maybe_profile(target, inputs=None):
+    """Profile the enclosed block only when profiling is enabled for `target`."""
+    if enabled_for(target):
+        with profile(target, inputs):
+            yield
+    else:
+        yield
+
+
+def profiled(target):
+    """Decorator form of `maybe_profile`, tagging the report with the call's inputs."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled_for(target):
+                return func(*args, **kwargs)
+            with profile(target, {"args": list(args), "kwargs": kwargs}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class StartupTimer:
+    """Wall time of consecutive boot phases; lapping a phase again adds to it."""
+
+    def __init__(self):
+        self.started = self._last = time.perf_counter()
+        self.phases = {}
+
+    def lap(self, phase):
+        """Charge the time since the previous lap to `phase`."""
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self._last
+        self._last = now
+
+    def total(self):
+        return self._last - self.started
+
+    def report(self):
+        phases = ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in self.phases.items())
+        print(f"Startup: {phases} (total {self.total():.2f}s)")
+        if STARTUP_BUDGET and self.total() > STARTUP_BUDGET:
+            print(f"Warning: startup took {self.total():.2f}s, over the {STARTUP_BUDGET:g}s budget (WMFB_STARTUP_BUDGET_S)")
+
+    def samples(self):
+        """Samples for the `wmfb_startup_seconds` gauge."""
+        samples = {(("phase", phase),): seconds for phase, seconds in self.phases.items()}
+        samples[(("phase", "total"),)] = self.total()
+        return samples
+
+
+def instrument(app):
+    """Make every callback declared afterwards, and every route, profilable.
+
+    Call after `metrics.instrument(app)`: the wrapper installed last runs
+    innermost, so timing stays the outer layer.
+    """
+    server = app.server
+    register_callback = app.callback
+
+    def callback(*args, **kwargs):
+        register = register_callback(*args, **kwargs)
+
+        def decorator(func):
+            return register(profiled(func.__name__)(func))
+        return decorator
+
+    app.callback = callback
+
+    @server.before_request
+    def _profile_route_start():
+        from flask import g, request
+        rule = request.url_rule.rule if request.url_rule is not None else None
+        # Header-triggered profiling is handled per callback; routes need an explicit target
+        if rule and rule in _targets():
+            ctx = profile(rule, {"path": request.full_path})
+            ctx.__enter__()
+            g.wmfb_profile_ctx = ctx
+
+    @server.teardown_request
+    def _profile_route_finish(_exc):
+        from flask import g
+        ctx = g.pop("wmfb_profile_ctx", None)
+        if ctx is not None:
+            ctx.__exit__(None, None, None)
+
+    return app
@@ -0,0 +1,609 @@
+"""Filtering shared by the Dash callbacks and the HTTP endpoints.
+
+Opponent page: `play_bitmap` turns the page's filters into one bitmap over an
+opponent partition's bitmap indexes (PlaySet). Values of one filter are OR'ed,
+different filters AND'ed, and the distance / field-zone ranges come from binary
+search on sorted columns. `select_plays` returns the matching plays (with
+`WMFB_QUERY_BACKEND=sqlite`, from sqlbackend.py). `option_counts` and
+`coverage_concept_matrix` count plays for the dropdowns and coverage panels.
+W&M pages: `player_plays` picks one player's spring plays, and the wm_* queries
+do the same over the SpringPlays indexes. `concept_comparison` compares the
+spring plays with an opponent's.
+"""
+import difflib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import dataset
+import metrics
+from Football import COVERAGE_MATRIX_BY, DISTANCE_BUCKETS, DOWN_NAMES, _tally, yards_to_goal
+
+
+# Normalize concept strings (trim + uppercase) for robust filtering
+def norm(s):
+    # Safe normalization
+    try:
+        return str(s).strip().upper()
+    except Exception:
+        return ""
+
+
+# "pandas" (bitmap indexes over the DataFrames) or "sqlite" (sqlbackend.py)
+BACKEND = os.environ.get('WMFB_QUERY_BACKEND', 'pandas')
+
+# Range filters (the page's `play-filters` store and the export links): key -> the
+# PlaySet sorted column it selects on
+RANGE_FILTERS = {'distance': 'DIST', 'zone': 'YDS TO GOAL'}
+
+# Multi-select filters in the `play-filters` store: key -> PlaySet bitmap index
+SELECT_FILTERS = {
+    'dist_bucket': 'DIST BUCKET',
+    'person': 'PERSON', 'off_form': 'OFF FORM', 'motion': 'MOTION', 'hash': 'HASH',
+    'coverage': 'COVERAGE', 'front': 'FRONT',
+}
+
+
+# Main concepts offered by the opponent page's concept dropdown (explicit list provided by user)
+MAIN_CONCEPTS = [
+    '8/9', '12/13', '14/15', '16/17', '18/19', '22/23', '24/25', '28/29', '34/35', '36/37', '40/41', '46/47', '72/73',
+    '74/75', '212/213/LK/POP', '214/215', '218/219', '220/221', '222/223', '234/235/POP', '236/237/MOSS/TORPEDO', '240/241',
+    'AGGIE/STOP', 'AIR FORCE', 'ALOHA', 'ANIMAL HOUSE', 'ARMY', 'AUSSIE', 'BAYSIDE', 'BEAR/BULL', 'BERMUDA', 'BEYONCE',
+    'BILL/MARY', 'BLADE/RAZOR', 'BLAZE', 'BLUE/RED', 'BOLT/CRNR', 'BRANCH', 'BUNKER/OBOE/WHL', 'BURRITO', 'BUTCHER/GO',
+    'CALGARY/RODEO', 'CAMO', 'CAVALIER', 'CENTER', 'CHEESE', 'CHICAGO', 'COCAINE', 'COLT', 'COPPERHEAD/GUCCI', 'COWBOY/SHERIFF',
+    'CROSS', 'DANCER', 'DASH', 'DBL BOW', 'DELTA', 'DODGER', 'DOLPHIN', 'DONKEY', 'DRAGON', 'DRAKE/MIGOS', 'DRIVE', 'DSL',
+    'EAST/WEST', 'FADE', 'FOLLOW', 'FOX', 'GEE GEE', 'GODFATHER', 'GRASS 12/13/F/S', 'GREEN', 'HAWAII', 'HAWKEYE', 'HOOK',
+    'HOOSIERS/WHL/FOLLOW', 'HOSS', 'IOWA', 'JAY Z', 'JORDAN', 'KENTUCKY DERBY', 'KILL', 'LAMAR', 'LIMO', 'LINCOLN', 'MASSAGE',
+    'MAUI', 'MAYWEATHER', 'MESH', 'MOSS', 'NAS', 'NAVY', 'NO PLAY', 'NOVA', 'NY', 'OUTBACK', 'PEANUTS', 'PEDRO 36/37/MOSS',
+    'PELICAN', 'PIN', 'PIVOT', 'PLATINUM', 'PRISON', 'RACE/LEGGO', 'RAMBO/LIMBO', 'RATTLER', 'RENO/LAS VEGAS', 'RICKY/LUCY',
+    'RIP/LIZ', 'ROAST', 'ROCK/LAVA/PO', 'ROGER/LOUIE', 'RUNBACKS', 'SCAT', 'SEA/SYR', 'SHAVE', 'SKITTLES', 'SLAM', 'SNAG',
+    'SPACE', 'ST.LOUIS/RANGERS', 'STALLION', 'STICK', 'STING', 'STK 1/2', 'STOPS', 'STUTTER', 'SUBMARINE', 'SUBWAY', 'SWIPE',
+    'SWORD', 'T-PAIN', 'TANK', 'TENNESSEE', 'THOR', 'THRONE', 'THUNDERCAT', 'TOP GUN/MAVERICK/ROSCOE/BLF', 'TRAIN', 'TRIANGLE',
+    'TRICK', 'TRIM', 'TULSA', 'TUXEDO', 'TYSON', 'VENOM', 'VICTORY', 'WAHOO', 'WAVES', 'WHL/FOLLOW', 'WRENCH/BULLET', 'YOGI'
+]
+
+
+def as_list(value):
+    # Dropdown value (None, one value or a multi-select list) as a list
+    if value is None or value == '':
+        return []
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def range_bounds(ranges):
+    # {'distance': [low, high], ...} -> {'DIST': (low, high), ...} for the ranges that are set
+    ranges = ranges or {}
+    return {column: tuple(ranges[key]) for key, column in RANGE_FILTERS.items() if ranges.get(key)}
+
+
+# Per-down play table of the selected opponent partition (all downs when no down
+# is selected); counts rows scanned
+def base_plays(down, opponent):
+    plays = dataset.current().plays.get(opponent)
+    df = plays.data_sources[down] if down in plays.data_sources else plays.tendencies
+    metrics.record_rows(len(df))
+    return df
+
+
+# Result filter-dropdown values -> (column, value), falling back to the W&M column names
+RESULT_FILTERS = {
+    'efficient': (('Is_Successful', 'Efficient'), 1),
+    'nonefficient': (('Is_Successful', 'Efficient'), 0),
+    'explosive': (('Is_Explosive', 'Explosive'), 1),
+    'nonexplosive': (('Is_Explosive', 'Explosive'), 0),
+}
+
+
+def main_concept_values(concepts, main):
+    # Normalized concepts belonging to main concept `main` ("MAIN", "MAIN/...", "MAIN ...")
+    mc = norm(main)
+    return [c for c in concepts if c == mc or c.startswith(mc + '/') or c.startswith(mc + ' ')]
+
+
+def play_bitmap(plays, down=None, distance=None, main_concept=None, tag=None, filter_value=None, play_filters=None):
+    """Bitmap over `plays.tendencies` of the plays matching the opponent page's filters,
+    or None when no filter is set.
+
+    Each argument is one value or a list. Tags win over main concepts. Result flags
+    are OR'ed unless play_filters['match'] is 'all'; a custom distance range is
+    OR'ed with the distance buckets, the field zone AND'ed.
+    """
+    play_filters = play_filters or {}
+    selected = []
+    downs = [DOWN_NAMES[d] for d in as_list(down) if d in DOWN_NAMES]
+    if downs:
+        selected.append(plays.match('DN', downs))
+    if as_list(distance):
+        selected.append(plays.match('DIST', as_list(distance)))
+    tags = [norm(t) for t in as_list(tag)]
+    if tags:
+        selected.append(plays.match('OVO CONCEPT', tags))
+    elif as_list(main_concept):
+        concepts = plays.bitmaps['OVO CONCEPT'].values
+        selected.append(plays.match('OVO CONCEPT', [c for mc in as_list(main_concept) for c in main_concept_values(concepts, mc)]))
+    flags = [f for f in as_list(filter_value) if f in RESULT_FILTERS]
+    if flags and play_filters.get('match') == 'all':
+        selected.extend(plays.match('RESULT', [f]) for f in flags)
+    elif flags:
+        selected.append(plays.match('RESULT', flags))
+    for key, name in SELECT_FILTERS.items():
+        values = as_list(play_filters.get(key))
+        if not values:
+            continue
+        bits = plays.match(name, values)
+        if key == 'dist_bucket' and play_filters.get('distance'):
+            bits = bits | plays.bitmap_of(plays.range_rows(None, range_bounds({'distance': play_filters['distance']})))
+        selected.append(bits)
+    bounds = range_bounds({k: v for k, v in play_filters.items() if k in RANGE_FILTERS})
+    if as_list(play_filters.get('dist_bucket')):
+        bounds.pop('DIST', None)
+    if bounds:
+        selected.append(plays.bitmap_of(plays.range_rows(None, bounds)))
+    if not selected:
+        return None
+    bits = selected[0]
+    for other in selected[1:]:
+        bits = bits & other
+    return bits
+
+
+def select_plays(opponent, down=None, distance=None, main_concept=None, tag=None, filter_value=None, play_filters=None):
+    """Plays of the opponent partition matching the opponent page's filters (see
+    play_bitmap); the per-down view itself when one down is the only filter."""
+    plays = dataset.current().plays.get(opponent)
+    downs = [d for d in as_list(down) if d in DOWN_NAMES]
+    if not plays.bitmaps:
+        return plays.tendencies
+    if BACKEND == 'sqlite':
+        import sqlbackend
+        rows = sqlbackend.play_positions(opponent, plays, down=downs, distance=distance, main_concept=main_concept,
+                                         tag=tag, filter_value=filter_value, play_filters=play_filters)
+        metrics.record_rows(len(rows))
+        return plays.tendencies.iloc[rows]
+    bits = play_bitmap(plays, None, distance, main_concept, tag, filter_value, play_filters)
+    if bits is None and len(downs) <= 1:
+        return base_plays(downs[0] if downs else None, opponent)
+    if downs:
+        down_bits = plays.match('DN', [DOWN_NAMES[d] for d in downs])
+        bits = down_bits if bits is None else bits & down_bits
+    rows = plays.rows(bits)
+    metrics.record_rows(len(rows))
+    return plays.tendencies.iloc[rows]
+
+
+def option_counts(opponent, name, **filters):
+    """[(value, plays)] of bitmap index `name` among the plays matching `filters`
+    (keyword arguments of play_bitmap), most plays first, values without plays left out."""
+    plays = dataset.current().plays.get(opponent)
+    if name not in plays.bitmaps:
+        return []
+    index = plays.bitmaps[name]
+    bits = play_bitmap(plays, **filters)
+    counts = index.counts_within(bits) if bits is not None else dict(zip(index.values, index.counts.tolist()))
+    return sorted(((v, n) for v, n in counts.items() if n), key=lambda item: -item[1])
+
+
+
+def main_concept_counts(opponent, down=None, play_filters=None):
+    """{main concept: plays} for the MAIN_CONCEPTS played on the selected downs; a
+    play counts for a main concept when its concept is MAIN, MAIN/... or MAIN ..."""
+    # Plays per normalized concept (bitmap counts), summed per main concept
+    concept_counts = dict(option_counts(opponent, 'OVO CONCEPT', down=down, play_filters=play_filters))
+    counts = {}
+    for mc in set(MAIN_CONCEPTS):
+        cnt = sum(concept_counts[c] for c in main_concept_values(concept_counts, mc))
+        if cnt > 0:
+            counts[mc] = cnt
+    return counts
+
+
+def concept_tags(opponent, main_concept, down=None, play_filters=None):
+    """Sorted tags ("MAIN/..." or "MAIN ...") of the selected main concepts played on
+    the selected downs (on any down when those have no plays)."""
+    mains = [norm(mc) for mc in as_list(main_concept)]
+    if not mains:
+        return []
+    df = select_plays(opponent, down, play_filters=play_filters)
+    if df.empty:
+        df = select_plays(opponent, play_filters=play_filters)
+    concepts = df["OVO CONCEPT"].dropna().astype(str).unique()
+    return sorted(
+        c for c in concepts
+        if any(norm(c).startswith(mc + '/') or norm(c).startswith(mc + ' ') for mc in mains)
+    )
+
+
+def stat_cards(opponent, down=None, distance=None, main_concept=None, tag=None, filter_value=None, play_filters=None):
+    """Tendency / Efficiency % / Explosiveness % card texts for the opponent page's filters.
+
+    The 'efficient' flag is not applied (so explosiveness doesn't disappear when the
+    user selects Efficient). Without a concept or tag the cards total the selected
+    downs, and are blank ("–") without a down.
+    """
+    df = select_plays(opponent, down, play_filters=play_filters)
+    # Denominator: if distances are selected, the plays at those distances
+    total_plays = len(select_plays(opponent, down, distance, play_filters=play_filters)) if as_list(distance) else len(df)
+
+    if not as_list(tag) and not as_list(main_concept):
+        if not as_list(down):
+            return "–", "–", "–"
+        filtered_df = df
+    else:
+        flags = [f for f in as_list(filter_value) if f != 'efficient']
+        filtered_df = select_plays(opponent, down, distance, main_concept, tag, flags, play_filters)
+
+    plays_for_concept = len(filtered_df)
+    if plays_for_concept == 0 or total_plays == 0:
+        return "–", "–", "–"
+    efficient_count = int(filtered_df['Is_Successful'].sum())
+    explosive_count = int(filtered_df['Is_Explosive'].sum())
+    return (f"{(plays_for_concept / total_plays * 100):.1f}%",
+            f"{(efficient_count / plays_for_concept * 100):.1f}%",
+            f"{(explosive_count / plays_for_concept * 100):.1f}%")
+
+def coverage_concept_matrix(down, distance, filter_value, opponent, filters=tuple(RESULT_FILTERS), play_filters=None):
+    """Plays ('size'), success and explosive sums per (COVERAGE, OVO CONCEPT).
+
+    Summed from the opponent's coverage matrix tally (computed at ingest) for the
+    selected downs (downs 1-4 when none), distances, distance buckets and ranges and
+    result flags (one value or a list each, as in play_bitmap); only flags in
+    `filters` are applied. With any other multi-select filter (coverage, front,
+    ...; the tally has no level for most of them) the plays play_bitmap selects
+    are tallied instead.
+    """
+    plays = dataset.current().plays.get(opponent)
+    play_filters = play_filters or {}
+    if plays.bitmaps and any(as_list(play_filters.get(key)) for key in SELECT_FILTERS if key != 'dist_bucket'):
+        flags = [f for f in as_list(filter_value) if f in filters]
+        rows = plays.rows(play_bitmap(plays, down, distance, None, None, flags, play_filters))
+        metrics.record_rows(len(rows))
+        return _tally(plays.tendencies.iloc[rows], ['COVERAGE', 'OVO CONCEPT'])
+    tally = plays.tally(COVERAGE_MATRIX_BY)
+    index = tally.index
+    if tally.empty:
+        return tally.droplevel(['DN', 'DIST', 'FPOS', 'Is_Successful', 'Is_Explosive'])
+    downs = [DOWN_NAMES[d] for d in as_list(down) if d in DOWN_NAMES] or list(DOWN_NAMES.values())
+    mask = index.get_level_values('DN').isin(downs)
+    if as_list(distance):
+        mask &= index.get_level_values('DIST').isin(as_list(distance))
+
+    def within(values, low, high):
+        return (values >= (low if low is not None else -np.inf)) & (values <= (high if high is not None else np.inf))
+
+    dist = index.get_level_values('DIST').to_numpy(dtype='float64', na_value=np.nan)
+    buckets = [DISTANCE_BUCKETS[b] for b in as_list(play_filters.get('dist_bucket')) if b in DISTANCE_BUCKETS]
+    if play_filters.get('distance'):
+        buckets.append(tuple(play_filters['distance']))
+    if buckets:
+        in_bucket = np.zeros(len(index), dtype=bool)
+        for low, high in buckets:
+            in_bucket |= within(dist, low, high)
+        mask &= in_bucket
+    if play_filters.get('zone'):
+        mask &= within(yards_to_goal(index.get_level_values('FPOS')), *play_filters['zone'])
+    flags = [RESULT_FILTERS[f] for f in as_list(filter_value) if f in RESULT_FILTERS and f in filters]
+    if flags:
+        hits = [index.get_level_values(columns[0]).isin([value]) for columns, value in flags]
+        combined = hits[0]
+        for hit in hits[1:]:
+            combined = combined & hit if play_filters.get('match') == 'all' else combined | hit
+        mask &= combined
+    rows = tally[mask]
+    metrics.record_rows(len(rows))
+    return rows.groupby(level=['COVERAGE', 'OVO CONCEPT'], sort=False, dropna=False).sum()
+
+
+# Known jersey map (include explicit alias)
+JERSEY_MAP = {
+    "Damian Harris": 4, "Tyler Hughes": 6, "Noah Brannock": 8, "Joey Tomasso": 17,
+    "Carson Jenkins": 14, "Derrick Gurley": 15, "George White": 16, "Leonte Oulahi": 13,
+    "Isaiah Lemmond": 18, "Jor'dyn Whitelaw": 26, "Jack Zamer": 30, "Jack Reuter": 31,
+    "Josh Miller": 33, "Quinn Devlin": 37, "Tyson Garrett": 41, "Armon Wright": 80,
+    "Garrett Robertson": 81, "Garret Robertson": 81,  # alias: common single-t typo maps to 81
+    "Jack Baumgartner": 82, "Nasir Mahmoud": 83, "Joseph Johnson": 84, "Trey McDonald": 85,
+    "Jackson Blee": 86, "Sean McElwain": 87, "Owen Copeland": 88, "Haven Mullins": 89
+}
+
+
+# Helper to normalize dropdown names (e.g., 'Garrett_Robertson' -> 'Garrett Robertson')
+def normalize_player_key(s: str) -> str:
+    s = str(s or "").strip().replace("_", " ")
+    return " ".join(s.split())
+
+
+# Robust jersey resolver: direct, case-insensitive, then fuzzy match
+def resolve_jersey(name_raw: str):
+    name = normalize_player_key(name_raw)
+    # direct/alias match
+    num = JERSEY_MAP.get(name)
+    if num is not None:
+        return num
+    # case-insensitive match
+    lower = name.lower()
+    for k, v in JERSEY_MAP.items():
+        if k.lower() == lower:
+            return v
+    # fuzzy match for minor typos
+    match = difflib.get_close_matches(name, list(JERSEY_MAP), n=1, cutoff=0.85)
+    if match:
+        return JERSEY_MAP.get(match[0])
+    return None
+
+
+# W&M player lists: one folder of player photos ("<Name>.webp") per position
+PLAYER_PHOTOS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets', 'Players Photos')
+POSITIONS = ('QB', 'RB', 'WR_TE')
+
+
+def roster():
+    """{position: player names A-Z} as listed in the W&M page's player dropdown."""
+    players = {}
+    for position in POSITIONS:
+        folder = os.path.join(PLAYER_PHOTOS_DIR, position)
+        players[position] = sorted(f[:-5] for f in os.listdir(folder) if f.endswith('.webp')) if os.path.isdir(folder) else []
+    return players
+
+
+def _wm_player_columns(df):
+    # Numeric jersey / QB, trimmed R/P and the JERSEY_NUM helper the player filters match on
+    for col in ["JERSEY #", "QB"]:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    if "R/P" in df.columns:
+        df["R/P"] = df["R/P"].astype(str).str.strip()
+
+    # Extract digits from "JERSEY #" into numeric helper column used for matching
+    if "JERSEY #" in df.columns:
+        jersey_digits = df["JERSEY #"].astype(str).str.extract(r'(\d+)')[0]
+        df["JERSEY_NUM"] = pd.to_numeric(jersey_digits, errors="coerce")
+    else:
+        df["JERSEY_NUM"] = pd.NA
+    return df
+
+
+def player_plays(position, player):
+    """Spring plays for `player` ("Name" or "Name (...)") at `position` (QB, RB, WR_TE)."""
+    if position not in POSITIONS:
+        return pd.DataFrame()
+
+    # Normalize incoming player value and strip optional "(...)" suffix
+    player = str(player)
+    if '(' in player:
+        name = player.split(' (')[0]
+    else:
+        name = player
+    name = normalize_player_key(name)
+    # Special case for Leonte Oulahi: always use #13
+    jersey = 13 if position == "WR_TE" and name.lower() == "leonte oulahi" else resolve_jersey(name)
+
+    wm = dataset.current().wm
+    if BACKEND == 'sqlite':
+        import sqlbackend
+        rows, dtypes = sqlbackend.wm_player_positions(position, jersey)
+        metrics.record_rows(len(rows))
+        return _wm_player_columns(wm.iloc[rows].copy()).astype(dtypes)
+
+    df = _wm_player_columns(wm.copy())
+    metrics.record_rows(len(df))
+    # Use numeric helper JERSEY_NUM for comparisons
+    if position == "QB":
+        return df[(df["QB"] == jersey) & ((df["R/P"] == "P") | ((df["R/P"] == "R") & (df["JERSEY_NUM"] == jersey)))]
+    return df[df["JERSEY_NUM"] == jersey]
+
+
+def player_plays_table(df_player):
+    """Player plays as listed on the W&M page: image-like columns dropped, grouped by OVO RESULT."""
+    df_for_table = df_player.copy()
+    # Drop any column that contains image filenames, asset paths, or raw <img> HTML
+    img_like_patterns = [r"<img", r"\.webp", r"/assets/", r"\.jpg", r"data:image/"]
+    cols_to_drop = []
+    for col in df_for_table.columns:
+        try:
+            as_str = df_for_table[col].astype(str)
+            if any(as_str.str.contains(pat, na=False).any() for pat in img_like_patterns):
+                cols_to_drop.append(col)
+        except Exception:
+            # If conversion fails, be conservative and skip dropping
+            continue
+    if cols_to_drop:
+        df_for_table = df_for_table.drop(columns=cols_to_drop)
+    # Group rows together by OVO RESULT for easier review:
+    # collapse families like R* and C* so they render contiguously, then stable sort
+    if 'OVO RESULT' in df_for_table.columns:
+        def _group_result(series: pd.Series) -> pd.Series:
+            s = series.astype(str).str.strip().str.upper()
+            # Collapse families: any string starting with 'R' -> 'R'; starting with 'C' -> 'C'
+            s = s.str.replace(r'^\s*R.*$', 'R', regex=True)
+            s = s.str.replace(r'^\s*C.*$', 'C', regex=True)
+            return s
+        df_for_table['__RES_G__'] = _group_result(df_for_table['OVO RESULT'])
+        by_cols = ['__RES_G__', 'OVO RESULT'] + (['OVO CONCEPT'] if 'OVO CONCEPT' in df_for_table.columns else [])
+        df_for_table = df_for_table.sort_values(
+            by=by_cols,
+            key=lambda s: s.astype(str).str.strip().str.upper(),
+            kind='mergesort'
+        ).drop(columns='__RES_G__')
+    return df_for_table
+
+
+# === W&M concept page: SpringFootball.SpringPlays indexes over the spring table ===
+
+def wm_concept_values(concepts, main):
+    # Normalized W&M concepts belonging to main concept `main` ("MAIN" or "MAIN/...")
+    mc = norm(main)
+    return [c for c in concepts if c == mc or c.startswith(mc + '/')]
+
+
+def wm_bitmap(spring, down=None, distance=None, main_concept=None, tag=None, filter_value=None):
+    """Bitmap over `spring.clean` of the plays matching the W&M concept page's filters,
+    or None when no filter is set (one value or a list each, OR'ed within a filter;
+    tags win over main concepts)."""
+    selected = []
+    downs = [DOWN_NAMES.get(d, d) for d in as_list(down)]
+    if downs:
+        selected.append(spring.match('DN', downs))
+    if as_list(distance):
+        selected.append(spring.match('DIST', as_list(distance)))
+    tags = [norm(t) for t in as_list(tag)]
+    if tags:
+        selected.append(spring.match('OVO CONCEPT', tags))
+    elif as_list(main_concept):
+        concepts = spring.bitmaps['OVO CONCEPT'].values
+        selected.append(spring.match('OVO CONCEPT', [c for mc in as_list(main_concept) for c in wm_concept_values(concepts, mc)]))
+    flags = [f for f in as_list(filter_value) if f in RESULT_FILTERS]
+    if flags:
+        selected.append(spring.match('RESULT', flags))
+    if not selected:
+        return None
+    bits = selected[0]
+    for other in selected[1:]:
+        bits = bits & other
+    return bits
+
+
+def wm_rows(down=None, distance=None, main_concept=None, tag=None, filter_value=None):
+    """Row positions in the W&M spring table of the plays matching the W&M concept
+    page's filters (see wm_bitmap)."""
+    spring = dataset.current().spring
+    if not spring.bitmaps:
+        return np.arange(0)
+    if BACKEND == 'sqlite':
+        import sqlbackend
+        rows = sqlbackend.wm_positions(spring, down=down, distance=distance, main_concept=main_concept, tag=tag,
+                                       filter_value=filter_value)
+    else:
+        bits = wm_bitmap(spring, down, distance, main_concept, tag, filter_value)
+        rows = np.arange(len(spring.clean)) if bits is None else spring.rows(bits)
+    metrics.record_rows(len(rows))
+    return rows
+
+
+def wm_plays(down=None, distance=None, main_concept=None, tag=None, filter_value=None):
+    """Spring plays matching the W&M concept page's filters (only those rows are copied)."""
+    spring = dataset.current().spring
+    return spring.clean.iloc[wm_rows(down, distance, main_concept, tag, filter_value)]
+
+
+def _wm_counts(name, **filters):
+    # {value: plays} of SpringPlays index `name` among the plays matching `filters`, values without plays left out
+    spring = dataset.current().spring
+    if not spring.bitmaps:
+        return {}
+    index = spring.bitmaps[name]
+    bits = wm_bitmap(spring, **filters)
+    counts = index.counts_within(bits) if bits is not None else dict(zip(index.values, index.counts.tolist()))
+    return {value: n for value, n in counts.items() if n}
+
+
+def wm_main_concept_counts(down=None):
+    """{main concept: plays} on the selected down, most played first (ties in table
+    order); see SpringFootball.main_concept_of."""
+    counts = _wm_counts('MAIN CONCEPT', down=down)
+    return dict(sorted(counts.items(), key=lambda item: -item[1]))
+
+
+def wm_concept_tags(main_concept, down=None):
+    """Sorted tags ("MAIN/...") of the selected main concepts played on the selected down."""
+    mains = [norm(mc) for mc in as_list(main_concept)]
+    return sorted(c for c in _wm_counts('OVO CONCEPT', down=down) if any(c.startswith(mc + '/') for mc in mains))
+
+
+def wm_distances(down=None, main_concept=None, tag=None):
+    """Sorted distances of the plays matching the down and concept filters."""
+    return sorted(_wm_counts('DIST', down=down, main_concept=main_concept, tag=tag))
+
+
+def wm_stat_cards(down=None, distance=None, main_concept=None, tag=None):
+    """Tendency / Efficiency % / Explosiveness % card texts for the W&M concept page;
+    blank ("–") without a concept or tag. Tendency is the concept's share of the
+    plays on the selected down and distance."""
+    if not as_list(tag) and not as_list(main_concept):
+        return "–", "–", "–"
+    spring = dataset.current().spring
+    if not spring.bitmaps:
+        return "–", "–", "–"
+    total_plays = len(wm_rows(down, distance))
+    bits = wm_bitmap(spring, down, distance, main_concept, tag)
+    plays_for_concept = int(np.bitwise_count(bits).sum())
+    flags = spring.bitmaps['RESULT'].counts_within(bits)
+    tendency_val = f"{(plays_for_concept / total_plays * 100):.1f}%" if total_plays > 0 else "–"
+    efficiency_val = f"{(flags['efficient'] / plays_for_concept * 100):.1f}%" if plays_for_concept > 0 else "–"
+    explosive_val = f"{(flags['explosive'] / plays_for_concept * 100):.1f}%" if plays_for_concept > 0 else "–"
+    return tendency_val, efficiency_val, explosive_val
+
+
+# === W&M vs opponent concept comparison ===
+# Both sides are per-(DN, concept) tallies kept from ingest: the opponent PlaySet's
+# (DN, OVO CONCEPT) tally and SpringPlays.concept_tally. Concepts are joined on their
+# normalized name (the catalog key both pages filter on), so a comparison is an outer
+# join of two tables of a few hundred rows, cached per dataset version and opponent.
+
+COMPARISON_COLUMNS = ['DN', 'OVO CONCEPT', 'Main Concept', 'WM Plays', 'WM Efficiency %', 'WM Explosive %',
+                      'Opp Plays', 'Opp Success %', 'Opp Explosive %', 'Efficiency Gap']
+_comparisons = OrderedDict()
+_comparisons_lock = threading.Lock()
+
+
+def _concept_tally(tally):
+    # (DN, OVO CONCEPT) tally over downs 1-4, keyed by the normalized concept (blank concepts left out)
+    df = tally.reset_index()
+    df = df[df['OVO CONCEPT'].notna() & df['DN'].isin(list(DOWN_NAMES.values()))]
+    keys = [df['DN'].astype('int64'), df['OVO CONCEPT'].map(norm).rename('OVO CONCEPT')]
+    return df[['size', 'success', 'explosive']].groupby(keys).sum()
+
+
+def concept_comparison(opponent):
+    """W&M spring vs opponent plays, efficiency and explosiveness per (down, normalized
+    concept), most played (both sides) first within each down; a side without plays
+    of a concept has 0 plays and blank rates."""
+    from SpringFootball import main_concept_of
+    current = dataset.current()
+    store = current.plays
+    key = opponent if opponent in store.partitions else store.default_key
+    cache_key = (current.version, key)
+    with _comparisons_lock:
+        if cache_key in _comparisons:
+            _comparisons.move_to_end(cache_key)
+            return _comparisons[cache_key]
+    wm = _concept_tally(current.spring.concept_tally)
+    opp = _concept_tally(store.get(key).tally(('DN', 'OVO CONCEPT')))
+    joined = wm.join(opp, how='outer', lsuffix='_wm', rsuffix='_opp').fillna(0).astype('int64').reset_index()
+    out = joined[['DN', 'OVO CONCEPT']].copy()
+    out['Main Concept'] = out['OVO CONCEPT'].map(main_concept_of)
+    for side, prefix, success in (('wm', 'WM', 'Efficiency'), ('opp', 'Opp', 'Success')):
+        plays = joined[f'size_{side}']
+        rate = plays.where(plays > 0)
+        out[f'{prefix} Plays'] = plays
+        out[f'{prefix} {success} %'] = (joined[f'success_{side}'] / rate * 100).round(1)
+        out[f'{prefix} Explosive %'] = (joined[f'explosive_{side}'] / rate * 100).round(1)
+    out['Efficiency Gap'] = (out['WM Efficiency %'] - out['Opp Success %']).round(1)
+    order = (out['WM Plays'] + out['Opp Plays']).rename('total')
+    out = out.assign(_total=order).sort_values(['DN', '_total'], ascending=[True, False], kind='mergesort')
+    out = out.drop(columns='_total').reset_index(drop=True)
+    with _comparisons_lock:
+        _comparisons[cache_key] = out
+        while len(_comparisons) > 8:
+            _comparisons.popitem(last=False)
+    return out
+
+
+def comparison_rows(opponent, down=None, main_concept=None, min_plays=None, both=False):
+    """Rows of concept_comparison for the selected downs and main concepts, with at
+    least `min_plays` plays on each side that has any (both sides when `both`)."""
+    df = concept_comparison(opponent)
+    keep = np.ones(len(df), dtype=bool)
+    downs = [DOWN_NAMES[d] for d in as_list(down) if d in DOWN_NAMES]
+    if downs:
+        keep &= df['DN'].isin(downs).to_numpy()
+    mains = [norm(mc) for mc in as_list(main_concept)]
+    if mains:
+        keep &= df['Main Concept'].isin(mains).to_numpy()
+    wm, opp = df['WM Plays'].to_numpy(), df['Opp Plays'].to_numpy()
+    if both:
+        keep &= (wm > 0) & (opp > 0)
+    if min_plays:
+        keep &= ((wm == 0) | (wm >= min_plays)) & ((opp == 0) | (opp >= min_plays))
+    return df[keep]
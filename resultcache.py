@@ -0,0 +1,177 @@
+"""Persistent callback result cache shared by every worker (and kept across restarts).
+
+`instrument(app)` wraps every `@app.callback` registered afterwards. A call's
+output is stored in one SQLite file (`WMFB_RESULT_CACHE`, default
+`data/result_cache.sqlite`) under a hash of the build (dataset.BUILD), the
+dataset version, the callback id and its inputs. The inputs are canonical
+JSON, with None, "" and [] all read as "no selection", as queries.as_list
+does. Any worker then answers the same view from the file, so a popular view
+("Third down, no concept") is computed once per dataset version instead of once
+per worker per restart. A deploy changes the build, so the previous code's
+outputs are never served; they age out like any other entry.
+
+Values are the JSON Dash would send (components and figures as plain dicts),
+zlib-compressed. Entries are evicted least recently used first once the file's
+entries exceed `WMFB_RESULT_CACHE_MB` (default 64); a hit marks its entry used
+at most once per TOUCH_INTERVAL, so reads don't write. An empty path or a
+budget of 0 turns the cache off.
+
+Callbacks named in UNCACHED, calls that raise and outputs holding
+dash.no_update are never stored.
+"""
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+import dash
+from plotly.utils import PlotlyJSONEncoder
+
+import dataset
+import metrics
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+PATH = os.environ.get("WMFB_RESULT_CACHE", os.path.join(ROOT, "data", "result_cache.sqlite"))
+BUDGET_BYTES = int(float(os.environ.get("WMFB_RESULT_CACHE_MB", "64")) * 1024 * 1024)
+# A hit older than this many seconds is marked used again (hits don't write otherwise)
+TOUCH_INTERVAL = 60
+# Callbacks whose output depends on more than their inputs and the dataset version
+UNCACHED = {"toggle_sidebar", "update_player_photo_src"}
+
+_local = threading.local()
+
+
+def enabled():
+    return bool(PATH) and BUDGET_BYTES > 0
+
+
+def _connect():
+    # One connection per thread and process (sqlite3 connections don't survive fork)
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.pid == os.getpid():
+        return conn
+    if os.path.dirname(PATH):
+        os.makedirs(os.path.dirname(PATH), exist_ok=True)
+    conn = sqlite3.connect(PATH, timeout=5, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, version TEXT, callback TEXT, "
+                 "value BLOB, size INTEGER, used REAL)")
+    conn.execute("CREATE INDEX IF NOT EXISTS results_used ON results (used)")
+    _local.conn, _local.pid = conn, os.getpid()
+    return conn
+
+
+def _normalize(value):
+    if value is None or value == "" or value == []:
+        return None
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    return value
+
+
+def cache_key(version, callback_id, args):
+    inputs = json.dumps(_normalize(list(args)), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"{dataset.BUILD}\0{version}\0{callback_id}\0{inputs}".encode()).hexdigest()
+
+
+def get(key):
+    """Cached output for `key` (decoded JSON), or None."""
+    conn = _connect()
+    row = conn.execute("SELECT value, used FROM results WHERE key = ?", (key,)).fetchone()
+    if row is None:
+        return None
+    now = time.time()
+    if now - row[1] > TOUCH_INTERVAL:
+        conn.execute("UPDATE results SET used = ? WHERE key = ?", (now, key))
+    return json.loads(zlib.decompress(row[0]))
+
+
+def put(key, version, callback_id, output):
+    """Store `output` (anything Dash can serialize) and evict down to the budget."""
+    value = zlib.compress(json.dumps(output, cls=PlotlyJSONEncoder).encode())
+    conn = _connect()
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                     (key, version, callback_id, value, len(value), time.time()))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total > BUDGET_BYTES:
+            # Oldest first until the rest fits
+            evicted = 0
+            for old_key, size in conn.execute("SELECT key, size FROM results ORDER BY used").fetchall():
+                if total <= BUDGET_BYTES:
+                    break
+                conn.execute("DELETE FROM results WHERE key = ?", (old_key,))
+                total -= size
+                evicted += 1
+            metrics.inc("wmfb_result_cache_evictions_total", (), evicted, "Result cache entries evicted")
+
+
+def _storable(output):
+    outputs = output if isinstance(output, (list, tuple)) else [output]
+    return not any(isinstance(o, dash._callback.NoUpdate) for o in outputs)
+
+
+def cached(callback_id):
+    """Decorator that answers a callback from the shared cache when it can."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if kwargs or not enabled():
+                return func(*args, **kwargs)
+            version = dataset.current().version
+            key = cache_key(version, callback_id, args)
+            try:
+                output = get(key)
+            except sqlite3.Error as exc:
+                print(f"Warning: result cache read failed: {exc!r}")
+                output = None
+            labels = (("callback", callback_id),)
+            if output is not None:
+                metrics.inc("wmfb_result_cache_hits_total", labels, 1, "Callback results served from the shared cache")
+                # Multi-output results come back as lists, which Dash takes as well as tuples
+                return output
+            metrics.inc("wmfb_result_cache_misses_total", labels, 1, "Callback results computed and stored")
+            output = func(*args, **kwargs)
+            if _storable(output):
+                try:
+                    put(key, version, callback_id, output)
+                except sqlite3.Error as exc:
+                    print(f"Warning: result cache write failed: {exc!r}")
+            return output
+        return wrapper
+    return decorator
+
+
+def instrument(app):
+    """Serve every callback declared afterwards (except UNCACHED) through the shared cache.
+
+    Call after `metrics.instrument(app)` so timing still covers cache hits, and
+    before `profiling.instrument(app)` so hits are not profiled.
+    """
+    register_callback = app.callback
+
+    def callback(*args, **kwargs):
+        register = register_callback(*args, **kwargs)
+
+        def decorator(func):
+            if func.__name__ in UNCACHED:
+                return register(func)
+            return register(cached(func.__name__)(func))
+        return decorator
+
+    app.callback = callback
+    return app
+
+
+def stats():
+    """{"entries": n, "bytes": total} of the cache file."""
+    conn = _connect()
+    entries, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+    return {"entries": entries, "bytes": total}
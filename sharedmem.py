@@ -0,0 +1,75 @@
+"""Fork-friendly, read-only storage for the module-level play tables.
+
+With `preload_app` (see gunicorn.conf.py) the data modules are imported once in
+the gunicorn master and workers inherit the tables through fork. Pages stay
+shared only as long as nobody writes to them; Python object columns break that
+because every access updates reference counts stored next to the data.
+
+`share_frame` therefore rebuilds a DataFrame so that each column is either a
+contiguous read-only numpy buffer or an Arrow string buffer, and pandas wraps
+those buffers without copying. `freeze()` moves everything allocated so far out
+of the garbage collector's reach so GC passes in workers don't touch it either.
+"""
+import gc
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (pandas uses it for Arrow-backed strings)
+    _ARROW_STRINGS = pd.StringDtype("pyarrow", na_value=np.nan)
+except ImportError:
+    _ARROW_STRINGS = None
+
+
+def _shared_column(series):
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in "biufmM":
+        values = np.array(series.to_numpy(), copy=True)
+        values.flags.writeable = False
+        return values
+    if _ARROW_STRINGS is not None and (dtype == object or isinstance(dtype, pd.StringDtype)):
+        try:
+            return series.astype(_ARROW_STRINGS).array
+        except (TypeError, ValueError):
+            # Mixed objects that are not strings stay as they are
+            return series.array
+    return series.array
+
+
+def share_frame(df):
+    """Return `df` rebuilt on read-only numpy / Arrow column buffers."""
+    if df is None or df.empty:
+        return df
+    columns = {name: _shared_column(df[name]) for name in df.columns}
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+
+def freeze():
+    """Exclude all objects allocated so far from future GC passes (call before fork)."""
+    gc.collect()
+    gc.freeze()
+
+
+def process_memory():
+    """Resident memory of this process split into shared and private bytes.
+
+    Reads /proc/self/smaps_rollup (Linux); returns an empty dict elsewhere.
+    `private_dirty` is what a forked worker costs on top of the master.
+    """
+    fields = {
+        "Rss": "rss", "Pss": "pss", "Shared_Clean": "shared_clean",
+        "Shared_Dirty": "shared_dirty", "Private_Clean": "private_clean",
+        "Private_Dirty": "private_dirty",
+    }
+    report = {}
+    try:
+        with open(f"/proc/{os.getpid()}/smaps_rollup", encoding="ascii") as fh:
+            for line in fh:
+                key, _, rest = line.partition(":")
+                if key in fields:
+                    report[fields[key]] = int(rest.split()[0]) * 1024
+    except OSError:
+        pass
+    return report
@@ -0,0 +1,123 @@
+"""Columnar snapshot of an opponent partition for the offline opponent page.
+
+  /snapshot/<version>/<opponent>.json
+
+The downs 1-4 plays of partition `opponent` as one JSON document: numeric
+columns as plain arrays (null where missing), text columns dictionary-encoded as
+{"dict": [distinct values], "codes": [index per play, -1 when missing]}, plus
+the main concept list the concept dropdown offers. The page's clientside
+callbacks (assets/clientside.js) fetch it once and filter in the browser.
+
+`version` is dataset.Dataset.version and dataset.BUILD ("<data>-<build>"), so a
+URL's content never changes and is served as immutable; the browser keeps it
+until the data or the deployed code (and with it the document format) does. A
+request for any other version is redirected to the current one. Encoded documents (and their
+gzip form) are kept for the last `WMFB_SNAPSHOT_CACHE` (default 8) partitions.
+"""
+import gzip
+import json
+import os
+import threading
+from collections import OrderedDict
+from urllib.parse import quote
+
+import pandas as pd
+from flask import Response, redirect, request
+
+import dataset
+from queries import MAIN_CONCEPTS
+
+CACHE_SIZE = int(os.environ.get("WMFB_SNAPSHOT_CACHE", "8"))
+NUMERIC_COLUMNS = ["DN", "DIST", "FPOS", "GAIN", "Is_Successful", "Is_Explosive"]
+TEXT_COLUMNS = ["OVO CONCEPT", "OVO RESULT", "COVERAGE", "FRONT", "MOTION", "HASH", "PERSON"]
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def _numeric(series):
+    values = series.astype(object).where(series.notna(), None)
+    return [None if v is None else int(v) for v in values]
+
+
+def encode_text(series):
+    """(codes, dictionary) of a text column: codes index the dictionary, -1 when missing."""
+    codes, uniques = pd.factorize(series.astype(object).where(series.notna(), None))
+    return codes, [str(u) for u in uniques]
+
+
+def _text(series):
+    codes, dictionary = encode_text(series)
+    return {"dict": dictionary, "codes": codes.tolist()}
+
+
+def build(playset):
+    """Snapshot document (a dict) of a PlaySet's downs 1-4 plays."""
+    df = playset.tendencies
+    columns = {}
+    for column in NUMERIC_COLUMNS:
+        if column in df.columns:
+            columns[column] = _numeric(df[column])
+    for column in TEXT_COLUMNS:
+        if column in df.columns:
+            columns[column] = _text(df[column])
+    return {"rows": len(df), "columns": columns, "main_concepts": sorted(set(MAIN_CONCEPTS))}
+
+
+def url_version(current=None):
+    """The `version` segment of the current snapshot URLs."""
+    return f"{(current or dataset.current()).version}-{dataset.BUILD}"
+
+
+def base_url():
+    return f"/snapshot/{url_version()}/"
+
+
+def snapshot_url(key, version=None):
+    return f"/snapshot/{version or url_version()}/{quote(key, safe='')}.json"
+
+
+def _encoded(current, key):
+    # (json bytes, gzip bytes) of partition `key` at `current.version`, LRU-cached
+    cache_key = (current.version, key)
+    with _lock:
+        if cache_key in _cache:
+            _cache.move_to_end(cache_key)
+            return _cache[cache_key]
+    body = json.dumps(build(current.plays.get(key)), separators=(",", ":")).encode()
+    encoded = (body, gzip.compress(body, 6))
+    with _lock:
+        _cache[cache_key] = encoded
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return encoded
+
+
+def register(app):
+    """Add the /snapshot route to the Flask server of a Dash app."""
+    server = app.server
+
+    @server.route("/snapshot/<version>/<path:key>.json")
+    def _snapshot(version, key):
+        current = dataset.current()
+        if key not in current.plays.partitions:
+            return Response(f"unknown opponent {key!r}\n", status=404, mimetype="text/plain")
+        if version != url_version(current):
+            response = redirect(snapshot_url(key, url_version(current)), code=302)
+            response.headers["Cache-Control"] = "no-cache"
+            return response
+        etag = f"{version}-{key}"
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            body, compressed = _encoded(current, key)
+            response = Response(body, mimetype="application/json")
+            if "gzip" in request.headers.get("Accept-Encoding", ""):
+                response.set_data(compressed)
+                response.headers["Content-Encoding"] = "gzip"
+            response.headers["Vary"] = "Accept-Encoding"
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+    return app
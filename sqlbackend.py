@@ -0,0 +1,251 @@
+"""Optional SQLite backend for play queries (`WMFB_QUERY_BACKEND=sqlite`).
+
+The cleaned plays go into an in-memory SQLite database built per dataset version.
+It runs in this process, with no server or extension. There are two tables:
+
+- plays: every loaded opponent partition's downs 1-4 plays. Partitions are
+  added the first time they are queried. Indexed on (partition, down),
+  (partition, distance), (partition, normalized concept), (partition,
+  coverage) and team.
+- wm: the W&M spring table, indexed on jersey, QB, down, distance and
+  normalized concept.
+
+`compile_plays` turns the opponent page's filters into a parameterized WHERE
+clause with the same semantics as queries.play_bitmap. Values of one filter
+are OR'ed (IN), filters AND'ed, tags win over main concepts, a custom distance
+range is OR'ed with the distance buckets and the field zone is AND'ed.
+`compile_wm` and `wm_player_positions` do the same for the W&M concept page
+and the W&M page's player filter. All of them return row positions, so callers
+slice the same pandas tables they always have. bench.py compares this path
+with the pandas one.
+"""
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+import dataset
+from Football import DOWN_NAMES, distance_bucket, yards_to_goal
+from queries import (RANGE_FILTERS, RESULT_FILTERS, SELECT_FILTERS, as_list, main_concept_values, norm, range_bounds,
+                     wm_concept_values)
+
+# queries.SELECT_FILTERS / RANGE_FILTERS targets -> plays table column
+COLUMNS = {
+    'DN': 'dn', 'DIST': 'dist', 'YDS TO GOAL': 'ytg', 'DIST BUCKET': 'dist_bucket', 'OVO CONCEPT': 'concept',
+    'PERSON': 'person', 'OFF FORM': 'off_form', 'MOTION': 'motion', 'HASH': 'hash', 'COVERAGE': 'coverage', 'FRONT': 'front',
+}
+# Result flag columns (opponent plays, W&M spring table) -> table column
+FLAG_COLUMNS = {'Is_Successful': 'successful', 'Is_Explosive': 'explosive', 'Efficient': 'efficient', 'Explosive': 'explosive'}
+
+_SCHEMA = """
+CREATE TABLE plays (partition TEXT, team TEXT, pos INTEGER, dn INTEGER, dist INTEGER, ytg REAL, dist_bucket TEXT,
+                    concept TEXT, person TEXT, off_form TEXT, motion TEXT, hash TEXT, coverage TEXT, front TEXT,
+                    successful INTEGER, explosive INTEGER);
+CREATE INDEX plays_dn ON plays (partition, dn);
+CREATE INDEX plays_dist ON plays (partition, dist);
+CREATE INDEX plays_concept ON plays (partition, concept);
+CREATE INDEX plays_coverage ON plays (partition, coverage);
+CREATE INDEX plays_team ON plays (team);
+CREATE TABLE wm (pos INTEGER, jersey INTEGER, qb INTEGER, rp TEXT, dn INTEGER, dist INTEGER, concept TEXT,
+                 efficient INTEGER, explosive INTEGER);
+CREATE INDEX wm_jersey ON wm (jersey);
+CREATE INDEX wm_qb ON wm (qb);
+CREATE INDEX wm_dn ON wm (dn);
+CREATE INDEX wm_dist ON wm (dist);
+CREATE INDEX wm_concept ON wm (concept);
+"""
+
+
+def _records(frame):
+    # Rows as tuples of plain Python values (None for NaN) for executemany
+    return list(frame.astype(object).where(frame.notna(), None).itertuples(index=False, name=None))
+
+
+def _in(column, values, params):
+    if not values:
+        return "0"
+    params.extend(v.item() if isinstance(v, np.generic) else v for v in values)
+    return f"{column} IN ({', '.join('?' * len(values))})"
+
+
+def _between(column, low, high, params):
+    clauses = []
+    if low is not None:
+        clauses.append(f"{column} >= ?")
+        params.append(low)
+    if high is not None:
+        clauses.append(f"{column} <= ?")
+        params.append(high)
+    return " AND ".join(clauses) or f"{column} IS NOT NULL"
+
+
+def compile_plays(concepts, down=None, distance=None, main_concept=None, tag=None, filter_value=None, play_filters=None):
+    """(WHERE clauses, parameters) for the opponent page's filters over the plays table;
+    `concepts` are the partition's normalized concepts (for main concept prefixes)."""
+    play_filters = play_filters or {}
+    clauses, params = [], []
+    downs = [DOWN_NAMES[d] for d in as_list(down) if d in DOWN_NAMES]
+    if downs:
+        clauses.append(_in('dn', downs, params))
+    if as_list(distance):
+        clauses.append(_in('dist', as_list(distance), params))
+    tags = [norm(t) for t in as_list(tag)]
+    if tags:
+        clauses.append(_in('concept', tags, params))
+    elif as_list(main_concept):
+        clauses.append(_in('concept', [c for mc in as_list(main_concept) for c in main_concept_values(concepts, mc)], params))
+    flags = [RESULT_FILTERS[f] for f in as_list(filter_value) if f in RESULT_FILTERS]
+    flag_clauses = [f"{FLAG_COLUMNS[columns[0]]} = {int(value)}" for columns, value in flags]
+    if flag_clauses:
+        clauses.append(" AND ".join(flag_clauses) if play_filters.get('match') == 'all' else f"({' OR '.join(flag_clauses)})")
+    for key, name in SELECT_FILTERS.items():
+        values = as_list(play_filters.get(key))
+        if not values:
+            continue
+        clause = _in(COLUMNS[name], values, params)
+        if key == 'dist_bucket' and play_filters.get('distance'):
+            low, high = play_filters['distance']
+            clause = f"({clause} OR ({_between('dist', low, high, params)}))"
+        clauses.append(clause)
+    bounds = range_bounds({k: v for k, v in play_filters.items() if k in RANGE_FILTERS})
+    if as_list(play_filters.get('dist_bucket')):
+        bounds.pop('DIST', None)
+    for column, (low, high) in bounds.items():
+        clauses.append(_between(COLUMNS[column], low, high, params))
+    return clauses, params
+
+
+def compile_wm(concepts, down=None, distance=None, main_concept=None, tag=None, filter_value=None):
+    """(WHERE clauses, parameters) for the W&M concept page's filters over the wm table
+    (queries.wm_bitmap's semantics); `concepts` are the table's normalized concepts."""
+    clauses, params = [], []
+    downs = [DOWN_NAMES.get(d, d) for d in as_list(down)]
+    if downs:
+        clauses.append(_in('dn', downs, params))
+    if as_list(distance):
+        clauses.append(_in('dist', as_list(distance), params))
+    tags = [norm(t) for t in as_list(tag)]
+    if tags:
+        clauses.append(_in('concept', tags, params))
+    elif as_list(main_concept):
+        clauses.append(_in('concept', [c for mc in as_list(main_concept) for c in wm_concept_values(concepts, mc)], params))
+    flags = [RESULT_FILTERS[f] for f in as_list(filter_value) if f in RESULT_FILTERS]
+    if flags:
+        clauses.append(f"({' OR '.join(f'{FLAG_COLUMNS[columns[1]]} = {int(value)}' for columns, value in flags)})")
+    return clauses, params
+
+
+class PlayDB:
+    # One in-memory database; every statement runs under the lock (one connection
+    # shared by the worker's threads)
+
+    def __init__(self):
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self.conn.executescript(_SCHEMA)
+        self.lock = threading.Lock()
+        self.concepts = {}
+        self.has_wm = False
+        self.wm_dtypes = {}
+        self.wm_concepts = []
+
+    def add_partition(self, key, playset):
+        """Insert a partition's downs 1-4 plays (once)."""
+        with self.lock:
+            if key in self.concepts:
+                return
+            df = playset.tendencies
+            concept = df['OVO CONCEPT'].astype(str).str.strip().str.upper()
+            frame = pd.DataFrame({
+                'partition': key, 'team': key.split('|', 1)[0], 'pos': np.arange(len(df)),
+                'dn': df['DN'].to_numpy(), 'dist': df['DIST'].to_numpy(), 'ytg': np.asarray(yards_to_goal(df['FPOS'])),
+                'dist_bucket': np.asarray(distance_bucket(df), dtype=object), 'concept': concept.to_numpy(),
+                **{COLUMNS[c]: df[c].to_numpy() for c in ('PERSON', 'OFF FORM', 'MOTION', 'HASH', 'COVERAGE', 'FRONT')},
+                'successful': df['Is_Successful'].to_numpy(), 'explosive': df['Is_Explosive'].to_numpy(),
+            })
+            with self.conn:
+                self.conn.executemany(f"INSERT INTO plays VALUES ({', '.join('?' * len(frame.columns))})", _records(frame))
+            self.concepts[key] = list(concept.dropna().unique())
+
+    def add_wm(self, wm):
+        """Insert the W&M spring table (once)."""
+        with self.lock:
+            if self.has_wm:
+                return
+            concept = wm['OVO CONCEPT'].astype(str).str.strip().str.upper().where(wm['OVO CONCEPT'].notna())
+            frame = pd.DataFrame({
+                'pos': np.arange(len(wm)),
+                'jersey': pd.to_numeric(wm['JERSEY #'].astype(str).str.extract(r'(\d+)')[0], errors='coerce').to_numpy(),
+                'qb': pd.to_numeric(wm['QB'], errors='coerce').to_numpy(),
+                'rp': wm['R/P'].astype(str).str.strip().to_numpy(),
+                'dn': pd.to_numeric(wm['DN'], errors='coerce').to_numpy() if 'DN' in wm.columns else None,
+                'dist': pd.to_numeric(wm['DIST'], errors='coerce').to_numpy() if 'DIST' in wm.columns else None,
+                'concept': concept.to_numpy(),
+                'efficient': wm['Efficient'].to_numpy(), 'explosive': wm['Explosive'].to_numpy(),
+            })
+            with self.conn:
+                self.conn.executemany("INSERT INTO wm VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", _records(frame))
+            # Numeric dtypes of the whole columns, for subsets converted on their own
+            self.wm_dtypes = {c: pd.to_numeric(wm[c], errors='coerce').dtype for c in ('JERSEY #', 'QB') if c in wm.columns}
+            self.wm_concepts = list(concept.dropna().unique())
+            self.has_wm = True
+
+    def positions(self, sql, params):
+        with self.lock:
+            return np.fromiter((row[0] for row in self.conn.execute(sql, params)), dtype=np.int64)
+
+    def play_positions(self, key, **filters):
+        """Positions in the partition's downs 1-4 table of the plays matching `filters`
+        (keyword arguments of compile_plays)."""
+        clauses, params = compile_plays(self.concepts[key], **filters)
+        where = " AND ".join(["partition = ?"] + clauses)
+        return self.positions(f"SELECT pos FROM plays WHERE {where} ORDER BY pos", [key] + params)
+
+    def wm_positions(self, **filters):
+        """Positions in the W&M table of the plays matching `filters` (keyword arguments of compile_wm)."""
+        clauses, params = compile_wm(self.wm_concepts, **filters)
+        return self.positions(f"SELECT pos FROM wm WHERE {' AND '.join(clauses) or '1'} ORDER BY pos", params)
+
+    def wm_player_positions(self, position, jersey):
+        """Positions in the W&M table of a player's plays (queries.player_plays' rules)."""
+        jersey = None if jersey is None or pd.isna(jersey) else int(jersey)
+        if position == "QB":
+            sql = "SELECT pos FROM wm WHERE qb = ? AND (rp = 'P' OR (rp = 'R' AND jersey = ?)) ORDER BY pos"
+            return self.positions(sql, [jersey, jersey])
+        return self.positions("SELECT pos FROM wm WHERE jersey = ? ORDER BY pos", [jersey])
+
+
+_db = (None, None)
+_db_lock = threading.Lock()
+
+
+def current_db():
+    """PlayDB of the current dataset version (the previous version's is dropped)."""
+    global _db
+    version = dataset.current().version
+    with _db_lock:
+        if _db[0] != version:
+            _db = (version, PlayDB())
+        return _db[1]
+
+
+def play_positions(opponent, playset, **filters):
+    store = dataset.current().plays
+    key = opponent if opponent in store.partitions else store.default_key
+    db = current_db()
+    db.add_partition(key, playset)
+    return db.play_positions(key, **filters)
+
+
+def wm_player_positions(position, jersey):
+    """(positions, dtypes): the player's rows in the W&M table and the numeric dtypes of
+    its jersey / QB columns."""
+    db = current_db()
+    db.add_wm(dataset.current().wm)
+    return db.wm_player_positions(position, jersey), db.wm_dtypes
+
+
+def wm_positions(spring, **filters):
+    db = current_db()
+    db.add_wm(spring.clean)
+    return db.wm_positions(**filters)
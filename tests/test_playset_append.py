@@ -0,0 +1,61 @@
+"""PlaySet.append against a full rebuild of the same plays."""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from Football import PlaySet, clean_plays
+from sharedmem import share_frame
+
+RU_DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "RU_data.csv")
+FRACTIONS = [0.01, 0.05, 0.3, 0.5, 0.9, 0.99]
+
+
+@pytest.fixture(scope="module")
+def plays():
+    return clean_plays(pd.read_csv(RU_DATA))
+
+
+def _split(plays, seed, fraction):
+    # Old plays (down-sorted, as a PlaySet holds them) and new ones in export order
+    perm = np.random.default_rng(seed).permutation(len(plays))
+    cut = max(1, int(len(plays) * fraction))
+    old = plays.iloc[np.sort(perm[:cut])]
+    new = plays.iloc[perm[cut:]]
+    if seed == 2:
+        # new plays on one down only
+        new = new[new["DN"] == 3]
+    return share_frame(old.sort_values("DN", kind="mergesort")), new
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("fraction", FRACTIONS)
+def test_append_matches_rebuild(plays, seed, fraction):
+    old, new = _split(plays, seed, fraction)
+    base = PlaySet(old)
+    base.tally(["DN", "OFF FORM"])
+    appended = base.append(new)
+    rebuilt = PlaySet(share_frame(pd.concat([old, new]).sort_values("DN", kind="mergesort")))
+
+    # append renumbers the rows; their order and values are what callbacks see
+    pd.testing.assert_frame_equal(appended.clean.reset_index(drop=True), rebuilt.clean.reset_index(drop=True))
+    for by in (["DN", "OFF FORM"], ["COVERAGE"], ["DN", "OVO CONCEPT"]):
+        pd.testing.assert_frame_equal(appended.tally(by).sort_index(), rebuilt.tally(by).sort_index())
+    pd.testing.assert_frame_equal(appended.defense.sort_index(), rebuilt.defense.sort_index())
+
+    assert appended.sorted_columns.keys() == rebuilt.sorted_columns.keys()
+    for key, index in rebuilt.sorted_columns.items():
+        mine = appended.sorted_columns[key]
+        np.testing.assert_array_equal(mine.values, index.values)
+        for low, high in [(None, 3), (2, 7), (5, None), (0, 0)]:
+            np.testing.assert_array_equal(mine.between(low, high), index.between(low, high))
+
+    assert appended.bitmaps.keys() == rebuilt.bitmaps.keys()
+    for name, index in rebuilt.bitmaps.items():
+        mine = appended.bitmaps[name]
+        assert mine.length == index.length and set(mine.values) == set(index.values)
+        for value, i in index.values.items():
+            j = mine.values[value]
+            np.testing.assert_array_equal(mine.bits[j], index.bits[i])
+            assert mine.counts[j] == index.counts[i]
@@ -0,0 +1,140 @@
+// Offline scouting bundle viewer (see bundle.py). Shards register themselves with
+// WMFB_BUNDLE.shard() from <script> tags, so the page works opened from disk.
+// Nothing is filtered here: every down / main concept / tag / filter view was
+// precomputed, the page only looks it up and draws it.
+window.WMFB_BUNDLE = (function () {
+    const WM_GREEN = '#006341';
+    const WM_GOLD = '#FFC72C';
+    const SVG = 'http://www.w3.org/2000/svg';
+    const data = {};
+
+    function el(id) {
+        return document.getElementById(id);
+    }
+
+    function setOptions(select, placeholder, values, labels) {
+        const current = select.value;
+        select.innerHTML = '';
+        select.appendChild(new Option(placeholder, ''));
+        values.forEach((value, i) => select.appendChild(new Option(labels ? labels[i] : value, value)));
+        select.value = values.includes(current) ? current : '';
+    }
+
+    // Row numbers set in a view's base64 bitmap (bit i of byte k = play 8k + i)
+    function decodeRows(bitmap) {
+        const bytes = atob(bitmap);
+        const rows = [];
+        for (let k = 0; k < bytes.length; k++) {
+            const byte = bytes.charCodeAt(k);
+            for (let i = 0; i < 8; i++) {
+                if (byte & (1 << i)) {
+                    rows.push(k * 8 + i);
+                }
+            }
+        }
+        return rows;
+    }
+
+    function svg(tag, attrs, text) {
+        const node = document.createElementNS(SVG, tag);
+        Object.keys(attrs).forEach(name => node.setAttribute(name, attrs[name]));
+        if (text !== undefined) {
+            node.textContent = text;
+        }
+        return node;
+    }
+
+    // Success vs. yards gained scatter as inline SVG (same look as the dashboard's plotly chart)
+    function drawScatter(rows, title) {
+        const plays = data.plays.columns;
+        const width = 820, height = 340, left = 90, right = 40, top = 36, bottom = 44;
+        const chart = svg('svg', {width: '100%', viewBox: `0 0 ${width} ${height}`, 'font-family': 'Georgia, serif'});
+        chart.appendChild(svg('text', {x: width / 2, y: 20, 'text-anchor': 'middle', 'font-size': 17}, title));
+        const gains = rows.map(i => plays.GAIN[i]).filter(g => g !== null);
+        let low = Math.min(0, ...gains), high = Math.max(10, ...gains);
+        const pad = (high - low) * 0.05;
+        low -= pad;
+        high += pad;
+        const x = g => left + (g - low) / (high - low) * (width - left - right);
+        const y = s => top + (1.25 - s) / 1.5 * (height - top - bottom);
+        const step = high - low > 60 ? 20 : high - low > 30 ? 10 : 5;
+        for (let t = Math.ceil(low / step) * step; t <= high; t += step) {
+            chart.appendChild(svg('line', {x1: x(t), x2: x(t), y1: top, y2: height - bottom, stroke: '#EEE'}));
+            chart.appendChild(svg('text', {x: x(t), y: height - bottom + 16, 'text-anchor': 'middle', 'font-size': 12}, t));
+        }
+        [[0, 'Unsuccessful'], [1, 'Successful']].forEach(([s, label]) => {
+            chart.appendChild(svg('line', {x1: left, x2: width - right, y1: y(s), y2: y(s), stroke: '#EEE'}));
+            chart.appendChild(svg('text', {x: left - 8, y: y(s) + 4, 'text-anchor': 'end', 'font-size': 12}, label));
+        });
+        chart.appendChild(svg('text', {x: (left + width - right) / 2, y: height - 6, 'text-anchor': 'middle', 'font-size': 14}, 'Yards Gained'));
+        if (!rows.length) {
+            chart.appendChild(svg('text', {x: width / 2, y: height / 2, 'text-anchor': 'middle', 'font-size': 18, fill: WM_GOLD},
+                'No plays found for selected filters.'));
+        }
+        const text = (column, i) => {
+            const col = plays[column];
+            if (!col) {
+                return '';
+            }
+            return col.codes ? (col.codes[i] < 0 ? '' : col.dict[col.codes[i]]) : col[i];
+        };
+        rows.forEach(function (i) {
+            const success = plays.Is_Successful[i] || 0;
+            const dot = svg('circle', {
+                cx: x(plays.GAIN[i] || 0), cy: y(success + Math.random() * 0.3 - 0.15), r: 6,
+                fill: WM_GOLD, stroke: WM_GREEN, 'stroke-width': 2
+            });
+            dot.appendChild(svg('title', {}, [
+                'Yards Gained=' + text('GAIN', i), 'DIST=' + text('DIST', i), 'Concept=' + text('OVO CONCEPT', i),
+                'DN=' + text('DN', i), 'COVERAGE=' + text('COVERAGE', i), 'FRONT=' + text('FRONT', i),
+                'MOTION=' + text('MOTION', i), 'HASH=' + text('HASH', i), 'Is_Successful=' + success
+            ].join('\n')));
+            chart.appendChild(dot);
+        });
+        el('play-graph').replaceChildren(chart);
+    }
+
+    function drawTable(table) {
+        const results = data.plays.columns['OVO RESULT'];
+        const cell = 'padding:6px;text-align:left;border-bottom:1px solid #EEE';
+        const head = `<tr style="background-color:${WM_GOLD};color:${WM_GREEN};font-weight:bold">` +
+            ['OVO RESULT', 'Count', '%'].map(h => `<th style="${cell}">${h}</th>`).join('') + '</tr>';
+        const body = table.map(function ([code, count, share]) {
+            const result = code < 0 ? '' : results.dict[code];
+            return '<tr>' + [result, count, share].map(v => `<td style="${cell}">${String(v).replace(/</g, '&lt;')}</td>`).join('') + '</tr>';
+        }).join('');
+        el('table-output').innerHTML = table.length ? head + body
+            : `<tr><td style="color:${WM_GREEN}">No matching plays found.</td></tr>`;
+    }
+
+    function render() {
+        const down = el('down').value;
+        const shard = data[down || 'all'];
+        setOptions(el('main-concept'), 'Select Main Concept', shard.mains.map(m => m[0]));
+        const main = el('main-concept').value;
+        setOptions(el('tag'), 'Select Tag', main ? shard.tags[main] || [] : []);
+        const tag = el('tag').value;
+        const filter = el('filter').value;
+        const view = shard.views[[main, tag, filter].join('\t')];
+        if (!view) {
+            return;
+        }
+        const [cards, table, rows] = view;
+        ['tendency-value', 'efficiency-value', 'explosive-value'].forEach((id, k) => {
+            el(id).textContent = shard.cards[cards][k];
+        });
+        drawTable(shard.tables[table]);
+        const title = [tag || main, down ? down + ' Down' : ''].filter(Boolean).join(' - ') || 'Play Breakdown';
+        drawScatter(decodeRows(shard.rows[rows]), title);
+    }
+
+    return {
+        shard: function (name, content) {
+            data[name] = content;
+        },
+        start: function () {
+            ['down', 'main-concept', 'tag', 'filter'].forEach(id => el(id).addEventListener('change', render));
+            render();
+        }
+    };
+})();
@@ -0,0 +1,184 @@
+"""Background cache warm-up, so the first coach after a deploy doesn't pay for cold views.
+
+`start()` runs once per (forked) process after the server is up: from
+gunicorn's post_worker_init hook, or just before `app.run` when Main.py is run
+directly. A daemon thread replays the most common views through the app's
+own `/_dash-update-component` endpoint, using dashsession.DashSession in-process
+(Flask test client). The callbacks therefore see exactly the inputs a
+browser sends, and their outputs land in the shared result cache
+(resultcache.py) under the keys real requests will look up:
+
+- /richmond (default opponent): each down with no concept, then the
+  `WMFB_WARMUP_TOP_CONCEPTS` (default 3) most played main concepts on it;
+- /wm/concepts: the same for the spring table;
+- /wm: every roster player's stats (queries.roster).
+
+It runs at low priority: before each callback it waits until no live request
+is in flight in this process. Workers take turns through a lock file next to
+the result cache; the first one computes, and the others mostly replay cache
+hits. After a dataset reload (see dataset.py) the views are warmed again for
+the new version. Progress is on `/warmup` (JSON, this worker's thread).
+Warm-up calls also show on /metrics like any other request. `WMFB_WARMUP=0`
+turns it off.
+"""
+import json
+import os
+import threading
+import time
+
+from flask import Response, g, request
+
+import dataset
+import resultcache
+from dashsession import DashSession
+from queries import roster
+
+ENABLED = os.environ.get("WMFB_WARMUP", "1") != "0"
+TOP_CONCEPTS = int(os.environ.get("WMFB_WARMUP_TOP_CONCEPTS", "3"))
+# Marks the warm-up's own requests so they don't count as live traffic
+HEADER = "X-WMFB-Warmup"
+
+_app = None
+_live = 0
+_live_lock = threading.Lock()
+_started_pid = None
+_start_lock = threading.Lock()
+_status = {"state": "off" if not ENABLED else "pending"}
+
+
+class _Client:
+    """The `request()` DashSession expects, over the app's test client."""
+
+    def __init__(self, server):
+        self.client = server.test_client()
+
+    def request(self, method, path, body=None):
+        # Yield to live requests; Python threads share one interpreter, so this is the priority
+        while _live:
+            time.sleep(0.02)
+        response = self.client.open(path, method=method, json=body, headers={HEADER: "1"})
+        return response.status_code, response.get_data()
+
+
+def _options(session, component):
+    return [o["value"] for o in session.props.get(f"{component}.options") or [] if isinstance(o, dict)]
+
+
+def _views(session):
+    """Drive `session` through the warm-up views, yielding a label after each one."""
+    for path, down_dd, concept_dd, multi in (("/richmond", "down-dropdown", "main-concept-dropdown", True),
+                                             ("/wm/concepts", "down-dropdown-wm", "main-concept-dropdown-wm", False)):
+        session.load(path)
+        yield path
+        for down in _options(session, down_dd):
+            session.step("set", f"{down_dd}.value", [down] if multi else down)
+            yield f"{path} {down}"
+            # Options come most played first
+            for concept in _options(session, concept_dd)[:TOP_CONCEPTS]:
+                session.step("set", f"{concept_dd}.value", [concept] if multi else concept)
+                yield f"{path} {down} {concept}"
+            session.step("clear", concept_dd, None)
+    session.load("/wm")
+    yield "/wm"
+    for position, players in roster().items():
+        session.step("clear", "player-dropdown-wm", None)
+        session.step("set", "position-dropdown-wm.value", position)
+        for player in players:
+            session.step("set", "player-dropdown-wm.value", player)
+            yield f"/wm {position} {player}"
+
+
+def _lock_file():
+    # Serializes the workers' warm-ups; None (no lock) when the result cache is off
+    if not resultcache.enabled():
+        return None
+    import fcntl
+    if os.path.dirname(resultcache.PATH):
+        os.makedirs(os.path.dirname(resultcache.PATH), exist_ok=True)
+    fh = open(resultcache.PATH + ".warmup.lock", "a")
+    fcntl.flock(fh, fcntl.LOCK_EX)
+    return fh
+
+
+def warm():
+    """Replay the warm-up views once, for the current dataset version."""
+    version = dataset.current().version
+    _status.update(state="waiting", version=version, views=0, callbacks=0, errors=0, current=None)
+    calls = {"callbacks": 0, "errors": 0}
+
+    def record(_endpoint, _seconds, status):
+        calls["callbacks"] += 1
+        calls["errors"] += status != 200
+
+    lock = _lock_file()
+    try:
+        t0 = time.perf_counter()
+        _status.update(state="running", started=time.time())
+        client = _Client(_app.server)
+        status, body = client.request("GET", "/_dash-dependencies")
+        if status != 200:
+            raise RuntimeError(f"/_dash-dependencies returned {status}")
+        session = DashSession(client, json.loads(body), record, None)
+        for label in _views(session):
+            _status.update(views=_status["views"] + 1, current=label, **calls)
+        _status.update(state="done", current=None, seconds=round(time.perf_counter() - t0, 2), **calls)
+        print(f"Warm-up of {version}: {_status['views']} views, {calls['callbacks']} callbacks "
+              f"({calls['errors']} failed) in {_status['seconds']:.1f}s")
+    finally:
+        if lock is not None:
+            lock.close()
+
+
+def _run():
+    warmed = None
+    while True:
+        if dataset.current().version != warmed:
+            warmed = dataset.current().version
+            try:
+                warm()
+            except Exception as exc:  # a cold cache is only slower; keep serving
+                _status.update(state="failed", error=repr(exc))
+                print(f"Warning: warm-up failed: {exc!r}")
+        if dataset.RELOAD_INTERVAL <= 0:
+            return
+        time.sleep(dataset.RELOAD_INTERVAL)
+
+
+def start():
+    """Start this process's warm-up thread (no-op if running, disabled or not registered)."""
+    global _started_pid
+    if not ENABLED or _app is None or _started_pid == os.getpid():
+        return
+    with _start_lock:
+        if _started_pid == os.getpid():
+            return
+        _started_pid = os.getpid()
+        threading.Thread(target=_run, name="wmfb-warmup", daemon=True).start()
+
+
+def register(app):
+    """Add the /warmup status route and live-request tracking to a Dash app."""
+    global _app
+    _app = app
+    server = app.server
+
+    @server.before_request
+    def _warmup_live_start():
+        global _live
+        if HEADER not in request.headers:
+            g.wmfb_live = True
+            with _live_lock:
+                _live += 1
+
+    @server.teardown_request
+    def _warmup_live_end(_exc):
+        global _live
+        if g.pop("wmfb_live", False):
+            with _live_lock:
+                _live -= 1
+
+    @server.route("/warmup")
+    def _warmup_status():
+        return Response(json.dumps(dict(_status, pid=os.getpid())), mimetype="application/json")
+
+    return app